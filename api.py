@@ -1,15 +1,23 @@
+import json
+import os
+
 from fastapi import FastAPI, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Dict, Optional
-from pulp import PULP_CBC_CMD, LpStatus
-import json
-import os
 
-from otm_model import build_trip_milp_pulp
-from import_export_json import parse_db_to_model_inputs, build_front_json_from_solution, get_available_date_range
-from fallback_optimizer import optimize_with_fallback
-from multiple_optimizer import gerar_multiplas_opcoes
+from database_cache import get_database
+from flight_index import FlightIndex
+from model_engines import MODEL_ENGINES, DEFAULT_ENGINE
+from import_export_json import parse_db_to_model_inputs, build_front_json_from_solution, get_available_date_range, \
+    compilar_voos
+from fallback_optimizer import optimize_with_fallback, solucao_heuristica, DEADLINE_FALLBACK
+from multiple_optimizer import gerar_multiplas_opcoes, gerar_multiplas_opcoes_stream, DEADLINE_PADRAO
+from result_cache import ResultCache, chave_requisicao
+from job_queue import JobQueue, Job, FilaCheia
+from stage_timing import etapa, medir_requisicao, com_etapas, metricas
 
 app = FastAPI(title="SmartTrip API", version="1.0.0")
 
@@ -38,58 +46,58 @@ class TripRequest(BaseModel):
     incluir_refeicao: bool
     incluir_hospedagem: bool
     incluir_transporte: bool
+    motor: Optional[str] = DEFAULT_ENGINE  # "mtz", "time_expanded" ou "mtz_matriz"
+    prazo_segundos: Optional[float] = None  # prazo para responder (padrão do endpoint)
+    incluir_etapas: Optional[bool] = False  # tempos por etapa em metadata.etapas
 
 
-class MultipleOptionsRequest(BaseModel):
-    ida_volta: bool
-    origem: str
-    destino: str
-    locais_visitar: List[str]
-    data_ida: str
-    numero_adultos: int
-    numero_criancas: int
-    dias_por_cidade: Dict[str, int]
-    incluir_refeicao: bool
-    incluir_hospedagem: bool
-    incluir_transporte: bool
+class MultipleOptionsRequest(TripRequest):
     numero_opcoes: Optional[int] = 3
 
 
-JSON_PATH = "database.json"
+# database.json ou a versão colunar (.otmb, ver import_export_json.py)
+JSON_PATH = os.environ.get("OTM_DATABASE", "database.json")
 
+# Respostas já calculadas (por requisição normalizada + versão do banco)
+cache_resultados = ResultCache()
 
-@app.get("/")
-def health_check():
-    return {"status": "ok"}
+# Solves enfileirados pelos endpoints /jobs/*
+fila_jobs = JobQueue()
 
 
-@app.get("/available-dates")
-def get_available_dates():
-    """Retorna o intervalo de datas disponíveis para viagens"""
-    if not os.path.exists(JSON_PATH):
-        raise HTTPException(status_code=500, detail="Database file not found")
-    
+def carregar_database():
+    """
+    Snapshot atual do banco (carregado uma vez por processo, recarregado
+    apenas quando o arquivo muda)
+    """
     try:
-        date_range = get_available_date_range(JSON_PATH)
-        return {
-            "data_minima": date_range["data_minima"],
-            "data_maxima": date_range["data_maxima"],
-            "mensagem": f"Voos disponíveis de {date_range['data_minima']} até {date_range['data_maxima']}"
-        }
+        return get_database(JSON_PATH)
+    except FileNotFoundError:
+        raise HTTPException(status_code=500, detail="Database file not found")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erro ao obter datas: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error loading database: {str(e)}")
 
 
-@app.post("/optimize")
-def optimize_trip(request: TripRequest):
-    if not os.path.exists(JSON_PATH):
-        raise HTTPException(status_code=500, detail="Database file not found")
+def chave_cache(endpoint: str, request: TripRequest, snapshot) -> str:
+    """
+    Chave do cache de resultados para a requisição na versão atual do banco
+    """
+    campos = request.model_dump() if hasattr(request, "model_dump") else request.dict()
+    campos["motor"] = campos.get("motor") or DEFAULT_ENGINE
+    campos.pop("incluir_etapas", None)  # não muda a solução
+    return chave_requisicao(endpoint, campos, snapshot.version)
+
 
+def preparar_otimizacao(request: TripRequest, snapshot):
+    """
+    Converte a requisição em (request_data, model_params) para os otimizadores
+    """
     # 1. Carrega dados do banco
     try:
         V, F, DEP, DUR, C, C_hotel, C_food, C_transfer = parse_db_to_model_inputs(
-            JSON_PATH, 
-            user_start_date=request.data_ida
+            db=snapshot.data,
+            user_start_date=request.data_ida,
+            compilado=snapshot.derivado("voos_compilados", compilar_voos)
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error parsing database: {str(e)}")
@@ -101,6 +109,12 @@ def optimize_trip(request: TripRequest):
             detail="Round trip (ida_volta=True) not currently supported."
         )
 
+    if request.motor not in MODEL_ENGINES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown model engine {request.motor}. Options: {', '.join(MODEL_ENGINES)}"
+        )
+
     origin = request.origem
     dest = request.destino
 
@@ -160,29 +174,138 @@ def optimize_trip(request: TripRequest):
         'C_transfer': C_transfer_eff,
     }
 
-    # 8. Carregar database completo
-    with open(JSON_PATH, "r", encoding="utf-8") as f:
-        db = json.load(f)
-
-    # 9. Preparar dados da requisição
+    # 8. Preparar dados da requisição
     request_data = {
         'origem': origin,
         'destino': dest,
         'data_ida': request.data_ida,
-        'locais_visitar': list(cities_to_force_visit)
+        'locais_visitar': list(cities_to_force_visit),
+        'motor': request.motor
     }
 
-    # 10. Usar sistema de fallback - GARANTE sempre retornar resposta válida
+    return request_data, model_params
+
+
+@app.get("/")
+async def health_check():
+    return {"status": "ok"}
+
+
+@app.get("/available-dates")
+def get_available_dates():
+    """Retorna o intervalo de datas disponíveis para viagens"""
+    snapshot = carregar_database()
+    
+    try:
+        date_range = snapshot.derivado("date_range", lambda db: get_available_date_range(db=db))
+        return {
+            "data_minima": date_range["data_minima"],
+            "data_maxima": date_range["data_maxima"],
+            "mensagem": f"Voos disponíveis de {date_range['data_minima']} até {date_range['data_maxima']}"
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erro ao obter datas: {str(e)}")
+
+
+@app.get("/cache-stats")
+def get_cache_stats():
+    """Contadores do cache de resultados (hits/misses/entradas)"""
+    return cache_resultados.estatisticas()
+
+
+@app.get("/metrics")
+def get_metrics():
+    """Histogramas de tempo por endpoint e etapa (load, parse, build, solve, ...)"""
+    return metricas.estatisticas()
+
+
+def carregar_e_consultar_cache(endpoint: str, request: TripRequest):
+    """
+    Etapas "load" (snapshot do banco) e "cache" (consulta ao cache de resultados)
+    Retorna (snapshot, chave, resultado em cache ou None)
+    """
+    with etapa("load"):
+        snapshot = carregar_database()
+    with etapa("cache"):
+        chave = chave_cache(endpoint, request, snapshot)
+        resultado = cache_resultados.get(chave)
+    return snapshot, chave, resultado
+
+
+def preparar_com_etapa(request: TripRequest, snapshot):
+    with etapa("parse"):
+        return preparar_otimizacao(request, snapshot)
+
+
+def resposta_cacheavel(resultado: Dict) -> bool:
+    """
+    Só respostas concluídas vão para o cache: erros e respostas cortadas pelo
+    prazo/tempo limite (metadata.completo=False) seriam repetidas por todo o TTL
+    """
+    metadata = resultado.get("metadata", {})
+    return metadata.get("nivel_otimizacao") != "erro" and metadata.get("completo", True)
+
+
+def resolver_otimizacao(request: TripRequest, snapshot, request_data: Dict, model_params: Dict,
+                        chave: str, job: Optional[Job] = None) -> Dict:
+    """
+    Roda o fallback e grava no cache; em modo job publica antes a solução
+    heurística (milissegundos) como resultado parcial
+    """
+    db = snapshot.data
+    flight_index = snapshot.derivado("flight_index", FlightIndex)
+
+    if job is not None:
+        job.publicar_parcial(solucao_heuristica(db, request_data, flight_index))
+
+    # Usar sistema de fallback - GARANTE sempre retornar resposta válida
     result_json = optimize_with_fallback(
         request_data=request_data,
         db=db,
         model_params=model_params,
-        build_result_func=build_front_json_from_solution
+        build_result_func=build_front_json_from_solution,
+        flight_index=flight_index,
+        deadline=request.prazo_segundos or DEADLINE_FALLBACK
     )
 
+    if resposta_cacheavel(result_json):
+        cache_resultados.put(chave, result_json)
+
     return result_json
 
 
+def resolver_multiplas(request: MultipleOptionsRequest, snapshot, request_data: Dict, model_params: Dict,
+                       chave: str, job: Optional[Job] = None) -> Dict:
+    """
+    Gera as múltiplas opções e grava no cache
+    """
+    result = gerar_multiplas_opcoes(
+        request_data=request_data,
+        db=snapshot.data,
+        model_params=model_params,
+        num_opcoes=request.numero_opcoes,
+        deadline=request.prazo_segundos or DEADLINE_PADRAO,
+        flight_index=snapshot.derivado("flight_index", FlightIndex)
+    )
+
+    if result["opcoes"] and resposta_cacheavel(result):
+        cache_resultados.put(chave, result)
+
+    return result
+
+
+@app.post("/optimize")
+def optimize_trip(request: TripRequest):
+    with medir_requisicao("optimize") as etapas:
+        # Banco compartilhado (mesmo dict usado no parse e no fallback)
+        snapshot, chave, result_json = carregar_e_consultar_cache("optimize", request)
+        if result_json is None:
+            request_data, model_params = preparar_com_etapa(request, snapshot)
+            result_json = resolver_otimizacao(request, snapshot, request_data, model_params, chave)
+
+    return com_etapas(result_json, etapas) if request.incluir_etapas else result_json
+
+
 @app.post("/optimize-multiple")
 def optimize_trip_multiple_options(request: MultipleOptionsRequest):
     """
@@ -191,103 +314,120 @@ def optimize_trip_multiple_options(request: MultipleOptionsRequest):
     - Opção 2: Melhor Custo-Benefício (equilibrada)
     - Opção 3: Mais Rápida e Confortável (menos tempo/escalas)
     """
-    if not os.path.exists(JSON_PATH):
-        raise HTTPException(status_code=500, detail="Database file not found")
+    with medir_requisicao("optimize-multiple") as etapas:
+        snapshot, chave, result = carregar_e_consultar_cache("optimize-multiple", request)
+        if result is None:
+            request_data, model_params = preparar_com_etapa(request, snapshot)
+            result = resolver_multiplas(request, snapshot, request_data, model_params, chave)
 
-    # 1. Carrega dados do banco
-    try:
-        V, F, DEP, DUR, C, C_hotel, C_food, C_transfer = parse_db_to_model_inputs(
-            JSON_PATH, 
-            user_start_date=request.data_ida
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error parsing database: {str(e)}")
+    return com_etapas(result, etapas) if request.incluir_etapas else result
 
-    # 2. Validações básicas
-    if request.ida_volta:
-        raise HTTPException(
-            status_code=501,
-            detail="Round trip (ida_volta=True) not currently supported."
-        )
 
-    origin = request.origem
-    dest = request.destino
+def evento_sse(evento: str, dados) -> str:
+    return f"event: {evento}\ndata: {json.dumps(jsonable_encoder(dados), ensure_ascii=False)}\n\n"
 
-    if origin not in V:
-        raise HTTPException(status_code=400, detail=f"Origin {origin} not found in database")
-    if dest not in V:
-        raise HTTPException(status_code=400, detail=f"Destination {dest} not found in database")
 
-    # 3. Dias
-    total_days_requested = sum(request.dias_por_cidade.values())
-    D_total = float(total_days_requested)
+@app.post("/optimize-multiple/stream")
+def optimize_trip_multiple_options_stream(request: MultipleOptionsRequest):
+    """
+    Mesmo que /optimize-multiple, em Server-Sent Events:
+    - event "opcao": cada opção assim que o seu cenário termina
+    - event "final": opções reclassificadas (pontuação/ranking) e recomendação
+    """
+    snapshot = carregar_database()
+
+    chave = chave_cache("optimize-multiple", request, snapshot)
+    result = cache_resultados.get(chave)
+    if result is not None:
+        eventos = [("opcao", opcao) for opcao in result["opcoes"]] + [("final", result)]
+        return StreamingResponse(
+            (evento_sse(e, d) for e, d in eventos), media_type="text/event-stream"
+        )
 
-    d_min = {i: 0.0 for i in V}
-    d_max = {i: D_total for i in V}
+    request_data, model_params = preparar_otimizacao(request, snapshot)
+
+    def transmitir():
+        for evento, dados in gerar_multiplas_opcoes_stream(
+            request_data=request_data,
+            db=snapshot.data,
+            model_params=model_params,
+            num_opcoes=request.numero_opcoes,
+            deadline=request.prazo_segundos or DEADLINE_PADRAO,
+            flight_index=snapshot.derivado("flight_index", FlightIndex)
+        ):
+            if evento == "final" and dados["opcoes"] and resposta_cacheavel(dados):
+                cache_resultados.put(chave, dados)
+            yield evento_sse(evento, dados)
+
+    return StreamingResponse(
+        transmitir(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-    cities_to_force_visit = set(request.locais_visitar)
 
-    for city, days in request.dias_por_cidade.items():
-        if city in V:
-            d_min[city] = float(days)
-            d_max[city] = float(days)
-            if days > 0:
-                cities_to_force_visit.add(city)
+# =========================
+# Modo job (não bloqueante)
+# =========================
 
-    # 4. Custos
-    C_hotel_eff = C_hotel.copy() if request.incluir_hospedagem else {i: 0.0 for i in V}
-    C_food_eff = C_food.copy() if request.incluir_refeicao else {i: 0.0 for i in V}
-    C_transfer_eff = C_transfer.copy() if request.incluir_transporte else {i: 0.0 for i in V}
+def enfileirar(tipo: str, resolver, request: TripRequest):
+    """
+    Valida a requisição na hora (erros 4xx imediatos) e enfileira o solve
+    Cache hit vira um job já concluído; fila cheia responde 429 + Retry-After
+    Síncrona (carga do banco, compilação, parse): os endpoints que a chamam
+    são def, para o FastAPI rodá-los no threadpool e não no event loop
+    """
+    snapshot = carregar_database()
+
+    chave = chave_cache(tipo, request, snapshot)
+    resultado = cache_resultados.get(chave)
+    if resultado is not None:
+        job = fila_jobs.concluido(tipo, resultado)
+    else:
+        request_data, model_params = preparar_otimizacao(request, snapshot)
+
+        def executar(job):
+            # Etapas medidas na thread do job (a partir do início da execução)
+            with medir_requisicao(f"jobs/{tipo}") as etapas:
+                resultado = resolver(request, snapshot, request_data, model_params, chave, job)
+            return com_etapas(resultado, etapas) if request.incluir_etapas else resultado
+
+        try:
+            job = fila_jobs.submeter(tipo, executar)
+        except FilaCheia as e:
+            raise HTTPException(
+                status_code=429,
+                detail="Optimization queue is full, try again later",
+                headers={"Retry-After": str(e.retry_after)}
+            )
+
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job.id, "status": job.status, "url": f"/jobs/{job.id}"}
+    )
 
-    # 5. Passageiros
-    nA = request.numero_adultos
-    nC = request.numero_criancas
-    alpha = 0.75
 
-    # 6. Parâmetros adicionais
-    TMAX = 48.0
+@app.post("/jobs/optimize", status_code=202)
+def enqueue_optimize(request: TripRequest):
+    """Enfileira /optimize e retorna o id do job"""
+    return enfileirar("optimize", resolver_otimizacao, request)
 
-    # 7. Preparar parâmetros do modelo
-    model_params = {
-        'V': V,
-        'origin': origin,
-        'dest': dest,
-        'F': F,
-        'DEP': DEP,
-        'DUR': DUR,
-        'C': C,
-        'tau': 24.0,
-        'D_total': D_total,
-        'TMAX': TMAX,
-        'd_min': d_min,
-        'd_max': d_max,
-        'C_hotel': C_hotel_eff,
-        'C_food': C_food_eff,
-        'nA': nA,
-        'nC': nC,
-        'alpha': alpha,
-        'C_transfer': C_transfer_eff,
-    }
 
-    # 8. Carregar database completo
-    with open(JSON_PATH, "r", encoding="utf-8") as f:
-        db = json.load(f)
+@app.post("/jobs/optimize-multiple", status_code=202)
+def enqueue_optimize_multiple(request: MultipleOptionsRequest):
+    """Enfileira /optimize-multiple e retorna o id do job"""
+    return enfileirar("optimize-multiple", resolver_multiplas, request)
 
-    # 9. Preparar dados da requisição
-    request_data = {
-        'origem': origin,
-        'destino': dest,
-        'data_ida': request.data_ida,
-        'locais_visitar': list(cities_to_force_visit)
-    }
 
-    # 10. Gerar múltiplas opções
-    result = gerar_multiplas_opcoes(
-        request_data=request_data,
-        db=db,
-        model_params=model_params,
-        build_result_func=build_front_json_from_solution,
-        num_opcoes=request.numero_opcoes
-    )
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status do job (pendente, executando, concluido, erro) e resultado parcial/final"""
+    job = fila_jobs.obter(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.to_dict()
 
-    return result
+
+@app.get("/jobs-stats")
+async def get_jobs_stats():
+    """Ocupação da fila de jobs"""
+    return fila_jobs.estatisticas()
@@ -0,0 +1,137 @@
+"""
+Benchmark do big-M das restrições de sequenciamento (Seq_depart/Seq_arrive)
+Resolve as mesmas requisições com o bigM global antigo
+(max(DEP+DUR) + tau*D_total + 10 sobre os voos mantidos) e com o big-M por
+voo de sequencing_big_m, em redes sintéticas (benchmark_escala) ou no
+database.json, e compara custo, limite da relaxação linear na raiz,
+nós enumerados e tempo de solve do CBC (lidos do log do CBC).
+
+Uso:
+    python benchmark_bigm.py [--cidades 12,24] [--dias 20] [--voos-por-arco 2]
+        [--perfis uma_cidade,tres_cidades] [--requisicoes N] [--database]
+        [--cenarios N] [--timeout SEG] [--seed S]
+
+--database: usa os cenários do benchmark_modelos sobre o database.json
+"""
+
+import argparse
+import json
+import os
+import re
+import tempfile
+import time
+
+from pulp import LpStatus, PULP_CBC_CMD
+
+from benchmark_escala import PERFIS, gerar_banco, gerar_requisicoes, _lista_int
+from benchmark_modelos import JSON_PATH, gerar_cenarios, montar_params
+from import_export_json import compilar_voos
+from model_engines import construir_modelo
+from otm_model import prune_for_request
+
+
+def big_m_global(params):
+    """
+    bigM único de antes: horizonte dos voos mantidos pela poda + estadia máxima
+    """
+    tau, D_total = params['tau'], params['D_total']
+    F, _ = prune_for_request(params['F'], params['DEP'], params['DUR'], params['C'],
+                             params['origin'], params['dest'], tau=tau, D_total=D_total,
+                             TMAX=params['TMAX'], d_min=params['d_min'])
+    DEP, DUR = params['DEP'], params['DUR']
+    fim = max((DEP[(i, j, f)] + DUR[(i, j, f)] for (i, j), fs in F.items() if i != j for f in fs),
+              default=0.0)
+    return fim + tau * D_total + 10.0
+
+
+def _ler_log(caminho):
+    with open(caminho, encoding="utf-8", errors="replace") as f:
+        texto = f.read()
+    raiz = re.search(r"Continuous objective value is\s+(-?[\d.e+]+)", texto)
+    nos = re.search(r"Enumerated nodes:\s+(\d+)", texto)
+    return (float(raiz.group(1)) if raiz else None, int(nos.group(1)) if nos else None)
+
+
+def resolver(params, locais_visitar, bigM, timeout):
+    """
+    Monta (motor mtz) e resolve no CBC com o bigM dado (None = por voo)
+    """
+    fd, log = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    try:
+        with construir_modelo("mtz", dict(params, bigM=bigM), locais_visitar) as model:
+            inicio = time.perf_counter()
+            model.solve(PULP_CBC_CMD(msg=False, timeLimit=timeout, logPath=log))
+            solve_s = time.perf_counter() - inicio
+            status = LpStatus[model.status]
+            custo = model.objective.value() if status == "Optimal" else None
+        raiz, nos = _ler_log(log)
+    finally:
+        os.remove(log)
+
+    return {"status": status, "custo": custo, "lp_raiz": raiz, "nos": nos, "solve_s": solve_s}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=_lista_int, default=[12, 24])
+    parser.add_argument("--dias", type=int, default=20)
+    parser.add_argument("--voos-por-arco", type=int, default=2)
+    parser.add_argument("--perfis", default="uma_cidade,tres_cidades")
+    parser.add_argument("--requisicoes", type=int, default=3, help="requisições por perfil")
+    parser.add_argument("--database", action="store_true")
+    parser.add_argument("--cenarios", type=int, default=10)
+    parser.add_argument("--timeout", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    perfis = [p for p in args.perfis.split(",") if p]
+    for p in perfis:
+        if p not in PERFIS:
+            parser.error(f"perfil desconhecido: {p}. Opções: {', '.join(PERFIS)}")
+
+    casos = []
+    if args.database:
+        with open(JSON_PATH, "r", encoding="utf-8") as f:
+            db = json.load(f)
+        compilado = compilar_voos(db)
+        casos = [("database", db, compilado, c) for c in gerar_cenarios(db, args.cenarios, args.seed)]
+    else:
+        for n_cidades in args.cidades:
+            db = gerar_banco(n_cidades, args.dias, args.voos_por_arco, seed=args.seed)
+            compilado = compilar_voos(db)
+            for perfil in perfis:
+                casos += [(f"{n_cidades}c {perfil}", db, compilado, r)
+                          for r in gerar_requisicoes(db, perfil, args.requisicoes, args.dias, args.seed)]
+
+    totais = {v: {"solve_s": 0.0, "nos": 0, "otimos": 0} for v in ("global", "por_voo")}
+    divergencias = 0
+
+    print(f"{'requisição':<40} {'big-M':<8} {'status':<11} {'custo':>10} {'LP raiz':>10} {'nós':>6} {'solve':>8}")
+    for rotulo, db, compilado, requisicao in casos:
+        params = montar_params(db, requisicao, compilado)
+        nome = f"{rotulo} {requisicao['origem']}->{requisicao['destino']} {requisicao['data_ida']}"
+
+        custos = set()
+        for variante, bigM in (("global", big_m_global(params)), ("por_voo", None)):
+            r = resolver(params, requisicao["locais_visitar"], bigM, args.timeout)
+            totais[variante]["solve_s"] += r["solve_s"]
+            totais[variante]["nos"] += r["nos"] or 0
+            if r["custo"] is not None:
+                totais[variante]["otimos"] += 1
+                custos.add(round(r["custo"], 2))
+            custo = f"{r['custo']:.2f}" if r["custo"] is not None else "-"
+            raiz = f"{r['lp_raiz']:.2f}" if r["lp_raiz"] is not None else "-"
+            nos = r["nos"] if r["nos"] is not None else "-"
+            print(f"{nome:<40} {variante:<8} {r['status']:<11} {custo:>10} {raiz:>10} {nos:>6} {r['solve_s']:>7.2f}s")
+        if len(custos) > 1:
+            divergencias += 1
+
+    print("\nTotais")
+    for variante, t in totais.items():
+        print(f"  {variante:<8} ótimos={t['otimos']:<3} nós={t['nos']:<6} solve={t['solve_s']:.2f}s")
+    print(f"  requisições com custo ótimo divergente: {divergencias}")
+
+
+if __name__ == "__main__":
+    main()
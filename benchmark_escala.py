@@ -0,0 +1,241 @@
+"""
+Benchmark em redes de voos sintéticas (sem servidor)
+Gera bancos no formato do database.json com N cidades, D dias e K voos por
+arco por dia e mede cada etapa do pipeline por perfil de requisição:
+parse_db_to_model_inputs, construção do modelo, solve e
+build_front_json_from_solution, com tamanho do modelo, voos podados
+(janela de tempo / dominância) e memória.
+Saída: uma linha JSON por banco ("banco") e por requisição ("requisicao").
+
+Uso:
+    python benchmark_escala.py [--cidades 8,16,32] [--dias 20] [--voos-por-arco 1,2]
+        [--densidade 1.0] [--perfis direto,uma_cidade,tres_cidades] [--requisicoes N]
+        [--motor mtz] [--solver cbc] [--timeout SEG] [--seed S] [--memoria] [--saida arq.jsonl]
+
+--densidade: fração dos pares de cidades que têm voos
+--memoria:   pico de memória por etapa (tracemalloc; deixa as etapas mais lentas)
+"""
+
+import argparse
+import json
+import random
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+from benchmark_modelos import montar_params
+from flight_index import FlightIndex
+from import_export_json import compilar_voos, build_front_json_from_solution
+from model_engines import MODEL_ENGINES, DEFAULT_ENGINE, construir_modelo
+from solver_backends import SOLVER_BACKENDS, DEFAULT_BACKEND, resolver_modelo
+
+
+DATA_INICIAL = date(2026, 3, 1)
+
+# perfil -> número de cidades a visitar entre origem e destino
+PERFIS = {
+    "direto": 0,
+    "uma_cidade": 1,
+    "tres_cidades": 3,
+}
+
+
+def gerar_banco(n_cidades, n_dias, voos_por_arco, densidade=1.0, seed=0):
+    """
+    Banco sintético no esquema do database.json: n_cidades nós e, para cada
+    par (i, j) sorteado com probabilidade `densidade`, voos_por_arco voos por dia
+    """
+    rng = random.Random(seed)
+    cidades = [f"C{k:03d}" for k in range(n_cidades)]
+
+    nos = {
+        c: {
+            "nome": f"Cidade {c}",
+            "pais": "XX",
+            "custo_refeicao_diaria": round(rng.uniform(30, 120), 2),
+            "hotel_nome": f"Hotel {c}",
+            "custo_diaria_hotel": round(rng.uniform(60, 400), 2),
+            "transporte": {"transfer_ida_volta": round(rng.uniform(50, 500), 2)},
+        }
+        for c in cidades
+    }
+
+    arestas = []
+    for i in cidades:
+        for j in cidades:
+            if i == j or rng.random() > densidade:
+                continue
+            tempo_base = rng.randint(60, 720)
+            preco_base = rng.uniform(150, 2500)
+            for dia in range(n_dias):
+                data_voo = (DATA_INICIAL + timedelta(days=dia)).isoformat()
+                for k in range(voos_por_arco):
+                    minuto = rng.randrange(0, 24 * 60, 5)
+                    arestas.append({
+                        "origem": i,
+                        "destino": j,
+                        "data_voo": data_voo,
+                        "hora_saida": f"{minuto // 60:02d}:{minuto % 60:02d}",
+                        "custo_passagem": round(preco_base * rng.uniform(0.7, 1.5), 2),
+                        "tempo_voo": tempo_base + rng.randint(-15, 15),
+                        "cia": "XX",
+                        "voo_cod": f"XX{i[1:]}{j[1:]}{k}",
+                    })
+
+    return {
+        "metadata": {"inicio": f"{DATA_INICIAL.isoformat()} 00:00:00", "sintetico": True},
+        "nos": nos,
+        "arestas": arestas,
+    }
+
+
+def gerar_requisicoes(db, perfil, n, n_dias, seed=0):
+    """
+    n requisições do perfil (mesmo formato dos cenários do benchmark_modelos)
+    """
+    rng = random.Random(seed)
+    cidades = list(db["nos"].keys())
+    n_visitar = min(PERFIS[perfil], len(cidades) - 2)
+    # Deixa folga no fim do período para a viagem caber
+    datas = [(DATA_INICIAL + timedelta(days=d)).isoformat() for d in range(max(1, n_dias - 8))]
+
+    requisicoes = []
+    for _ in range(n):
+        origem, destino = rng.sample(cidades, 2)
+        visitar = rng.sample([c for c in cidades if c not in (origem, destino)], n_visitar)
+        requisicoes.append({
+            "origem": origem,
+            "destino": destino,
+            "data_ida": rng.choice(datas),
+            "locais_visitar": visitar,
+            "dias_por_cidade": {c: rng.randint(1, 2) for c in visitar + [destino]},
+        })
+    return requisicoes
+
+
+class Etapas:
+    """
+    Cronômetro por etapa, com pico de memória (tracemalloc) opcional
+    """
+
+    def __init__(self, memoria=False):
+        self.memoria = memoria
+        self.tempos = {}
+        self.picos_kb = {}
+
+    def medir(self, nome, funcao, *args, **kwargs):
+        if self.memoria:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        resultado = funcao(*args, **kwargs)
+        self.tempos[nome] = round(time.perf_counter() - inicio, 6)
+        if self.memoria:
+            self.picos_kb[nome] = round((tracemalloc.get_traced_memory()[1] - base) / 1024, 1)
+        return resultado
+
+
+def rss_max_kb():
+    # ru_maxrss: KB no Linux, bytes no macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def executar_requisicao(db, compilado, index, requisicao, motor, solver, timeout, memoria):
+    etapas = Etapas(memoria)
+    params = etapas.medir("parse", montar_params, db, requisicao, compilado)
+
+    # construir_modelo é um context manager: "build" mede só a montagem (__enter__)
+    contexto = construir_modelo(motor, params, requisicao["locais_visitar"])
+    model = etapas.medir("build", contexto.__enter__)
+    try:
+        status = etapas.medir("solve", resolver_modelo, model, time_limit=timeout, backend=solver)
+        resposta = None
+        if status == "Optimal":
+            resposta = etapas.medir(
+                "export", build_front_json_from_solution,
+                model, db, requisicao["origem"], requisicao["destino"], index=index
+            )
+        variaveis, restricoes = len(model.variables()), len(model.constraints)
+        poda = getattr(model, "pruning", None)
+    finally:
+        contexto.__exit__(None, None, None)
+
+    return {
+        "status": status,
+        "custo": resposta["custos"]["total"] if resposta else None,
+        "variaveis": variaveis,
+        "restricoes": restricoes,
+        "voos_podados": poda,
+        "tempos_s": etapas.tempos,
+        "memoria_kb": etapas.picos_kb if memoria else None,
+    }
+
+
+def _lista_int(texto):
+    return [int(v) for v in texto.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cidades", type=_lista_int, default=[8, 16, 32])
+    parser.add_argument("--dias", type=int, default=20)
+    parser.add_argument("--voos-por-arco", type=_lista_int, default=[1])
+    parser.add_argument("--densidade", type=float, default=1.0)
+    parser.add_argument("--perfis", default=",".join(PERFIS))
+    parser.add_argument("--requisicoes", type=int, default=3, help="requisições por perfil")
+    parser.add_argument("--motor", choices=list(MODEL_ENGINES), default=DEFAULT_ENGINE)
+    parser.add_argument("--solver", choices=list(SOLVER_BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("--timeout", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--memoria", action="store_true")
+    parser.add_argument("--saida", help="arquivo JSON Lines (padrão: stdout)")
+    args = parser.parse_args()
+
+    perfis = [p for p in args.perfis.split(",") if p]
+    for p in perfis:
+        if p not in PERFIS:
+            parser.error(f"perfil desconhecido: {p}. Opções: {', '.join(PERFIS)}")
+
+    saida = open(args.saida, "w", encoding="utf-8") if args.saida else sys.stdout
+    if args.memoria:
+        tracemalloc.start()
+
+    def emitir(registro):
+        saida.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        saida.flush()
+
+    try:
+        for n_cidades in args.cidades:
+            for voos_por_arco in args.voos_por_arco:
+                rede = {"cidades": n_cidades, "dias": args.dias, "voos_por_arco": voos_por_arco,
+                        "densidade": args.densidade}
+
+                etapas = Etapas(args.memoria)
+                db = etapas.medir("gerar", gerar_banco, n_cidades, args.dias, voos_por_arco,
+                                  args.densidade, args.seed)
+                compilado = etapas.medir("compilar", compilar_voos, db)
+                index = etapas.medir("indice", FlightIndex, db)
+                emitir(dict(tipo="banco", **rede, arestas=len(db["arestas"]), tempos_s=etapas.tempos,
+                            memoria_kb=etapas.picos_kb if args.memoria else None, rss_max_kb=rss_max_kb()))
+
+                for perfil in perfis:
+                    requisicoes = gerar_requisicoes(db, perfil, args.requisicoes, args.dias, args.seed)
+                    for requisicao in requisicoes:
+                        r = executar_requisicao(db, compilado, index, requisicao, args.motor,
+                                                args.solver, args.timeout, args.memoria)
+                        emitir(dict(
+                            tipo="requisicao", **rede, perfil=perfil,
+                            origem=requisicao["origem"], destino=requisicao["destino"],
+                            data_ida=requisicao["data_ida"], locais_visitar=requisicao["locais_visitar"],
+                            motor=args.motor, solver=args.solver, **r, rss_max_kb=rss_max_kb()
+                        ))
+    finally:
+        if saida is not sys.stdout:
+            saida.close()
+
+
+if __name__ == "__main__":
+    main()
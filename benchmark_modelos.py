@@ -0,0 +1,140 @@
+"""
+Comparação entre os motores de modelagem (MTZ x rede expandida no tempo)
+Resolve os mesmos cenários do database.json com cada motor e imprime
+status, custo, tempo de solução e tamanho do modelo
+
+Uso:
+    python benchmark_modelos.py [--cenarios N] [--seed S] [--timeout SEG] [--solver cbc|cpsat] [--warm-start]
+
+--warm-start: parte da solução do guloso com estadias (MTZ e rede expandida no tempo)
+"""
+
+import argparse
+import json
+import random
+import time
+
+from import_export_json import parse_db_to_model_inputs, compilar_voos
+from model_engines import MODEL_ENGINES, construir_modelo
+from solver_backends import SOLVER_BACKENDS, DEFAULT_BACKEND, resolver_modelo
+from warm_start import aplicar_warm_start, guloso_com_estadias
+
+JSON_PATH = "database.json"
+
+
+def gerar_cenarios(db, n, seed=0):
+    """
+    Sorteia n requisições (origem, destino, data, cidades intermediárias, dias)
+    """
+    rng = random.Random(seed)
+    cidades = list(db["nos"].keys())
+    datas = sorted(set(a["data_voo"] for a in db["arestas"]))
+    # Deixa folga no fim do período para a viagem caber
+    datas = datas[:max(1, len(datas) - 8)]
+
+    cenarios = []
+    for _ in range(n):
+        origem, destino = rng.sample(cidades, 2)
+        restantes = [c for c in cidades if c not in (origem, destino)]
+        visitar = rng.sample(restantes, rng.randint(0, min(3, len(restantes))))
+        dias = {c: rng.randint(1, 3) for c in visitar + [destino]}
+        cenarios.append({
+            "origem": origem,
+            "destino": destino,
+            "data_ida": rng.choice(datas),
+            "locais_visitar": visitar,
+            "dias_por_cidade": dias,
+        })
+    return cenarios
+
+
+def montar_params(db, cenario, compilado=None):
+    V, F, DEP, DUR, C, C_hotel, C_food, C_transfer = parse_db_to_model_inputs(
+        db=db, user_start_date=cenario["data_ida"], compilado=compilado
+    )
+    D_total = float(sum(cenario["dias_por_cidade"].values()))
+    d_min = {i: 0.0 for i in V}
+    d_max = {i: D_total for i in V}
+    for city, days in cenario["dias_por_cidade"].items():
+        d_min[city] = float(days)
+        d_max[city] = float(days)
+
+    return {
+        'V': V, 'origin': cenario["origem"], 'dest': cenario["destino"],
+        'F': F, 'DEP': DEP, 'DUR': DUR, 'C': C,
+        'tau': 24.0, 'D_total': D_total, 'TMAX': 48.0,
+        'd_min': d_min, 'd_max': d_max,
+        'C_hotel': C_hotel, 'C_food': C_food, 'C_transfer': C_transfer,
+        'nA': 1, 'nC': 0, 'alpha': 0.75,
+    }
+
+
+def resolver(motor, params, locais_visitar, timeout, solver, warm_start=False):
+    t_build = time.time()
+    with construir_modelo(motor, params, locais_visitar) as model:
+        if warm_start:
+            candidatos = [guloso_com_estadias(params, locais_visitar, criterio) for criterio in ("custo", "chegada")]
+            warm_start = aplicar_warm_start(model, params, [legs for legs in candidatos if legs])
+        t_build = time.time() - t_build
+
+        t_solve = time.time()
+        status = resolver_modelo(model, time_limit=timeout, backend=solver, warm_start=warm_start)
+        t_solve = time.time() - t_solve
+
+        return {
+            "status": status,
+            "custo": model.objective.value() if status == "Optimal" else None,
+            "build_s": t_build,
+            "solve_s": t_solve,
+            "variaveis": len(model.variables()),
+            "restricoes": len(model.constraints),
+            "warm_start": warm_start,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cenarios", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=int, default=60)
+    parser.add_argument("--solver", choices=list(SOLVER_BACKENDS), default=DEFAULT_BACKEND)
+    parser.add_argument("--warm-start", action="store_true")
+    args = parser.parse_args()
+
+    with open(JSON_PATH, "r", encoding="utf-8") as f:
+        db = json.load(f)
+
+    totais = {motor: {"build_s": 0.0, "solve_s": 0.0, "otimos": 0, "warm": 0} for motor in MODEL_ENGINES}
+    divergencias = 0
+
+    print(f"{'cenário':<34} {'motor':<14} {'status':<11} {'custo':>10} {'vars':>6} {'rest':>6} {'build':>7} {'solve':>7}")
+    compilado = compilar_voos(db)
+    for cenario in gerar_cenarios(db, args.cenarios, args.seed):
+        params = montar_params(db, cenario, compilado)
+        nome = f"{cenario['origem']}->{cenario['destino']} {cenario['data_ida']} +{len(cenario['locais_visitar'])}"
+
+        custos = set()
+        for motor in MODEL_ENGINES:
+            r = resolver(motor, params, cenario["locais_visitar"], args.timeout, args.solver,
+                         args.warm_start)
+            totais[motor]["build_s"] += r["build_s"]
+            totais[motor]["warm"] += int(r["warm_start"])
+            totais[motor]["solve_s"] += r["solve_s"]
+            if r["custo"] is not None:
+                totais[motor]["otimos"] += 1
+                custos.add(round(r["custo"], 2))
+            custo = f"{r['custo']:.2f}" if r["custo"] is not None else "-"
+            print(f"{nome:<34} {motor:<14} {r['status']:<11} {custo:>10} {r['variaveis']:>6} "
+                  f"{r['restricoes']:>6} {r['build_s']:>6.2f}s {r['solve_s']:>6.2f}s")
+        if len(custos) > 1:
+            divergencias += 1
+
+    print("\nTotais")
+    for motor, t in totais.items():
+        print(f"  {motor:<14} ótimos={t['otimos']:<3} warm start={t['warm']:<3} "
+              f"build={t['build_s']:.2f}s solve={t['solve_s']:.2f}s")
+    print(f"  cenários com custo ótimo divergente: {divergencias}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Solver de caminho mínimo com recursos (label-setting) para itinerários simples
+Resolve exatamente, sem MILP, as requisições origem -> destino sem cidades
+intermediárias obrigatórias e com dias fixos apenas nas pontas
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+from otm_model import prune_for_request
+
+
+EPS = 1e-9
+
+
+def caminho_minimo_aplicavel(model_params: Dict, locais_visitar: List[str]) -> bool:
+    """
+    True quando a requisição tem o formato "simples":
+    - nenhuma cidade intermediária obrigatória
+    - só origem/destino com dias mínimos, e esses mínimos somam D_total
+
+    Nesse caso as cidades intermediárias ficam com 0 dias e o modelo
+    se reduz a um caminho mínimo dependente do tempo com limite TMAX.
+    """
+    V = model_params['V']
+    origin, dest = model_params['origin'], model_params['dest']
+
+    if any(local in V and local not in (origin, dest) for local in locais_visitar):
+        return False
+
+    d_min = model_params.get('d_min') or {}
+    D_total = model_params.get('D_total', 7.0)
+
+    if any(d_min.get(i, 0.0) > EPS for i in V if i not in (origin, dest)):
+        return False
+
+    # Os mínimos das pontas já consomem D_total: ninguém mais pode ter dias
+    dias_pontas = d_min.get(origin, 0.0) + d_min.get(dest, 0.0)
+    return abs(dias_pontas - D_total) <= EPS
+
+
+def _domina(a: Tuple, b: Tuple) -> bool:
+    """
+    Rótulo a = (chegada, custo, tempo_voo, visitados, ...) domina b
+    """
+    return a[0] <= b[0] and a[1] <= b[1] + EPS and a[2] <= b[2] + EPS and (a[3] & b[3]) == a[3]
+
+
+def resolver_caminho_minimo(
+    V, origin, dest, F, DEP, DUR, C,
+    tau=24.0, D_total=7.0, TMAX=15.0,
+    d_min=None, d_max=None,
+    C_hotel=None, C_food=None,
+    nA=1, nC=0, alpha=1.0,
+    C_transfer=None,
+    prune=True, horizon_slack=None,
+    dominance=True,
+    **_
+) -> Optional[Dict]:
+    """
+    Label-setting sobre os voos ordenados por horário de saída
+
+    Cada rótulo guarda (chegada, custo, tempo de voo, cidades visitadas, voos).
+    Um voo i->j só estende rótulos de i que chegaram até a saída do voo
+    (na origem, após tau*d_origem), não revisita cidades e respeita TMAX.
+    Rótulos dominados em chegada/custo/tempo de voo/visitadas são descartados.
+
+    Recebe os mesmos model_params do MILP (mesma poda de voos) e retorna
+    {"chosen": [(i, j, fid)], "dias": {cidade: diárias}, "custo": total}
+    ou None se não houver itinerário viável.
+    """
+    if d_min is None: d_min = {i: 0.0 for i in V}
+    if C_hotel is None: C_hotel = {i: 0.0 for i in V}
+    if C_food is None: C_food = {i: 0.0 for i in V}
+    if C_transfer is None: C_transfer = {i: 0.0 for i in V}
+
+    F, _ = prune_for_request(F, DEP, DUR, C, origin, dest, prune=prune, dominance=dominance,
+                             tau=tau, D_total=D_total, TMAX=TMAX, d_min=d_min,
+                             horizon_slack=horizon_slack)
+
+    bit = {c: 1 << n for n, c in enumerate(V)}
+    flights = sorted(
+        (DEP[(i, j, f)], i, j, f)
+        for (i, j), fs in F.items() if i != j and j != origin and i != dest
+        for f in fs
+    )
+
+    # Partida: na origem em t=0, liberado para voar após a estadia fixa
+    saida_origem = tau * d_min.get(origin, 0.0)
+    labels: Dict[str, List[Tuple]] = {c: [] for c in V}
+    labels[origin].append((saida_origem, 0.0, 0.0, bit[origin], None))
+
+    melhor = None
+    for dep, i, j, f in flights:
+        if not labels[i]:
+            continue
+        dur = DUR[(i, j, f)]
+        custo_voo = C[(i, j, f)] + (C_transfer[j] if j != dest else 0.0)
+
+        for chegada, custo, tempo, visitados, voos in labels[i]:
+            if chegada > dep + EPS or visitados & bit[j] or tempo + dur > TMAX + EPS:
+                continue
+
+            novo = (dep + dur, custo + custo_voo, tempo + dur, visitados | bit[j], ((i, j, f), voos))
+
+            if j == dest:
+                if melhor is None or novo[1] < melhor[1] - EPS:
+                    melhor = novo
+                continue
+
+            if any(_domina(l, novo) for l in labels[j]):
+                continue
+            labels[j] = [l for l in labels[j] if not _domina(novo, l)]
+            labels[j].append(novo)
+
+    if melhor is None:
+        return None
+
+    chosen = []
+    voos = melhor[4]
+    while voos is not None:
+        chosen.append(voos[0])
+        voos = voos[1]
+    chosen.reverse()
+
+    # Dias: tudo nas pontas (intermediárias ficam com 0)
+    food_factor = nA + alpha * nC
+    dias = {i: 0 for i in V}
+    custo_fixo = 0.0
+    for i in (origin, dest):
+        dias[i] = int(math.ceil(d_min.get(i, 0.0) - EPS))
+        custo_fixo += (C_hotel[i] + C_food[i] * food_factor) * dias[i] + C_transfer[i]
+
+    return {"chosen": chosen, "dias": dias, "custo": melhor[1] + custo_fixo}
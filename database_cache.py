@@ -0,0 +1,133 @@
+"""
+Cache do banco de voos compartilhado por todo o processo
+Carrega o database.json uma única vez e só recarrega quando o arquivo muda
+Arquivos .otmb (formato colunar de import_export_json) são abertos via mmap
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from import_export_json import load_db_columnar
+
+
+COLUNAR_EXT = ".otmb"
+
+
+class DatabaseSnapshot:
+    """
+    Versão carregada do banco de dados (somente leitura)
+
+    - data: dict no mesmo formato do database.json
+    - version: hash SHA-256 do conteúdo do arquivo
+    - derivado(): estruturas calculadas uma vez por versão (índices, datas, etc.)
+    """
+
+    def __init__(self, path: str, data: Dict, version: str, stat_key: Tuple[int, int]):
+        self.path = path
+        self.data = data
+        self.version = version
+        self.stat_key = stat_key
+        self.carregado_em = time.time()
+        self._derivados: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def derivado(self, nome: str, construir: Callable[[Dict], Any]) -> Any:
+        """
+        Retorna estrutura derivada do banco, construindo na primeira chamada
+        """
+        try:
+            return self._derivados[nome]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if nome not in self._derivados:
+                self._derivados[nome] = construir(self.data)
+            return self._derivados[nome]
+
+
+class DatabaseCache:
+    """
+    Mantém o último snapshot válido de um arquivo JSON
+
+    A cada get() só é feito um os.stat(); o arquivo é relido apenas se
+    mtime/tamanho mudarem, e re-parseado apenas se o hash do conteúdo mudar.
+    A troca de snapshot é atômica: quem já tem uma referência continua
+    usando a versão antiga até terminar.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._snapshot: Optional[DatabaseSnapshot] = None
+        self._lock = threading.Lock()
+        self.recargas = 0
+
+    def get(self) -> DatabaseSnapshot:
+        st = os.stat(self.path)
+        stat_key = (st.st_mtime_ns, st.st_size)
+
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.stat_key == stat_key:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.stat_key == stat_key:
+                return snapshot
+
+            try:
+                data, version = self._carregar(snapshot)
+            except ValueError:
+                # Arquivo sendo escrito / corrompido: continua servindo a versão anterior
+                if snapshot is not None:
+                    return snapshot
+                raise
+
+            # Arquivo "tocado" mas com o mesmo conteúdo: mantém o snapshot
+            if snapshot is not None and snapshot.version == version:
+                snapshot.stat_key = stat_key
+                return snapshot
+
+            novo = DatabaseSnapshot(self.path, data, version, stat_key)
+            self._snapshot = novo
+            self.recargas += 1
+            return novo
+
+
+    def _carregar(self, snapshot: Optional[DatabaseSnapshot]) -> Tuple[Any, str]:
+        """
+        (dados, hash) do arquivo: .otmb abre o formato colunar via mmap
+        (sem parse; substitua o arquivo com rename, não reescrevendo no lugar),
+        qualquer outro é lido como JSON
+        """
+        if self.path.endswith(COLUNAR_EXT):
+            data = load_db_columnar(self.path)
+            return data, data.versao()
+
+        with open(self.path, "rb") as f:
+            raw = f.read()
+        version = hashlib.sha256(raw).hexdigest()
+        if snapshot is not None and snapshot.version == version:
+            return snapshot.data, version
+        return json.loads(raw), version
+
+
+_caches: Dict[str, DatabaseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_database(path: str) -> DatabaseSnapshot:
+    """
+    Retorna o snapshot atual do banco em `path` (cache por processo)
+    Lança FileNotFoundError se o arquivo não existir
+    """
+    chave = os.path.abspath(path)
+    cache = _caches.get(chave)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.setdefault(chave, DatabaseCache(chave))
+    return cache.get()
@@ -1,328 +1,661 @@
-import os
-import json
-import time
-import requests
-import random
-import re
-from bs4 import BeautifulSoup
-from amadeus import Client
-from dotenv import load_dotenv
-from unidecode import unidecode
-from datetime import datetime, timedelta
-
-# --- CONFIGURAÇÃO ---
-load_dotenv()
-AMADEUS_ID = os.getenv("AMADEUS_CLIENT_ID")
-AMADEUS_SECRET = os.getenv("AMADEUS_CLIENT_SECRET")
-
-HOJE = datetime.now()
-DATA_INICIO = HOJE + timedelta(days=60)
-DIAS_PARA_COLETAR = 20 
-
-print(f"Configuração: {DATA_INICIO.strftime('%d/%m')} a {(DATA_INICIO + timedelta(days=DIAS_PARA_COLETAR)).strftime('%d/%m')}")
-
-CIDADES = [
-    # Numbeo URL  deve ser exato (ex: New-Orleans)
-    {'code': 'GYN', 'nome': 'Goiania', 'pais': 'BR', 'city_name': 'Goiania', 'country': 'BR', 'numbeo': 'Goiania'},
-    {'code': 'GRU', 'nome': 'Sao Paulo', 'pais': 'BR', 'city_name': 'Sao Paulo', 'country': 'BR', 'numbeo': 'Sao-Paulo'},
-    {'code': 'BSB', 'nome': 'Brasilia', 'pais': 'BR', 'city_name': 'Brasilia', 'country': 'BR', 'numbeo': 'Brasilia'},
-    {'code': 'ATL', 'nome': 'Atlanta', 'pais': 'US', 'city_name': 'Atlanta', 'country': 'US', 'numbeo': 'Atlanta'},
-    {'code': 'ORD', 'nome': 'Chicago', 'pais': 'US', 'city_name': 'Chicago', 'country': 'US', 'numbeo': 'Chicago'},
-    {'code': 'MSY', 'nome': 'New Orleans', 'pais': 'US', 'city_name': 'New Orleans', 'country': 'US', 'numbeo': 'New-Orleans'},
-    {'code': 'MIA', 'nome': 'Miami', 'pais': 'US', 'city_name': 'Miami', 'country': 'US', 'numbeo': 'Miami'},
-    {'code': 'JFK', 'nome': 'Nova York', 'pais': 'US', 'city_name': 'New York', 'country': 'US', 'numbeo': 'New-York'}
-]
-
-HOTEIS_BACKUP_REAL = {
-    'GYN': {'nome': 'Rede Andrade Goiania Centro', 'diaria': 149.00},
-    'GRU': {'nome': 'Attriun Hotel', 'diaria': 220.00},
-    'BSB': {'nome': 'Hotel Helly', 'diaria': 261.00},
-    'ATL': {'nome': 'Hyatt Regency Atlanta', 'diaria': 950.00},
-    'ORD': {'nome': 'Palmer House Hilton', 'diaria': 890.00},
-    'MSY': {'nome': 'Hotel Monteleone', 'diaria': 1100.00}
-}
-COMIDA_BACKUP_REAL = {'GYN': 60.0, 'GRU': 80.0, 'BSB': 75.0, 'ATL': 250.0, 'ORD': 280.0, 'MSY': 260.0}
-
-def get_cotacao_moedas():
-    try:
-        req = requests.get('https://economia.awesomeapi.com.br/last/USD-BRL,EUR-BRL')
-        d = req.json()
-        return {'USD': float(d['USDBRL']['bid']), 'EUR': float(d['EURBRL']['bid']), 'BRL': 1.0}
-    except: return {'USD': 6.0, 'EUR': 6.5, 'BRL': 1.0}
-
-# --- FUNÇÃO AUXILIAR DE LIMPEZA ---
-def limpar_valor_numbeo(texto):
-    try:
-        texto_limpo = unidecode(texto) 
-        nums = ''.join([c for c in texto_limpo if c.isdigit() or c in ['.', ',']])
-        
-        if ',' in nums and '.' in nums: 
-            return float(nums.replace(',', ''))
-        elif ',' in nums and '.' not in nums:
-            return float(nums.replace(',', '.'))
-            
-        return float(nums)
-    except:
-        return 0.0
-
-# --- CRAWLER NUMBEO (2 REFEIÇÕES) ---
-def crawler_custo_alimentacao(cidade_slug, cotacoes):
-    print(f"Scraping Alimentação Numbeo em {cidade_slug}...", end="")
-    time.sleep(random.uniform(10.0, 15.0)) 
-    
-    url = f"https://www.numbeo.com/cost-of-living/in/{cidade_slug}?displayCurrency=BRL"
-    
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-        "Referer": "https://www.google.com/"
-    }
-    
-    try:
-        resp = requests.get(url, headers=headers, timeout=15)
-        if resp.status_code != 200:
-            print(f" (Bloqueio {resp.status_code})")
-            return None
-            
-        soup = BeautifulSoup(resp.content, 'html.parser')
-        tabela = soup.find("table", {"class": "data_wide_table"})
-        
-        if not tabela:
-            print(" (Tabela não encontrada)")
-            return None
-            
-        preco_refeicao_economica = 0.0
-        
-        for row in tabela.find_all("tr"):
-            texto = row.text.lower()
-            if "inexpensive restaurant" in texto and "meal" in texto:
-                try:
-                    span_preco = row.find("span", class_="first_currency")
-                    if span_preco:
-                        preco_refeicao_economica = limpar_valor_numbeo(span_preco.text)
-                except: pass
-
-        if preco_refeicao_economica > 0:
-            #2 Refeições  (Almoço + Jantar)
-            total_diaria = preco_refeicao_economica * 2
-            print(f" Sucesso! (R$ {total_diaria:.2f}/dia - Econômico)")
-            return round(total_diaria, 2)
-            
-        print(" (Dados vazios)")
-        
-    except Exception as e:
-        print(f" [Erro: {e}]")
-        
-    return None
-
-# --- CRAWLER BOOKING (MENOR PREÇO ENTRE OS PRIMEIROS) ---
-def crawler_booking(cidade_nome, data_iso, cotacoes):
-    print(f"Scraping Booking em {cidade_nome}...", end="")
-    # Delay longo para evitar bloqueio
-    time.sleep(random.uniform(20.0, 35.0)) 
-    
-    try:
-        checkin = datetime.strptime(data_iso, "%Y-%m-%d")
-        checkout = checkin + timedelta(days=1)
-        url = "https://www.booking.com/searchresults.html"
-        params = { "ss": cidade_nome, "checkin_year": checkin.year, "checkin_month": checkin.month, "checkin_monthday": checkin.day, "checkout_year": checkout.year, "checkout_month": checkout.month, "checkout_monthday": checkout.day, "group_adults": 1, "no_rooms": 1, "selected_currency": "BRL" }
-        headers = { "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36", "Accept-Language": "pt-BR,pt;q=0.9" }
-        
-        resp = requests.get(url, params=params, headers=headers, timeout=10)
-        if resp.status_code != 200: 
-            print(f" (Bloqueio {resp.status_code})")
-            return None
-
-        soup = BeautifulSoup(resp.content, 'html.parser')
-        
-        # Pega TODOS os cartões da primeira página
-        cards = soup.find_all("div", {"data-testid": "property-card"})
-        if not cards: 
-            print(" (Sem dados)")
-            return None
-        
-        melhor_hotel = None
-        menor_preco = float('inf')
-        
-        count = 0
-        for card in cards:
-            if count >= 10: break
-            try:
-                # Extração do Preço
-                preco_el = card.find("span", {"data-testid": "price-and-discounted-price"}) or card.find("div", {"data-testid": "price-and-discounted-price"})
-                
-                if preco_el:
-                    texto = unidecode(preco_el.text.strip())
-                    nums = ''.join([c for c in texto if c.isdigit() or c == ','])
-                    
-                    valor = 0.0
-                    if ',' in nums and '.' in nums: valor = float(nums.replace(',', ''))
-                    elif ',' in nums and '.' not in nums: valor = float(nums.replace(',', '.'))
-                    else: valor = float(nums)
-                    
-                    if valor > 50.0:
-                        if valor < menor_preco:
-                            menor_preco = valor
-                            # Extração do Nome (Segura)
-                            nome_el = card.find("div", {"data-testid": "title"})
-                            nome_hotel = nome_el.text.strip() if nome_el else "Hotel Booking"
-                            melhor_hotel = {'nome': nome_hotel, 'diaria': valor}
-                        count += 1
-            except: continue
-        
-        if melhor_hotel:
-            print(f" Sucesso! {melhor_hotel['nome']} (R$ {melhor_hotel['diaria']:.2f})")
-            return melhor_hotel
-
-    except Exception as e:
-        print(f" [Erro: {e}]")
-    
-    return None
-
-# --- API TRANSFER ---
-def buscar_transfer_api(cidade_info, data_iso, amadeus, cotacoes):
-    print(f"Buscando transfer em {cidade_info['code']}...", end="")
-    try:
-        body = { "startLocationCode": cidade_info['code'], "endAddressLine": f"City Center {cidade_info['city_name']}", "endCityName": cidade_info['city_name'], "endCountryCode": cidade_info['country'], "passengers": 1, "startDateTime": f"{data_iso}T14:00:00" }
-        response = amadeus.post('/v1/shopping/transfer-offers', body)
-        if not response.data: 
-            print(" (Sem ofertas)")
-            return None
-        menor = float('inf')
-        for offer in response.data:
-            try:
-                val = float(offer['quotation']['monetaryAmount'])
-                moeda = offer['quotation']['currencyCode']
-                brl = val * cotacoes.get(moeda, cotacoes.get('USD', 1.0))
-                if brl < menor: menor = brl
-            except: continue
-        if menor == float('inf'): return None
-        print(f" Achou! R$ {menor:.2f}")
-        return round(menor, 2)
-    except: 
-        print(" [API Off]")
-        return None
-
-# --- ORQUESTRADOR DE DADOS LOCAIS ---
-def buscar_dados_locais_inteligentes(cidade, amadeus, cotacoes):
-    # 1. Hotel (API -> Crawler -> Cache)
-    print(f"Buscando hotel em {cidade['code']}...", end="")
-    hotel_res = None
-    try:
-        hoteis = amadeus.reference_data.locations.hotels.by_city.get(cityCode=cidade['code'])
-        if hoteis.data:
-            ids = [h['hotelId'] for h in hoteis.data[:2]]
-            offers = amadeus.shopping.hotel_offers_search.get(hotelIds=','.join(ids), adults='1', checkInDate=DATA_INICIO.strftime('%Y-%m-%d'), checkOutDate=(DATA_INICIO + timedelta(days=1)).strftime('%Y-%m-%d'))
-            if offers.data:
-                best = offers.data[0]
-                val = float(best['offers'][0]['price']['total'])
-                taxa = cotacoes.get(best['offers'][0]['price']['currency'], cotacoes.get('USD', 1.0))
-                if best['offers'][0]['price']['currency'] == 'USD': taxa = cotacoes['USD']
-                print(f" API OK ({best['hotel']['name']})")
-                hotel_res = {'nome': best['hotel']['name'], 'diaria': round(val * taxa, 2)}
-    except: pass
-    
-    if not hotel_res:
-        print("")
-        hotel_res = crawler_booking(cidade['nome'], DATA_INICIO.strftime('%Y-%m-%d'), cotacoes)
-    if not hotel_res:
-        hotel_res = HOTEIS_BACKUP_REAL.get(cidade['code'], {'nome': 'Hotel Padrão', 'diaria': 300.0})
-        print(f"   🛡️ Cache Hotel ({hotel_res['nome']})")
-
-    # 2. Comida (Crawler -> Cache)
-    print("")
-    custo_comida = crawler_custo_alimentacao(cidade['numbeo'], cotacoes)
-    if not custo_comida:
-        custo_comida = COMIDA_BACKUP_REAL.get(cidade['code'], 60.00)
-        print(f"Cache Comida (R$ {custo_comida:.2f})")
-
-    return hotel_res, custo_comida
-
-# --- BUSCA DE VOOS (COM HORÁRIO) ---
-def buscar_voo_detalhado(origem, destino, data_iso, amadeus, cotacoes):
-    try:
-        response = amadeus.shopping.flight_offers_search.get(originLocationCode=origem, destinationLocationCode=destino, departureDate=data_iso, adults=1, max=1)
-        if not response.data: return None
-        offer = response.data[0]
-        
-        # Preço
-        val = float(offer['price']['total'])
-        preco = round(val * cotacoes.get(offer['price']['currency'], cotacoes.get('USD', 6.0)), 2)
-        
-        # Segmentos e Horário
-        seg = offer['itineraries'][0]['segments'][0]
-        dur = offer['itineraries'][0]['duration']
-        
-        # Extração Hora de Saída (ex: 2026-02-28T20:55:00 -> 20:55)
-        data_hora_completa = seg['departure']['at']
-        hora_saida = data_hora_completa.split('T')[1][:5]
-        
-        # Duração
-        h, m = 0, 0
-        if 'H' in dur: h = int(dur.split('H')[0].replace('PT',''))
-        if 'M' in dur: 
-            if 'H' in dur: m = int(dur.split('H')[1].replace('M',''))
-            else: m = int(dur.replace('PT','').replace('M',''))
-            
-        return {
-            'preco': preco, 
-            'tempo': h*60+m, 
-            'cia': seg['carrierCode'], 
-            'voo_cod': f"{seg['carrierCode']}{seg['number']}", 
-            'hora_saida': hora_saida
-        }
-    except: return None
-
-# --- EXECUÇÃO PRINCIPAL ---
-def executar_etl_final():
-    print(f"INICIANDO COLETA DE DADOS (MODELO FINAL)")
-    amadeus = Client(client_id=AMADEUS_ID, client_secret=AMADEUS_SECRET)
-    cotacoes = get_cotacao_moedas()
-    database = {'metadata': {'inicio': str(DATA_INICIO)}, 'nos': {}, 'arestas': []}
-    
-    print("\nColetando Dados Locais...")
-    data_ref = DATA_INICIO.strftime('%Y-%m-%d')
-    for cidade in CIDADES:
-        hotel_info, custo_food = buscar_dados_locais_inteligentes(cidade, amadeus, cotacoes)
-        transfer_trecho = buscar_transfer_api(cidade, data_ref, amadeus, cotacoes)
-        transfer_total = transfer_trecho * 2 if transfer_trecho else 200.00
-            
-        # JSON com os nomes corrigidos
-        database['nos'][cidade['code']] = {
-            'nome': cidade['nome'], 
-            'pais': cidade['pais'],
-            'custo_refeicao_diaria': round(custo_food, 2),
-            'hotel_nome': hotel_info['nome'], 
-            'custo_diaria_hotel': hotel_info['diaria'],
-            'transporte': { 'transfer_ida_volta': round(transfer_total, 2) }
-        }
-
-    print("\nColetando Voos...")
-    datas = [DATA_INICIO + timedelta(days=i) for i in range(DIAS_PARA_COLETAR)]
-    for data_obj in datas:
-        data_str = data_obj.strftime('%Y-%m-%d')
-        print(f"   📅 {data_str}: ", end="")
-        found = 0
-        for origem in CIDADES:
-            for destino in CIDADES:
-                if origem['code'] == destino['code']: continue
-                res = buscar_voo_detalhado(origem['code'], destino['code'], data_str, amadeus, cotacoes)
-                if res:
-                    database['arestas'].append({
-                        'origem': origem['code'], 'destino': destino['code'], 
-                        'data_voo': data_str, 
-                        'hora_saida': res['hora_saida'], # Nome corrigido
-                        'custo_passagem': res['preco'], 'tempo_voo': res['tempo'], 
-                        'cia': res['cia'], 'voo_cod': res['voo_cod']
-                    })
-                    found += 1
-        print(f"OK ({found})")
-        time.sleep(1.5) 
-
-    os.makedirs('data', exist_ok=True)
-    with open('data/database.json', 'w', encoding='utf-8') as f: 
-        json.dump(database, f, indent=4, ensure_ascii=False)
-    print("\nCOLETA FINALIZADA!")
-
-if __name__ == "__main__":
-    executar_etl_final()
\ No newline at end of file
+import os
+import argparse
+import json
+import time
+import tempfile
+import threading
+import requests
+import random
+import re
+from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from unidecode import unidecode
+from urllib.parse import urlparse
+from datetime import datetime, timedelta
+
+# --- CONFIGURAÇÃO ---
+load_dotenv()
+AMADEUS_ID = os.getenv("AMADEUS_CLIENT_ID")
+AMADEUS_SECRET = os.getenv("AMADEUS_CLIENT_SECRET")
+
+# URLs base (apontáveis para um servidor stub local em testes)
+AMADEUS_URL = os.getenv("OTM_AMADEUS_URL", "https://test.api.amadeus.com")
+NUMBEO_URL = os.getenv("OTM_NUMBEO_URL", "https://www.numbeo.com")
+BOOKING_URL = os.getenv("OTM_BOOKING_URL", "https://www.booking.com")
+COTACAO_URL = os.getenv("OTM_COTACAO_URL", "https://economia.awesomeapi.com.br")
+
+ETL_WORKERS = int(os.getenv("OTM_ETL_WORKERS", 8))         # requisições de voo simultâneas
+ETL_TENTATIVAS = int(os.getenv("OTM_ETL_TENTATIVAS", 4))   # tentativas por requisição HTTP
+ETL_BACKOFF = float(os.getenv("OTM_ETL_BACKOFF", 1.0))     # base do backoff exponencial (s)
+ETL_TIMEOUT = float(os.getenv("OTM_ETL_TIMEOUT", 15.0))
+ETL_MAX_OFERTAS = int(os.getenv("OTM_ETL_MAX_OFERTAS", 50))  # ofertas por rota-dia (Amadeus: até 250)
+
+# Token bucket por host: (requisições por segundo, rajada)
+# Amadeus (plano de teste) aceita ~10 TPS; Booking/Numbeo no ritmo dos antigos sleeps
+LIMITES_POR_HOST = {
+    urlparse(AMADEUS_URL).netloc: (8.0, 8),
+    urlparse(BOOKING_URL).netloc: (1 / 27.5, 1),
+    urlparse(NUMBEO_URL).netloc: (1 / 12.5, 1),
+}
+LIMITE_PADRAO = (5.0, 5)
+# Sobrescrita: OTM_ETL_LIMITES="host=rps[/rajada],..." (ex.: "127.0.0.1:8001=50/10")
+for _item in filter(None, os.getenv("OTM_ETL_LIMITES", "").split(",")):
+    _host, _limite = _item.rsplit("=", 1)
+    _rps, _, _rajada = _limite.partition("/")
+    LIMITES_POR_HOST[_host.strip()] = (float(_rps), int(_rajada or 1))
+
+HOJE = datetime.now()
+DATA_INICIO = HOJE + timedelta(days=60)
+DIAS_PARA_COLETAR = 20 
+
+print(f"Configuração: {DATA_INICIO.strftime('%d/%m')} a {(DATA_INICIO + timedelta(days=DIAS_PARA_COLETAR)).strftime('%d/%m')}")
+
+CIDADES = [
+    # Numbeo URL  deve ser exato (ex: New-Orleans)
+    {'code': 'GYN', 'nome': 'Goiania', 'pais': 'BR', 'city_name': 'Goiania', 'country': 'BR', 'numbeo': 'Goiania'},
+    {'code': 'GRU', 'nome': 'Sao Paulo', 'pais': 'BR', 'city_name': 'Sao Paulo', 'country': 'BR', 'numbeo': 'Sao-Paulo'},
+    {'code': 'BSB', 'nome': 'Brasilia', 'pais': 'BR', 'city_name': 'Brasilia', 'country': 'BR', 'numbeo': 'Brasilia'},
+    {'code': 'ATL', 'nome': 'Atlanta', 'pais': 'US', 'city_name': 'Atlanta', 'country': 'US', 'numbeo': 'Atlanta'},
+    {'code': 'ORD', 'nome': 'Chicago', 'pais': 'US', 'city_name': 'Chicago', 'country': 'US', 'numbeo': 'Chicago'},
+    {'code': 'MSY', 'nome': 'New Orleans', 'pais': 'US', 'city_name': 'New Orleans', 'country': 'US', 'numbeo': 'New-Orleans'},
+    {'code': 'MIA', 'nome': 'Miami', 'pais': 'US', 'city_name': 'Miami', 'country': 'US', 'numbeo': 'Miami'},
+    {'code': 'JFK', 'nome': 'Nova York', 'pais': 'US', 'city_name': 'New York', 'country': 'US', 'numbeo': 'New-York'}
+]
+
+HOTEIS_BACKUP_REAL = {
+    'GYN': {'nome': 'Rede Andrade Goiania Centro', 'diaria': 149.00},
+    'GRU': {'nome': 'Attriun Hotel', 'diaria': 220.00},
+    'BSB': {'nome': 'Hotel Helly', 'diaria': 261.00},
+    'ATL': {'nome': 'Hyatt Regency Atlanta', 'diaria': 950.00},
+    'ORD': {'nome': 'Palmer House Hilton', 'diaria': 890.00},
+    'MSY': {'nome': 'Hotel Monteleone', 'diaria': 1100.00}
+}
+COMIDA_BACKUP_REAL = {'GYN': 60.0, 'GRU': 80.0, 'BSB': 75.0, 'ATL': 250.0, 'ORD': 280.0, 'MSY': 260.0}
+
+# --- HTTP: SESSION COMPARTILHADA, LIMITE POR HOST E RETENTATIVAS ---
+RETENTAVEIS = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Limite de taxa: `taxa` tokens por segundo, no máximo `rajada` acumulados
+    """
+    def __init__(self, taxa, rajada=1):
+        self.taxa = taxa
+        self.rajada = rajada
+        self.tokens = float(rajada)
+        self.ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def adquirir(self):
+        while True:
+            with self._lock:
+                agora = time.monotonic()
+                self.tokens = min(self.rajada, self.tokens + (agora - self.ultimo) * self.taxa)
+                self.ultimo = agora
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                espera = (1 - self.tokens) / self.taxa
+            time.sleep(espera)
+
+class ClienteHTTP:
+    """
+    requests.Session compartilhada entre as threads (pool de conexões por host),
+    com token bucket por host e retentativas com backoff exponencial + jitter
+    em erros de conexão, timeout, 429 e 5xx (respeita Retry-After)
+    """
+    def __init__(self, workers=ETL_WORKERS, limites=None, tentativas=ETL_TENTATIVAS,
+                 backoff=ETL_BACKOFF, timeout=ETL_TIMEOUT):
+        self.limites = dict(LIMITES_POR_HOST if limites is None else limites)
+        self.tentativas = max(1, tentativas)
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max(4, len(self.limites)), pool_maxsize=workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                self._buckets[host] = TokenBucket(*self.limites.get(host, LIMITE_PADRAO))
+            return self._buckets[host]
+
+    def _espera(self, tentativa, resp):
+        retry_after = resp.headers.get("Retry-After", "") if resp is not None else ""
+        if retry_after.isdigit():
+            return float(retry_after)
+        return random.uniform(0, self.backoff * 2 ** tentativa)
+
+    def request(self, metodo, url, **kwargs):
+        bucket = self._bucket(urlparse(url).netloc)
+        kwargs.setdefault("timeout", self.timeout)
+        resp, erro = None, None
+        for tentativa in range(self.tentativas):
+            bucket.adquirir()
+            try:
+                resp, erro = self.session.request(metodo, url, **kwargs), None
+                if resp.status_code not in RETENTAVEIS:
+                    return resp
+            except (requests.ConnectionError, requests.Timeout) as e:
+                resp, erro = None, e
+            if tentativa < self.tentativas - 1:
+                time.sleep(self._espera(tentativa, resp))
+        if erro is not None:
+            raise erro
+        return resp
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+class ClienteAmadeus:
+    """
+    API REST da Amadeus pelo ClienteHTTP; o token OAuth2 é compartilhado entre
+    as threads e renovado ao expirar ou num 401. Devolve o campo `data`.
+    """
+    def __init__(self, http, client_id, client_secret, base_url=AMADEUS_URL):
+        self.http = http
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.base_url = base_url.rstrip('/')
+        self._token = None
+        self._expira = 0.0
+        self._lock = threading.Lock()
+
+    def token(self, invalido=None):
+        with self._lock:
+            if self._token is None or self._token == invalido or time.monotonic() >= self._expira:
+                resp = self.http.post(f"{self.base_url}/v1/security/oauth2/token", data={
+                    'grant_type': 'client_credentials',
+                    'client_id': self.client_id,
+                    'client_secret': self.client_secret,
+                })
+                resp.raise_for_status()
+                d = resp.json()
+                self._token = d['access_token']
+                self._expira = time.monotonic() + float(d.get('expires_in', 1799)) - 30
+            return self._token
+
+    def _chamar(self, metodo, caminho, **kwargs):
+        token = self.token()
+        resp = self.http.request(metodo, self.base_url + caminho,
+                                 headers={'Authorization': f"Bearer {token}"}, **kwargs)
+        if resp.status_code == 401:
+            resp = self.http.request(metodo, self.base_url + caminho,
+                                     headers={'Authorization': f"Bearer {self.token(token)}"}, **kwargs)
+        resp.raise_for_status()
+        return resp.json().get('data') or []
+
+    def get(self, caminho, **params):
+        return self._chamar("GET", caminho, params=params)
+
+    def post(self, caminho, body):
+        return self._chamar("POST", caminho, json=body)
+
+def get_cotacao_moedas(http):
+    try:
+        req = http.get(f"{COTACAO_URL}/last/USD-BRL,EUR-BRL")
+        d = req.json()
+        return {'USD': float(d['USDBRL']['bid']), 'EUR': float(d['EURBRL']['bid']), 'BRL': 1.0}
+    except: return {'USD': 6.0, 'EUR': 6.5, 'BRL': 1.0}
+
+# --- FUNÇÃO AUXILIAR DE LIMPEZA ---
+def limpar_valor_numbeo(texto):
+    try:
+        texto_limpo = unidecode(texto) 
+        nums = ''.join([c for c in texto_limpo if c.isdigit() or c in ['.', ',']])
+        
+        if ',' in nums and '.' in nums: 
+            return float(nums.replace(',', ''))
+        elif ',' in nums and '.' not in nums:
+            return float(nums.replace(',', '.'))
+            
+        return float(nums)
+    except:
+        return 0.0
+
+# --- CRAWLER NUMBEO (2 REFEIÇÕES) ---
+def crawler_custo_alimentacao(http, cidade_slug, cotacoes):
+    # Ritmo controlado pelo token bucket do host (LIMITES_POR_HOST)
+    rotulo = f"Scraping Alimentação Numbeo em {cidade_slug}..."
+    url = f"{NUMBEO_URL}/cost-of-living/in/{cidade_slug}?displayCurrency=BRL"
+    
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+        "Referer": "https://www.google.com/"
+    }
+    
+    try:
+        resp = http.get(url, headers=headers, timeout=15)
+        if resp.status_code != 200:
+            print(f"{rotulo} (Bloqueio {resp.status_code})")
+            return None
+            
+        soup = BeautifulSoup(resp.content, 'html.parser')
+        tabela = soup.find("table", {"class": "data_wide_table"})
+        
+        if not tabela:
+            print(f"{rotulo} (Tabela não encontrada)")
+            return None
+            
+        preco_refeicao_economica = 0.0
+        
+        for row in tabela.find_all("tr"):
+            texto = row.text.lower()
+            if "inexpensive restaurant" in texto and "meal" in texto:
+                try:
+                    span_preco = row.find("span", class_="first_currency")
+                    if span_preco:
+                        preco_refeicao_economica = limpar_valor_numbeo(span_preco.text)
+                except: pass
+
+        if preco_refeicao_economica > 0:
+            #2 Refeições  (Almoço + Jantar)
+            total_diaria = preco_refeicao_economica * 2
+            print(f"{rotulo} Sucesso! (R$ {total_diaria:.2f}/dia - Econômico)")
+            return round(total_diaria, 2)
+            
+        print(f"{rotulo} (Dados vazios)")
+        
+    except Exception as e:
+        print(f"{rotulo} [Erro: {e}]")
+        
+    return None
+
+# --- CRAWLER BOOKING (MENOR PREÇO ENTRE OS PRIMEIROS) ---
+def crawler_booking(http, cidade_nome, data_iso, cotacoes):
+    # Intervalo longo entre requisições (token bucket do host) para evitar bloqueio
+    rotulo = f"Scraping Booking em {cidade_nome}..."
+    
+    try:
+        checkin = datetime.strptime(data_iso, "%Y-%m-%d")
+        checkout = checkin + timedelta(days=1)
+        url = f"{BOOKING_URL}/searchresults.html"
+        params = { "ss": cidade_nome, "checkin_year": checkin.year, "checkin_month": checkin.month, "checkin_monthday": checkin.day, "checkout_year": checkout.year, "checkout_month": checkout.month, "checkout_monthday": checkout.day, "group_adults": 1, "no_rooms": 1, "selected_currency": "BRL" }
+        headers = { "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36", "Accept-Language": "pt-BR,pt;q=0.9" }
+        
+        resp = http.get(url, params=params, headers=headers, timeout=10)
+        if resp.status_code != 200: 
+            print(f"{rotulo} (Bloqueio {resp.status_code})")
+            return None
+
+        soup = BeautifulSoup(resp.content, 'html.parser')
+        
+        # Pega TODOS os cartões da primeira página
+        cards = soup.find_all("div", {"data-testid": "property-card"})
+        if not cards: 
+            print(f"{rotulo} (Sem dados)")
+            return None
+        
+        melhor_hotel = None
+        menor_preco = float('inf')
+        
+        count = 0
+        for card in cards:
+            if count >= 10: break
+            try:
+                # Extração do Preço
+                preco_el = card.find("span", {"data-testid": "price-and-discounted-price"}) or card.find("div", {"data-testid": "price-and-discounted-price"})
+                
+                if preco_el:
+                    texto = unidecode(preco_el.text.strip())
+                    nums = ''.join([c for c in texto if c.isdigit() or c == ','])
+                    
+                    valor = 0.0
+                    if ',' in nums and '.' in nums: valor = float(nums.replace(',', ''))
+                    elif ',' in nums and '.' not in nums: valor = float(nums.replace(',', '.'))
+                    else: valor = float(nums)
+                    
+                    if valor > 50.0:
+                        if valor < menor_preco:
+                            menor_preco = valor
+                            # Extração do Nome (Segura)
+                            nome_el = card.find("div", {"data-testid": "title"})
+                            nome_hotel = nome_el.text.strip() if nome_el else "Hotel Booking"
+                            melhor_hotel = {'nome': nome_hotel, 'diaria': valor}
+                        count += 1
+            except: continue
+        
+        if melhor_hotel:
+            print(f"{rotulo} Sucesso! {melhor_hotel['nome']} (R$ {melhor_hotel['diaria']:.2f})")
+            return melhor_hotel
+
+    except Exception as e:
+        print(f"{rotulo} [Erro: {e}]")
+    
+    return None
+
+# --- API TRANSFER ---
+def buscar_transfer_api(cidade_info, data_iso, amadeus, cotacoes):
+    rotulo = f"Buscando transfer em {cidade_info['code']}..."
+    try:
+        body = { "startLocationCode": cidade_info['code'], "endAddressLine": f"City Center {cidade_info['city_name']}", "endCityName": cidade_info['city_name'], "endCountryCode": cidade_info['country'], "passengers": 1, "startDateTime": f"{data_iso}T14:00:00" }
+        ofertas = amadeus.post('/v1/shopping/transfer-offers', body)
+        if not ofertas: 
+            print(f"{rotulo} (Sem ofertas)")
+            return None
+        menor = float('inf')
+        for offer in ofertas:
+            try:
+                val = float(offer['quotation']['monetaryAmount'])
+                moeda = offer['quotation']['currencyCode']
+                brl = val * cotacoes.get(moeda, cotacoes.get('USD', 1.0))
+                if brl < menor: menor = brl
+            except: continue
+        if menor == float('inf'): return None
+        print(f"{rotulo} Achou! R$ {menor:.2f}")
+        return round(menor, 2)
+    except: 
+        print(f"{rotulo} [API Off]")
+        return None
+
+# --- ORQUESTRADOR DE DADOS LOCAIS ---
+def buscar_dados_locais_inteligentes(cidade, amadeus, http, cotacoes):
+    # 1. Hotel (API -> Crawler -> Cache)
+    rotulo = f"Buscando hotel em {cidade['code']}..."
+    hotel_res = None
+    try:
+        hoteis = amadeus.get('/v1/reference-data/locations/hotels/by-city', cityCode=cidade['code'])
+        if hoteis:
+            ids = [h['hotelId'] for h in hoteis[:2]]
+            offers = amadeus.get('/v3/shopping/hotel-offers', hotelIds=','.join(ids), adults='1', checkInDate=DATA_INICIO.strftime('%Y-%m-%d'), checkOutDate=(DATA_INICIO + timedelta(days=1)).strftime('%Y-%m-%d'))
+            if offers:
+                best = offers[0]
+                val = float(best['offers'][0]['price']['total'])
+                taxa = cotacoes.get(best['offers'][0]['price']['currency'], cotacoes.get('USD', 1.0))
+                if best['offers'][0]['price']['currency'] == 'USD': taxa = cotacoes['USD']
+                print(f"{rotulo} API OK ({best['hotel']['name']})")
+                hotel_res = {'nome': best['hotel']['name'], 'diaria': round(val * taxa, 2)}
+    except: pass
+    
+    if not hotel_res:
+        hotel_res = crawler_booking(http, cidade['nome'], DATA_INICIO.strftime('%Y-%m-%d'), cotacoes)
+    if not hotel_res:
+        hotel_res = HOTEIS_BACKUP_REAL.get(cidade['code'], {'nome': 'Hotel Padrão', 'diaria': 300.0})
+        print(f"   🛡️ Cache Hotel {cidade['code']} ({hotel_res['nome']})")
+
+    # 2. Comida (Crawler -> Cache)
+    custo_comida = crawler_custo_alimentacao(http, cidade['numbeo'], cotacoes)
+    if not custo_comida:
+        custo_comida = COMIDA_BACKUP_REAL.get(cidade['code'], 60.00)
+        print(f"Cache Comida {cidade['code']} (R$ {custo_comida:.2f})")
+
+    return hotel_res, custo_comida
+
+# --- BUSCA DE VOOS (COM HORÁRIO) ---
+def _duracao_min(dur):
+    # ISO 8601 (ex: PT2H30M, P1DT1H)
+    m = re.fullmatch(r'P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?', dur or '')
+    if not m: raise ValueError(f"Duração inválida: {dur}")
+    d, h, mi = (int(v or 0) for v in m.groups())
+    return d*1440 + h*60 + mi
+
+def buscar_voo_detalhado(origem, destino, data_iso, amadeus, cotacoes):
+    """
+    Todas as ofertas da rota-dia (até ETL_MAX_OFERTAS), uma por itinerário:
+    saída do 1º trecho, duração total e os trechos (conexões) achatados.
+    Ofertas repetidas do mesmo itinerário (tarifas diferentes) ficam só com a
+    mais barata. Lista vazia = rota sem voos.
+    """
+    # Falha de rede/HTTP (após as retentativas) sobe para o chamador: na coleta
+    # incremental ela não pode ser confundida com "rota sem voos"
+    ofertas = amadeus.get('/v2/shopping/flight-offers', originLocationCode=origem, destinationLocationCode=destino, departureDate=data_iso, adults=1, max=ETL_MAX_OFERTAS)
+
+    voos = {}
+    for offer in ofertas:
+        try:
+            # Preço
+            val = float(offer['price']['total'])
+            preco = round(val * cotacoes.get(offer['price']['currency'], cotacoes.get('USD', 6.0)), 2)
+
+            # Trechos (ex: GYN->GRU->ATL = 2 trechos) e horário de saída do primeiro
+            itinerario = offer['itineraries'][0]
+            trechos = [{
+                'origem': seg['departure']['iataCode'],
+                'destino': seg['arrival']['iataCode'],
+                'saida': seg['departure']['at'][:16],      # 2026-02-28T20:55
+                'chegada': seg['arrival']['at'][:16],
+                'cia': seg['carrierCode'],
+                'voo_cod': f"{seg['carrierCode']}{seg['number']}",
+            } for seg in itinerario['segments']]
+            if trechos[0]['saida'][:10] != data_iso: continue
+
+            voo = {
+                'preco': preco, 
+                'tempo': _duracao_min(itinerario['duration']), 
+                'cia': trechos[0]['cia'], 
+                # Código do itinerário: voos dos trechos unidos por "." (o "_" separa o id do voo)
+                'voo_cod': '.'.join(t['voo_cod'] for t in trechos), 
+                'hora_saida': trechos[0]['saida'][11:16],
+                'trechos': trechos,
+            }
+        except (KeyError, IndexError, TypeError, ValueError):
+            continue
+
+        chave = (voo['voo_cod'], voo['hora_saida'])
+        if chave not in voos or preco < voos[chave]['preco']:
+            voos[chave] = voo
+
+    return sorted(voos.values(), key=lambda v: (v['hora_saida'], v['preco']))
+
+# --- BANCO INCREMENTAL ---
+# Cada aresta e cada nó guardam `coletado_em`; rotas-dia consultadas sem
+# nenhum voo ficam em metadata['sem_voos'] ("data|origem|destino" -> carimbo)
+# para não serem consultadas de novo antes de expirar.
+ETL_VALIDADE_VOOS_H = float(os.getenv("OTM_ETL_VALIDADE_VOOS_H", 24))      # idade máxima de uma tarifa
+ETL_VALIDADE_LOCAIS_H = float(os.getenv("OTM_ETL_VALIDADE_LOCAIS_H", 168))  # hotel/comida/transfer
+
+def _carimbo(agora):
+    return agora.isoformat(timespec='seconds')
+
+def _recente(carimbo, validade_h, agora):
+    if not carimbo:
+        return False
+    try:
+        return agora - datetime.fromisoformat(carimbo) < timedelta(hours=validade_h)
+    except ValueError:
+        return False
+
+def _chave_sem_voos(data_str, origem, destino):
+    return f"{data_str}|{origem}|{destino}"
+
+def carregar_banco(caminho):
+    """
+    Banco publicado anteriormente ou None (ausente/inválido -> coleta completa)
+    """
+    try:
+        with open(caminho, encoding='utf-8') as f:
+            db = json.load(f)
+        return db if isinstance(db.get('nos'), dict) and isinstance(db.get('arestas'), list) else None
+    except (OSError, ValueError):
+        return None
+
+def planejar_coleta(anterior, datas, rotas, agora):
+    """
+    (rotas-dia, cidades) a buscar: ausentes no banco anterior ou mais velhas
+    que a validade. Sem banco anterior, tudo.
+    """
+    if anterior is None:
+        return [(d, o, de) for d in datas for (o, de) in rotas], list(CIDADES)
+
+    coletado = {}
+    for a in anterior['arestas']:
+        chave = (a['data_voo'], a['origem'], a['destino'])
+        carimbo = a.get('coletado_em') or ''
+        # Várias tarifas da mesma rota-dia: vale a mais antiga
+        coletado[chave] = min(coletado.get(chave, carimbo), carimbo)
+    for chave, carimbo in anterior.get('metadata', {}).get('sem_voos', {}).items():
+        coletado.setdefault(tuple(chave.split('|')), carimbo)
+
+    voos = [
+        (d, o, de) for d in datas for (o, de) in rotas
+        if not _recente(coletado.get((d, o, de)), ETL_VALIDADE_VOOS_H, agora)
+    ]
+    cidades = [
+        c for c in CIDADES
+        if not _recente(anterior['nos'].get(c['code'], {}).get('coletado_em'), ETL_VALIDADE_LOCAIS_H, agora)
+    ]
+    return voos, cidades
+
+def mesclar_banco(anterior, arestas_novas, consultadas, sem_voos_novos, nos_novos, agora):
+    """
+    Banco anterior + coleta nova: as rotas-dia consultadas com sucesso
+    substituem as tarifas antigas; datas passadas são descartadas
+    """
+    hoje = agora.strftime('%Y-%m-%d')
+    anterior = anterior or {'metadata': {}, 'nos': {}, 'arestas': []}
+
+    arestas = [
+        a for a in anterior['arestas']
+        if a['data_voo'] >= hoje and (a['data_voo'], a['origem'], a['destino']) not in consultadas
+    ] + arestas_novas
+    ordem = {c['code']: k for k, c in enumerate(CIDADES)}
+    arestas.sort(key=lambda a: (a['data_voo'], ordem.get(a['origem'], len(ordem)), ordem.get(a['destino'], len(ordem))))
+
+    sem_voos = {
+        chave: carimbo for chave, carimbo in anterior['metadata'].get('sem_voos', {}).items()
+        if chave.split('|')[0] >= hoje and tuple(chave.split('|')) not in consultadas
+    }
+    sem_voos.update(sem_voos_novos)
+
+    nos = dict(anterior['nos'])
+    nos.update(nos_novos)
+
+    inicio = str(DATA_INICIO)
+    if arestas and arestas[0]['data_voo'] < DATA_INICIO.strftime('%Y-%m-%d'):
+        inicio = f"{arestas[0]['data_voo']} 00:00:00"
+
+    metadata = dict(anterior['metadata'], inicio=inicio, atualizado_em=_carimbo(agora), sem_voos=sem_voos)
+    return {'metadata': metadata, 'nos': nos, 'arestas': arestas}
+
+def publicar_atomico(database, saida):
+    """
+    Grava num temporário do mesmo diretório e troca com os.replace: quem lê
+    (a API recarrega por mtime/hash) vê a versão antiga ou a nova, nunca parcial
+    """
+    pasta = os.path.dirname(os.path.abspath(saida))
+    os.makedirs(pasta, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix='.database-', suffix='.tmp', dir=pasta)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(database, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, saida)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+# --- EXECUÇÃO PRINCIPAL ---
+def coletar_no(cidade, amadeus, http, cotacoes, data_ref):
+    hotel_info, custo_food = buscar_dados_locais_inteligentes(cidade, amadeus, http, cotacoes)
+    transfer_trecho = buscar_transfer_api(cidade, data_ref, amadeus, cotacoes)
+    transfer_total = transfer_trecho * 2 if transfer_trecho else 200.00
+
+    # JSON com os nomes corrigidos
+    return {
+        'nome': cidade['nome'], 
+        'pais': cidade['pais'],
+        'custo_refeicao_diaria': round(custo_food, 2),
+        'hotel_nome': hotel_info['nome'], 
+        'custo_diaria_hotel': hotel_info['diaria'],
+        'transporte': { 'transfer_ida_volta': round(transfer_total, 2) }
+    }
+
+def executar_etl_final(saida='data/database.json', workers=ETL_WORKERS, incremental=False):
+    """
+    Coleta concorrente: voos (rota x dia) num pool de `workers` threads e dados
+    locais num pool por cidade, todos pelo mesmo ClienteHTTP; o ritmo por site
+    vem de LIMITES_POR_HOST. A ordem de nós e arestas no JSON é a da coleta serial.
+
+    incremental: parte do banco já publicado em `saida` e só busca rotas-dia e
+    cidades ausentes ou vencidas (OTM_ETL_VALIDADE_*_H); falhas de busca mantêm
+    a tarifa anterior. Em ambos os modos a publicação é atômica.
+    """
+    print(f"INICIANDO COLETA DE DADOS (MODELO FINAL{' - INCREMENTAL' if incremental else ''})")
+    inicio = time.perf_counter()
+    agora = datetime.now()
+    carimbo = _carimbo(agora)
+
+    anterior = carregar_banco(saida) if incremental else None
+    if incremental and anterior is None:
+        print(f"Sem banco válido em {saida}: coleta completa")
+
+    datas = [(DATA_INICIO + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(DIAS_PARA_COLETAR)]
+    rotas = [(o['code'], d['code']) for o in CIDADES for d in CIDADES if o['code'] != d['code']]
+    buscar_voos, buscar_cidades = planejar_coleta(anterior, datas, rotas, agora)
+    print(f"A buscar: {len(buscar_voos)}/{len(datas) * len(rotas)} rotas-dia, {len(buscar_cidades)}/{len(CIDADES)} cidades")
+
+    http = ClienteHTTP(workers=workers)
+    amadeus = ClienteAmadeus(http, AMADEUS_ID, AMADEUS_SECRET)
+    cotacoes = get_cotacao_moedas(http) if buscar_voos or buscar_cidades else {}
+    data_ref = DATA_INICIO.strftime('%Y-%m-%d')
+
+    arestas, sem_voos, consultadas, falhas = [], {}, set(), 0
+    nos = {}
+
+    # Dados locais esperam muito pelo limite de Booking/Numbeo: pool próprio,
+    # para não ocupar os workers dos voos
+    with ThreadPoolExecutor(max_workers=max(1, min(len(CIDADES), workers)), thread_name_prefix="etl-local") as pool_locais, \
+         ThreadPoolExecutor(max_workers=workers, thread_name_prefix="etl-voos") as pool_voos:
+        print(f"\nColetando Dados Locais e Voos ({workers} buscas simultâneas)...")
+        locais = {
+            cidade['code']: pool_locais.submit(coletar_no, cidade, amadeus, http, cotacoes, data_ref)
+            for cidade in buscar_cidades
+        }
+        voos = {
+            chave: pool_voos.submit(buscar_voo_detalhado, chave[1], chave[2], chave[0], amadeus, cotacoes)
+            for chave in buscar_voos
+        }
+
+        for data_str in datas:
+            found = 0
+            for (origem, destino) in rotas:
+                futuro = voos.get((data_str, origem, destino))
+                if futuro is None:
+                    continue
+                try:
+                    resultados = futuro.result()
+                except Exception:
+                    falhas += 1
+                    continue
+                consultadas.add((data_str, origem, destino))
+                for res in resultados:
+                    arestas.append({
+                        'origem': origem, 'destino': destino, 
+                        'data_voo': data_str, 
+                        'hora_saida': res['hora_saida'], # Nome corrigido
+                        'custo_passagem': res['preco'], 'tempo_voo': res['tempo'], 
+                        'cia': res['cia'], 'voo_cod': res['voo_cod'],
+                        'escalas': len(res['trechos']) - 1, 'trechos': res['trechos'],
+                        'coletado_em': carimbo
+                    })
+                    found += 1
+                if not resultados:
+                    sem_voos[_chave_sem_voos(data_str, origem, destino)] = carimbo
+            print(f"   📅 {data_str}: OK ({found})")
+
+        for code, futuro in locais.items():
+            nos[code] = dict(futuro.result(), coletado_em=carimbo)
+
+    database = mesclar_banco(anterior, arestas, consultadas, sem_voos, nos, agora)
+    publicar_atomico(database, saida)
+    print(f"\nCOLETA FINALIZADA! {len(database['arestas'])} voos, {len(consultadas)} rotas-dia consultadas, "
+          f"{falhas} falhas ({time.perf_counter() - inicio:.1f} s)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Coleta de voos e custos locais para o database.json")
+    parser.add_argument("--saida", default='data/database.json')
+    parser.add_argument("--workers", type=int, default=ETL_WORKERS)
+    parser.add_argument("--incremental", action="store_true",
+                        help="só busca rotas-dia/cidades ausentes ou vencidas no banco em --saida")
+    args = parser.parse_args()
+    executar_etl_final(args.saida, args.workers, args.incremental)
@@ -3,12 +3,25 @@ Sistema de Fallback para Otimização de Viagens
 Garante que sempre seja retornada uma resposta válida
 """
 
+import os
 import time
-from typing import Dict, List, Any, Optional
+from concurrent.futures import TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-from pulp import LpStatus, PULP_CBC_CMD
-from otm_model import build_trip_milp_pulp
-import json
+from model_engines import construir_modelo
+from solver_backends import resolver_modelo, solucao_interrompida
+from caminho_minimo import caminho_minimo_aplicavel, resolver_caminho_minimo
+from import_export_json import build_front_json
+from flight_index import FlightIndex, get_flight_index, horario_chegada
+from warm_start import aplicar_warm_start, candidatos_heuristicos
+import worker_pool
+from stage_timing import etapa, etapas_atuais
+
+
+# "sequencial" (padrão) ou "concorrente"
+MODO_FALLBACK = os.environ.get("OTM_FALLBACK_MODE", "sequencial")
+DEADLINE_FALLBACK = 30.0  # prazo do modo concorrente (segundos)
 
 
 def create_empty_route_response(origem: str, destino: str, error_msg: str = "Nenhuma solução encontrada") -> Dict:
@@ -42,14 +55,13 @@ def create_empty_route_response(origem: str, destino: str, error_msg: str = "Nen
     }
 
 
-def buscar_voo_direto(db: Dict, origem: str, destino: str, data_ida: str) -> Optional[Dict]:
+def buscar_voo_direto(db: Dict, origem: str, destino: str, data_ida: str,
+                      index: Optional[FlightIndex] = None) -> Optional[Dict]:
     """
     Busca voo direto mais barato entre origem e destino
     """
-    voos_diretos = [
-        a for a in db.get("arestas", [])
-        if a["origem"] == origem and a["destino"] == destino and a["data_voo"] == data_ida
-    ]
+    index = get_flight_index(db, index)
+    voos_diretos = index.voos_no_dia(origem, data_ida, destino)
     
     if not voos_diretos:
         return None
@@ -58,12 +70,14 @@ def buscar_voo_direto(db: Dict, origem: str, destino: str, data_ida: str) -> Opt
     return min(voos_diretos, key=lambda x: float(x["custo_passagem"]))
 
 
-def buscar_voo_com_uma_escala(db: Dict, origem: str, destino: str, data_ida: str) -> Optional[List[Dict]]:
+def buscar_voo_com_uma_escala(db: Dict, origem: str, destino: str, data_ida: str,
+                              index: Optional[FlightIndex] = None) -> Optional[List[Dict]]:
     """
     Busca rota com 1 escala: origem -> intermediaria -> destino
     Retorna lista de 2 voos ou None
     """
-    voos_origem = [a for a in db.get("arestas", []) if a["origem"] == origem and a["data_voo"] == data_ida]
+    index = get_flight_index(db, index)
+    voos_origem = index.voos_no_dia(origem, data_ida)
     
     if not voos_origem:
         return None
@@ -77,28 +91,13 @@ def buscar_voo_com_uma_escala(db: Dict, origem: str, destino: str, data_ida: str
             continue
         
         # Buscar voo da intermediária para destino (pode ser no mesmo dia ou próximo)
-        data_voo1 = datetime.strptime(f"{voo1['data_voo']} {voo1['hora_saida']}", "%Y-%m-%d %H:%M:%S")
-        duracao_voo1 = float(voo1["tempo_voo"]) / 60.0  # converter minutos para horas
-        chegada_intermediaria = data_voo1 + timedelta(hours=duracao_voo1)
+        chegada_intermediaria = horario_chegada(voo1)
         
-        # Tempo mínimo de conexão: 2 horas
+        # Conexão entre 2 horas (mínimo) e 12 horas (máximo): busca por intervalo no índice
         saida_minima = chegada_intermediaria + timedelta(hours=2)
+        saida_maxima = chegada_intermediaria + timedelta(hours=12)
         
-        for voo2 in db.get("arestas", []):
-            if voo2["origem"] != intermediaria or voo2["destino"] != destino:
-                continue
-            
-            data_voo2 = datetime.strptime(f"{voo2['data_voo']} {voo2['hora_saida']}", "%Y-%m-%d %H:%M:%S")
-            
-            # Verificar se o voo 2 sai após o tempo mínimo de conexão
-            if data_voo2 < saida_minima:
-                continue
-            
-            # Verificar se a conexão não demora mais de 12 horas
-            tempo_conexao = (data_voo2 - chegada_intermediaria).total_seconds() / 3600.0
-            if tempo_conexao > 12:
-                continue
-            
+        for voo2 in index.voos_rota(intermediaria, destino, saida_minima, saida_maxima):
             custo_total = float(voo1["custo_passagem"]) + float(voo2["custo_passagem"])
             
             if custo_total < menor_custo:
@@ -108,15 +107,18 @@ def buscar_voo_com_uma_escala(db: Dict, origem: str, destino: str, data_ida: str
     return melhor_rota
 
 
-def criar_rota_basica(db: Dict, origem: str, destino: str, data_ida: str, request_data: Dict) -> Dict:
+def criar_rota_basica(db: Dict, origem: str, destino: str, data_ida: str, request_data: Dict,
+                      index: Optional[FlightIndex] = None) -> Dict:
     """
     Nível 4 - Fallback final: cria rota mais simples possível
     1. Tenta voo direto
     2. Tenta voo com 1 escala
     3. Retorna estrutura vazia se não houver nenhuma opção
     """
+    index = get_flight_index(db, index)
+
     # Tentar voo direto
-    voo_direto = buscar_voo_direto(db, origem, destino, data_ida)
+    voo_direto = buscar_voo_direto(db, origem, destino, data_ida, index)
     
     if voo_direto:
         fid = f'{voo_direto["voo_cod"]}_{voo_direto["data_voo"]}_{voo_direto["hora_saida"]}'
@@ -161,7 +163,7 @@ def criar_rota_basica(db: Dict, origem: str, destino: str, data_ida: str, reques
         }
     
     # Tentar voo com 1 escala
-    rota_escala = buscar_voo_com_uma_escala(db, origem, destino, data_ida)
+    rota_escala = buscar_voo_com_uma_escala(db, origem, destino, data_ida, index)
     
     if rota_escala:
         voo1, voo2 = rota_escala
@@ -257,11 +259,13 @@ def relaxar_restricoes(params: Dict) -> Dict:
     return params_relaxados
 
 
-def algoritmo_guloso(db: Dict, origem: str, destino: str, data_ida: str, locais_visitar: List[str]) -> Optional[Dict]:
+def algoritmo_guloso(db: Dict, origem: str, destino: str, data_ida: str, locais_visitar: List[str],
+                     index: Optional[FlightIndex] = None) -> Optional[Dict]:
     """
     Nível 3 - Algoritmo guloso: sempre escolhe próximo voo mais barato
     Tenta construir uma rota viável priorizando custo
     """
+    index = get_flight_index(db, index)
     caminho = [origem]
     trechos = []
     custo_total = 0.0
@@ -270,9 +274,8 @@ def algoritmo_guloso(db: Dict, origem: str, destino: str, data_ida: str, locais_
     current = origem
     pendentes = set(locais_visitar) - {origem, destino}
     
-    # Data atual de busca
-    data_busca = data_ida
-    data_busca_dt = datetime.strptime(data_busca, "%Y-%m-%d")
+    # Data atual de busca (meia-noite do dia; voos a partir dela)
+    data_busca_dt = datetime.strptime(data_ida, "%Y-%m-%d")
     
     max_iterations = 20
     iterations = 0
@@ -285,10 +288,7 @@ def algoritmo_guloso(db: Dict, origem: str, destino: str, data_ida: str, locais_
             # Buscar voos mais baratos para as cidades pendentes
             opcoes = []
             for proxima in pendentes:
-                voos = [
-                    a for a in db.get("arestas", [])
-                    if a["origem"] == current and a["destino"] == proxima and a["data_voo"] >= data_busca
-                ]
+                voos = index.voos_rota(current, proxima, depois_de=data_busca_dt)
                 if voos:
                     mais_barato = min(voos, key=lambda x: float(x["custo_passagem"]))
                     opcoes.append(mais_barato)
@@ -300,17 +300,14 @@ def algoritmo_guloso(db: Dict, origem: str, destino: str, data_ida: str, locais_
                 voo_escolhido = None
         else:
             # Ir direto ao destino
-            voos = [
-                a for a in db.get("arestas", [])
-                if a["origem"] == current and a["destino"] == destino and a["data_voo"] >= data_busca
-            ]
+            voos = index.voos_rota(current, destino, depois_de=data_busca_dt)
             voo_escolhido = min(voos, key=lambda x: float(x["custo_passagem"])) if voos else None
         
         if not voo_escolhido:
             # Não encontrou voo, tentar qualquer próxima cidade não visitada
             voos_possiveis = [
-                a for a in db.get("arestas", [])
-                if a["origem"] == current and a["destino"] not in visitados and a["data_voo"] >= data_busca
+                a for a in index.voos_saindo(current, depois_de=data_busca_dt)
+                if a["destino"] not in visitados
             ]
             
             if not voos_possiveis:
@@ -343,7 +340,6 @@ def algoritmo_guloso(db: Dict, origem: str, destino: str, data_ida: str, locais_
         # Atualizar data de busca (dia seguinte ao voo)
         data_voo_dt = datetime.strptime(voo_escolhido["data_voo"], "%Y-%m-%d")
         data_busca_dt = data_voo_dt + timedelta(days=1)
-        data_busca = data_busca_dt.strftime("%Y-%m-%d")
     
     if current != destino:
         return None
@@ -375,79 +371,251 @@ def algoritmo_guloso(db: Dict, origem: str, destino: str, data_ida: str, locais_
     }
 
 
+def resolver_nivel_milp(
+    params: Dict,
+    request_data: Dict,
+    db: Dict,
+    build_result_func,
+    time_limit: int = 30,
+    flight_index: Optional[FlightIndex] = None
+) -> Tuple[Optional[Dict], bool]:
+    """
+    Níveis 1/2 - Constrói o MILP (motor da requisição), força os locais a
+    visitar e resolve; retorna (JSON do front ou None se não for ótimo,
+    interrompido), com interrompido=True se o solver parou no tempo limite
+    O itinerário do guloso/rota básica, se viável, entra como solução inicial
+    Função de módulo para poder rodar no pool de processos
+    """
+    origem = request_data["origem"]
+    destino = request_data["destino"]
+
+    with etapa("heuristicas"):
+        candidatos = candidatos_heuristicos(db, request_data, params, flight_index)
+
+    # Modelo com as restrições de locais a visitar
+    with construir_modelo(request_data.get("motor"), params, request_data.get("locais_visitar", [])) as model:
+        # Warm start com as heurísticas (milissegundos)
+        with etapa("warm_start"):
+            warm = aplicar_warm_start(model, params, candidatos)
+
+        with etapa("solve"):
+            status = resolver_modelo(model, time_limit=time_limit, warm_start=warm)
+        interrompido = solucao_interrompida(model, status)
+        if status != "Optimal":
+            return None, interrompido
+        return build_result_func(model, db, origem, destino, index=flight_index), interrompido
+
+
+def resolver_nivel_milp_no_pool(
+    params: Dict,
+    request_data: Dict,
+    candidatos: List[List[Tuple[str, str, str]]],
+    time_limit: int
+) -> Tuple[Optional[Dict], bool]:
+    """
+    Níveis 1/2 no pool de processos: recebe só os model_params e os
+    itinerários das heurísticas (sem o banco, que não é serializado a cada
+    nível) e retorna ({"chosen", "dias"} ou None, interrompido); o JSON do
+    front é montado no processo da requisição
+    """
+    with construir_modelo(request_data.get("motor"), params, request_data.get("locais_visitar", [])) as model:
+        warm = aplicar_warm_start(model, params, candidatos)
+        status = resolver_modelo(model, time_limit=time_limit, warm_start=warm)
+        interrompido = solucao_interrompida(model, status)
+        if status != "Optimal":
+            return None, interrompido
+        handle = model.solution_handle
+        return {"chosen": handle.chosen(), "dias": handle.days()}, interrompido
+
+
+NOTAS_NIVEL = {
+    "otima": "Solução ótima encontrada",
+    "boa": "Solução com restrições relaxadas",
+}
+
+
+def _com_metadata(resultado: Dict, nivel: str, tempo_inicio: float, completo: bool) -> Dict:
+    """
+    completo=False: algum nível MILP foi interrompido pelo prazo/tempo limite
+    (a resposta pode melhorar numa nova tentativa e não vai para o cache)
+    """
+    resultado["metadata"] = {
+        "nivel_otimizacao": nivel,
+        "nota": NOTAS_NIVEL[nivel],
+        "tempo_computacao": round(time.time() - tempo_inicio, 2),
+        "completo": completo
+    }
+    return resultado
+
+
+def _heuristica_com_metadata(resultado: Dict, tempo_inicio: float, completo: bool) -> Dict:
+    resultado["metadata"]["tempo_computacao"] = round(time.time() - tempo_inicio, 2)
+    resultado["metadata"]["completo"] = completo
+    return resultado
+
+
+def solucao_heuristica(db: Dict, request_data: Dict, flight_index: Optional[FlightIndex] = None) -> Dict:
+    """
+    Níveis 3 e 4 - guloso e, se falhar, rota básica (ambos em milissegundos)
+    """
+    origem = request_data["origem"]
+    destino = request_data["destino"]
+
+    # NÍVEL 3: Algoritmo Guloso
+    flight_index = get_flight_index(db, flight_index)
+    resultado_guloso = algoritmo_guloso(
+        db, origem, destino,
+        request_data["data_ida"],
+        request_data.get("locais_visitar", []),
+        index=flight_index
+    )
+    
+    if resultado_guloso:
+        return resultado_guloso
+    
+    # NÍVEL 4: Rota Básica (último recurso)
+    return criar_rota_basica(
+        db, origem, destino, request_data["data_ida"], request_data,
+        index=flight_index
+    )
+
+
+def _fallback_concorrente(
+    request_data: Dict,
+    db: Dict,
+    model_params: Dict,
+    flight_index: Optional[FlightIndex],
+    niveis_milp: List[str],
+    tempo_inicio: float,
+    deadline: float
+) -> Dict:
+    """
+    Modo concorrente: os níveis MILP rodam juntos no pool de processos
+    enquanto as heurísticas são calculadas na hora; no prazo retorna o
+    melhor nível disponível (otima > boa > viavel > basica)
+
+    Os workers recebem params e candidatos a warm start, não o banco, e o
+    tempo limite do solver é o que resta do prazo: um solve abandonado no
+    prazo não segura a vaga do pool além dele.
+    """
+    limite = tempo_inicio + deadline
+    origem, destino = request_data["origem"], request_data["destino"]
+
+    params_por_nivel = {"otima": model_params, "boa": relaxar_restricoes(model_params)}
+    futures = {}
+    etapas = etapas_atuais()
+    inicio_pool = time.perf_counter()
+    try:
+        pool = worker_pool.get_process_pool()
+        for nivel in niveis_milp:
+            with etapa(f"heuristicas:{nivel}"):
+                candidatos = candidatos_heuristicos(db, request_data, params_por_nivel[nivel], flight_index)
+            time_limit = int(limite - time.time())
+            if time_limit < 1:
+                break
+            futures[nivel] = pool.submit(
+                resolver_nivel_milp_no_pool, params_por_nivel[nivel], request_data, candidatos, time_limit
+            )
+    except BrokenProcessPool:
+        worker_pool.descartar_pool()
+
+    # Resposta garantida enquanto os MILPs rodam
+    with etapa("heuristica"):
+        resultado_heuristico = solucao_heuristica(db, request_data, flight_index)
+
+    completo = True
+    for nivel in niveis_milp:
+        if nivel not in futures:
+            completo = False
+            continue
+        try:
+            solucao, interrompido = futures[nivel].result(timeout=max(0.0, limite - time.time()))
+        except FuturesTimeout:
+            solucao, interrompido = None, True
+        except BrokenProcessPool:
+            worker_pool.descartar_pool()
+            solucao, interrompido = None, True
+        completo = completo and not interrompido
+        if etapas is not None:
+            # Processo filho: só a espera é medida (submissão até o resultado)
+            etapas.registrar(f"nivel:{nivel}", inicio_pool)
+        if solucao:
+            for f in futures.values():
+                f.cancel()
+            with etapa("export"):
+                resultado = build_front_json(db, origem, destino, solucao["chosen"], solucao["dias"],
+                                             index=flight_index)
+            return _com_metadata(resultado, nivel, tempo_inicio, completo)
+
+    for f in futures.values():
+        f.cancel()
+    return _heuristica_com_metadata(resultado_heuristico, tempo_inicio, completo)
+
+
 def optimize_with_fallback(
     request_data: Dict,
     db: Dict,
     model_params: Dict,
-    build_result_func
+    build_result_func,
+    flight_index: Optional[FlightIndex] = None,
+    modo: Optional[str] = None,
+    deadline: float = DEADLINE_FALLBACK
 ) -> Dict:
     """
     Sistema de fallback em 4 níveis
     SEMPRE retorna uma resposta válida (nunca None ou undefined)
+    flight_index: índice de voos do snapshot (construído aqui se não informado)
+    modo: "sequencial" (um nível após o outro) ou "concorrente" (níveis MILP
+          em paralelo, heurísticas imediatas, melhor resposta até `deadline`
+          segundos); padrão em OTM_FALLBACK_MODE
     """
     tempo_inicio = time.time()
     origem = request_data["origem"]
     destino = request_data["destino"]
+    modo = modo or MODO_FALLBACK
     
     try:
-        # NÍVEL 1: Solução Ótima
-        model = build_trip_milp_pulp(**model_params)
-        
-        # Adicionar restrições de locais a visitar
-        variables = model.variablesDict()
-        for local in request_data.get("locais_visitar", []):
-            if local in model_params['V'] and local != origem and local != destino:
-                if f"y_{local}" in variables:
-                    model += variables[f"y_{local}"] == 1, f"Force_visit_{local}"
-        
-        status = model.solve(PULP_CBC_CMD(msg=False, timeLimit=30))
-        
-        if LpStatus[status] == "Optimal":
-            resultado = build_result_func(model, db, origem, destino)
-            resultado["metadata"] = {
-                "nivel_otimizacao": "otima",
-                "nota": "Solução ótima encontrada",
-                "tempo_computacao": round(time.time() - tempo_inicio, 2)
-            }
-            return resultado
-        
-        # NÍVEL 2: Solução Relaxada
-        params_relaxados = relaxar_restricoes(model_params)
-        model_relaxado = build_trip_milp_pulp(**params_relaxados)
-        
-        # Adicionar restrições novamente
-        variables = model_relaxado.variablesDict()
-        for local in request_data.get("locais_visitar", []):
-            if local in params_relaxados['V'] and local != origem and local != destino:
-                if f"y_{local}" in variables:
-                    model_relaxado += variables[f"y_{local}"] == 1, f"Force_visit_{local}"
-        
-        status = model_relaxado.solve(PULP_CBC_CMD(msg=False, timeLimit=30))
-        
-        if LpStatus[status] == "Optimal":
-            resultado = build_result_func(model_relaxado, db, origem, destino)
-            resultado["metadata"] = {
-                "nivel_otimizacao": "boa",
-                "nota": "Solução com restrições relaxadas",
-                "tempo_computacao": round(time.time() - tempo_inicio, 2)
-            }
-            return resultado
-        
-        # NÍVEL 3: Algoritmo Guloso
-        resultado_guloso = algoritmo_guloso(
-            db, origem, destino,
-            request_data["data_ida"],
-            request_data.get("locais_visitar", [])
-        )
-        
-        if resultado_guloso:
-            resultado_guloso["metadata"]["tempo_computacao"] = round(time.time() - tempo_inicio, 2)
-            return resultado_guloso
+        niveis_milp = ["otima", "boa"]
+
+        # NÍVEL 1 (itinerário simples): caminho mínimo exato, sem MILP
+        if caminho_minimo_aplicavel(model_params, request_data.get("locais_visitar", [])):
+            with etapa("caminho_minimo"):
+                solucao = resolver_caminho_minimo(**model_params)
+            if solucao is not None:
+                with etapa("export"):
+                    resultado = build_front_json(db, origem, destino, solucao["chosen"], solucao["dias"],
+                                                 index=flight_index)
+                resultado["metadata"] = {
+                    "nivel_otimizacao": "otima",
+                    "nota": "Solução ótima encontrada (caminho mínimo)",
+                    "tempo_computacao": round(time.time() - tempo_inicio, 2),
+                    "completo": True
+                }
+                return resultado
+            # Sem caminho viável o MILP também seria inviável: segue para o nível 2
+            niveis_milp = ["boa"]
+
+        if modo == "concorrente":
+            return _fallback_concorrente(
+                request_data, db, model_params, flight_index, niveis_milp, tempo_inicio, deadline
+            )
+
+        # NÍVEL 1: Solução Ótima / NÍVEL 2: Solução Relaxada
+        params_por_nivel = {"otima": model_params, "boa": relaxar_restricoes(model_params)}
+        completo = True
+        for nivel in niveis_milp:
+            with etapa(f"nivel:{nivel}"):
+                resultado, interrompido = resolver_nivel_milp(
+                    params_por_nivel[nivel], request_data, db, build_result_func, flight_index=flight_index
+                )
+            completo = completo and not interrompido
+            if resultado:
+                return _com_metadata(resultado, nivel, tempo_inicio, completo)
         
-        # NÍVEL 4: Rota Básica (último recurso)
-        resultado_basico = criar_rota_basica(db, origem, destino, request_data["data_ida"], request_data)
-        resultado_basico["metadata"]["tempo_computacao"] = round(time.time() - tempo_inicio, 2)
-        return resultado_basico
+        # NÍVEIS 3 e 4: Guloso / Rota Básica
+        with etapa("heuristica"):
+            resultado = solucao_heuristica(db, request_data, flight_index)
+        return _heuristica_com_metadata(resultado, tempo_inicio, completo)
         
     except Exception as e:
         # Fallback final: retornar estrutura válida com erro
@@ -0,0 +1,138 @@
+"""
+Índice de voos construído uma vez por carga do banco
+Substitui as varreduras lineares em db["arestas"] por lookups em dict/bisect
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+
+def flight_id(aresta: Dict) -> str:
+    """
+    Id único do voo (mesmo formato usado no parser e nas variáveis x_i_j_f)
+    """
+    return f'{aresta["voo_cod"]}_{aresta["data_voo"]}_{aresta["hora_saida"]}'
+
+
+def horario_saida(aresta: Dict) -> datetime:
+    """
+    Data/hora absoluta de saída (aceita hora_saida "HH:MM" ou "HH:MM:SS")
+    """
+    return datetime.fromisoformat(f'{aresta["data_voo"]} {aresta["hora_saida"]}')
+
+
+def horario_chegada(aresta: Dict) -> datetime:
+    """
+    Data/hora absoluta de chegada (saída + tempo_voo em minutos)
+    """
+    return horario_saida(aresta) + timedelta(minutes=float(aresta["tempo_voo"]))
+
+
+class _Serie:
+    """
+    Lista de voos ordenada por horário de saída, com as chaves separadas
+    para permitir consultas de intervalo via bisect
+    """
+
+    __slots__ = ("saidas", "voos")
+
+    def __init__(self, itens: List[Tuple[datetime, Dict]]):
+        itens.sort(key=lambda it: it[0])
+        self.saidas = [dep for dep, _ in itens]
+        self.voos = [a for _, a in itens]
+
+    def intervalo(self, depois_de: Optional[datetime] = None,
+                  antes_de: Optional[datetime] = None) -> List[Dict]:
+        """
+        Voos com depois_de <= saída <= antes_de (limites opcionais)
+        """
+        ini = 0 if depois_de is None else bisect_left(self.saidas, depois_de)
+        fim = len(self.saidas) if antes_de is None else bisect_right(self.saidas, antes_de)
+        return self.voos[ini:fim]
+
+
+_VAZIA = _Serie([])
+
+
+class FlightIndex:
+    """
+    Índice somente leitura sobre db["arestas"]
+
+    Chaves:
+    - origem                 -> voos saindo da cidade (ordenados por saída)
+    - (origem, destino)      -> voos da rota (ordenados por saída)
+    - (origem, data_voo)     -> voos saindo da cidade no dia
+    - (origem, destino, fid) -> aresta do voo
+    """
+
+    def __init__(self, db: Dict):
+        self.arestas: List[Dict] = db.get("arestas", [])
+
+        self.por_id: Dict[Tuple[str, str, str], Dict] = {}
+        self._por_cod: Dict[Tuple[str, str, str], Dict] = {}
+        por_origem: Dict[str, List[Tuple[datetime, Dict]]] = {}
+        por_rota: Dict[Tuple[str, str], List[Tuple[datetime, Dict]]] = {}
+        por_origem_data: Dict[Tuple[str, str], List[Tuple[datetime, Dict]]] = {}
+
+        for a in self.arestas:
+            i, j = a["origem"], a["destino"]
+            dep = horario_saida(a)
+
+            self.por_id.setdefault((i, j, flight_id(a)), a)
+            # Primeiro voo da rota com esse código (fallback do encontrar_voo)
+            self._por_cod.setdefault((i, j, a.get("voo_cod")), a)
+
+            por_origem.setdefault(i, []).append((dep, a))
+            por_rota.setdefault((i, j), []).append((dep, a))
+            por_origem_data.setdefault((i, a["data_voo"]), []).append((dep, a))
+
+        self._por_origem = {k: _Serie(v) for k, v in por_origem.items()}
+        self._por_rota = {k: _Serie(v) for k, v in por_rota.items()}
+        self._por_origem_data = {k: _Serie(v) for k, v in por_origem_data.items()}
+
+    # ---------------------------
+    # Consultas
+    # ---------------------------
+    def voo(self, origem: str, destino: str, fid: str) -> Optional[Dict]:
+        """
+        Aresta pelo id completo VOOCOD_DATA_HORA; se não existir, o primeiro
+        voo da rota com o mesmo voo_cod (mesmo critério do encontrar_voo)
+        """
+        a = self.por_id.get((origem, destino, fid))
+        if a is not None:
+            return a
+        return self._por_cod.get((origem, destino, fid.split('_')[0]))
+
+    def voos_saindo(self, origem: str, depois_de: Optional[datetime] = None,
+                    antes_de: Optional[datetime] = None) -> List[Dict]:
+        """
+        Voos saindo de `origem` no intervalo [depois_de, antes_de]
+        """
+        return self._por_origem.get(origem, _VAZIA).intervalo(depois_de, antes_de)
+
+    def voos_rota(self, origem: str, destino: str, depois_de: Optional[datetime] = None,
+                  antes_de: Optional[datetime] = None) -> List[Dict]:
+        """
+        Voos origem -> destino no intervalo [depois_de, antes_de]
+        """
+        return self._por_rota.get((origem, destino), _VAZIA).intervalo(depois_de, antes_de)
+
+    def voos_no_dia(self, origem: str, data: str, destino: Optional[str] = None) -> List[Dict]:
+        """
+        Voos saindo de `origem` na data YYYY-MM-DD (opcionalmente só para `destino`)
+        """
+        voos = self._por_origem_data.get((origem, data), _VAZIA).voos
+        if destino is None:
+            return voos
+        return [a for a in voos if a["destino"] == destino]
+
+
+def get_flight_index(db: Dict, index: Optional[FlightIndex] = None) -> FlightIndex:
+    """
+    Retorna o índice informado ou constrói um novo a partir de db
+    (na API o índice vem do snapshot do banco, construído uma vez por versão)
+    """
+    if index is not None:
+        return index
+    return FlightIndex(db)
@@ -1,10 +1,169 @@
+import argparse
+import hashlib
 import json
+import mmap
+import os
 import re
-from datetime import datetime
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from itertools import repeat
+from operator import sub, truediv
 
+from stage_timing import etapa
 
-def parse_db_to_model_inputs(json_path: str, user_start_date: str = None, validate_dates: bool = True):
-    db = json.load(open(json_path, "r", encoding="utf-8"))
+
+# Referência dos horários absolutos (sem fuso)
+_EPOCA = datetime(1970, 1, 1)
+
+# Filtro de dominância em F (ver filtrar_dominados); OTM_DOMINANCIA=0 desliga
+DOMINANCIA = os.environ.get("OTM_DOMINANCIA", "1") != "0"
+
+
+def load_db(json_path: str = None, db: dict = None):
+    """
+    Retorna o banco já carregado (db) ou lê o JSON de json_path
+    """
+    if db is not None:
+        return db
+    with open(json_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class VoosPorArco(dict):
+    """
+    F[(i, j)] -> [fid] com `versao`: hash do conteúdo, calculado uma vez na
+    compilação (chave do TemplatePool; vai junto no pickle para o pool)
+    """
+
+    versao = None
+
+
+class VoosCompilados:
+    """
+    Parte das entradas do modelo que não depende de t0, calculada uma vez
+    por versão do banco (ver compilar_voos)
+
+    - chaves: (i, j, fid) na ordem do banco
+    - saida_min: horário de saída de cada voo em minutos desde 1970-01-01
+    - F, DUR, C: dicts prontos, compartilhados entre requisições (somente leitura);
+      F é um VoosPorArco com F.versao
+    - dominados: voos fora de F pelo filtro de dominância (DUR/C/DEP
+      continuam com todos os voos, p/ heurísticas que usam o banco inteiro)
+
+    Por requisição só o DEP é gerado (dep_relativo), numa passada em C
+    (map/zip) sem parse de datas.
+    """
+
+    def __init__(self, chaves, saida_min, duracao_min, custo, dominancia=None):
+        self.chaves = chaves
+        self.saida_min = array("d", saida_min)
+        # Preço do JSON pode vir como int/str: float uma vez, antes da dominância
+        custo = array("d", map(float, custo))
+
+        if dominancia is None:
+            dominancia = DOMINANCIA
+        dominados = filtrar_dominados(chaves, self.saida_min, duracao_min, custo) if dominancia else set()
+        self.dominados = len(dominados)
+
+        self.F = VoosPorArco()
+        for n, (i, j, f) in enumerate(chaves):
+            lista = self.F.setdefault((i, j), [])
+            if n not in dominados:
+                lista.append(f)
+        self.F.versao = hashlib.sha256(repr(list(self.F.items())).encode("utf-8")).hexdigest()
+
+        # DUR vem em minutos -> horas
+        self.DUR = dict(zip(chaves, map(truediv, duracao_min, repeat(60.0))))
+        self.C = dict(zip(chaves, custo))
+
+    def dep_relativo(self, t0: datetime) -> dict:
+        """
+        DEP[(i,j,f)] em horas desde t0
+        """
+        t0_min = (t0 - _EPOCA).total_seconds() / 60.0
+        return dict(zip(self.chaves, map(truediv, map(sub, self.saida_min, repeat(t0_min)), repeat(60.0))))
+
+    def intervalo_datas(self):
+        if not self.chaves:
+            return None, None
+        return tuple(
+            (_EPOCA + timedelta(minutes=m)).strftime("%Y-%m-%d") for m in (min(self.saida_min), max(self.saida_min))
+        )
+
+
+def filtrar_dominados(chaves, saida_min, duracao_min, custo) -> set:
+    """
+    Índices dos voos dominados por outro do mesmo arco e dia: outro voo que
+    custa no máximo o mesmo, sai no mesmo horário ou depois e chega no mesmo
+    horário ou antes (empate total: fica o primeiro). Trocar o dominado pelo
+    dominante mantém qualquer itinerário viável (estadias e TMAX só folgam)
+    e não aumenta o custo, então o ótimo do modelo não muda.
+    """
+    grupos = {}
+    for n, (i, j, _) in enumerate(chaves):
+        grupos.setdefault((i, j, int(saida_min[n] // 1440)), []).append(n)
+
+    dominados = set()
+    for grupo in grupos.values():
+        if len(grupo) < 2:
+            continue
+        # Mais barato primeiro; no empate, quem sai depois e chega antes
+        grupo.sort(key=lambda n: (custo[n], -saida_min[n], saida_min[n] + duracao_min[n], n))
+        mantidos = []
+        for n in grupo:
+            saida, chegada = saida_min[n], saida_min[n] + duracao_min[n]
+            if any(s >= saida and c <= chegada for s, c in mantidos):
+                dominados.add(n)
+            else:
+                mantidos.append((saida, chegada))
+    return dominados
+
+
+def compilar_voos(db) -> VoosCompilados:
+    """
+    Compila os voos do banco (dict do JSON ou ColumnarDB) em VoosCompilados
+    Use snapshot.derivado("voos_compilados", compilar_voos) para fazer isso
+    uma vez por versão do banco.
+    """
+    if isinstance(db, ColumnarDB):
+        col, strings = db.colunas, db.strings
+        chaves = [
+            (strings[i], strings[j], f)
+            for i, j, f in zip(col["origem"], col["destino"], db.fids)
+        ]
+        return VoosCompilados(chaves, col["saida_min"], col["tempo_voo"], col["custo_passagem"])
+
+    arestas = db["arestas"]
+    chaves, saida_min = [], []
+    for a in arestas:
+        # id do voo (único) — dá pra usar só voo_cod se você preferir
+        f = f'{a["voo_cod"]}_{a["data_voo"]}_{a["hora_saida"]}'
+        chaves.append((a["origem"], a["destino"], f))
+
+        dep_dt = datetime.fromisoformat(f'{a["data_voo"]} {a["hora_saida"]}')
+        saida_min.append((dep_dt - _EPOCA).total_seconds() / 60.0)
+
+    return VoosCompilados(
+        chaves, saida_min,
+        [float(a["tempo_voo"]) for a in arestas],
+        [a["custo_passagem"] for a in arestas]
+    )
+
+
+def parse_db_to_model_inputs(json_path: str = None, user_start_date: str = None,
+                             validate_dates: bool = True, db: dict = None,
+                             compilado: VoosCompilados = None):
+    """
+    compilado: voos já compilados do mesmo banco (compilar_voos); sem ele
+    a compilação é feita aqui. F/DUR/C retornados são compartilhados com o
+    compilado e não devem ser alterados.
+    """
+    db = load_db(json_path, db)
+    if compilado is None:
+        compilado = compilar_voos(db)
 
     # Tempo 0 do roteiro (em horas)
     # Usa data informada pelo usuário ou fallback para metadata
@@ -15,14 +174,11 @@ def parse_db_to_model_inputs(json_path: str, user_start_date: str = None, valida
         # Validar se existem voos disponíveis para esta data
         if validate_dates:
             data_solicitada = user_start_date.split()[0] if ' ' in user_start_date else user_start_date
-            datas_disponiveis = sorted(set(a['data_voo'] for a in db['arestas']))
+            data_min, data_max = compilado.intervalo_datas()
             
-            if not datas_disponiveis:
+            if data_min is None:
                 raise ValueError("Nenhum voo disponível no banco de dados")
             
-            data_min = datas_disponiveis[0]
-            data_max = datas_disponiveis[-1]
-            
             if data_solicitada < data_min or data_solicitada > data_max:
                 raise ValueError(
                     f"Data solicitada ({data_solicitada}) fora do intervalo disponível. "
@@ -41,51 +197,43 @@ def parse_db_to_model_inputs(json_path: str, user_start_date: str = None, valida
     C_food  = {i: float(db["nos"][i]["custo_refeicao_diaria"]) for i in V}
     C_transfer = {i: float(db["nos"][i]["transporte"]["transfer_ida_volta"]) for i in V}
 
-    # Voos: construir F[(i,j)] = [f1,f2,...] e DEP/DUR/C[(i,j,f)]
-    F, DEP, DUR, C = {}, {}, {}, {}
+    # Voos: F[(i,j)] = [f1,f2,...] e DUR/C[(i,j,f)] do compilado; DEP: horas desde t0
+    DEP = compilado.dep_relativo(t0)
 
-    for a in db["arestas"]:
-        i, j = a["origem"], a["destino"]
-
-        # id do voo (único) — dá pra usar só voo_cod se você preferir
-        f = f'{a["voo_cod"]}_{a["data_voo"]}_{a["hora_saida"]}'
-
-        F.setdefault((i, j), []).append(f)
-
-        # DEP: horas desde t0
-        dep_dt = datetime.fromisoformat(f'{a["data_voo"]} {a["hora_saida"]}')
-        dep_h = (dep_dt - t0).total_seconds() / 3600.0
-
-        # DUR vem em minutos no JSON -> horas
-        dur_h = float(a["tempo_voo"]) / 60.0
+    return V, compilado.F, DEP, compilado.DUR, compilado.C, C_hotel, C_food, C_transfer
 
-        DEP[(i, j, f)] = dep_h
-        DUR[(i, j, f)] = dur_h
-        C[(i, j, f)]   = float(a["custo_passagem"])
 
-    return V, F, DEP, DUR, C, C_hotel, C_food, C_transfer
-
-
-def get_available_date_range(json_path: str):
+def get_available_date_range(json_path: str = None, db: dict = None):
     """
     Retorna o intervalo de datas disponíveis no banco de dados
+    Aceita o caminho do JSON ou o dict já carregado (db)
     
     Returns:
         dict com 'data_minima' e 'data_maxima'
     """
-    db = json.load(open(json_path, "r", encoding="utf-8"))
-    datas_disponiveis = sorted(set(a['data_voo'] for a in db['arestas']))
-    
-    if not datas_disponiveis:
-        return {"data_minima": None, "data_maxima": None}
+    db = load_db(json_path, db)
+    data_min, data_max = _intervalo_datas(db)
     
     return {
-        "data_minima": datas_disponiveis[0],
-        "data_maxima": datas_disponiveis[-1]
+        "data_minima": data_min,
+        "data_maxima": data_max
     }
 
 
-def encontrar_voo(database, origem, destino, voo_id):
+def _intervalo_datas(db):
+    """
+    (primeira, última) data_voo do banco, ou (None, None) se não houver voos
+    """
+    if isinstance(db, ColumnarDB):
+        return db.intervalo_datas()
+
+    datas_disponiveis = sorted(set(a['data_voo'] for a in db['arestas']))
+    if not datas_disponiveis:
+        return None, None
+    return datas_disponiveis[0], datas_disponiveis[-1]
+
+
+def encontrar_voo(database, origem, destino, voo_id, index=None):
     """
     Função auxiliar para localizar um voo no database.json
     
@@ -93,8 +241,13 @@ def encontrar_voo(database, origem, destino, voo_id):
     - origem e destino
     - voo_id no formato VOOCOD_DATA_HORA ou match parcial
     
+    Se `index` (FlightIndex) for informado, a busca é um lookup em dict
+    
     Retorna o dict da aresta ou None se não encontrado
     """
+    if index is not None:
+        return index.voo(origem, destino, voo_id)
+
     # Tentar extrair componentes do voo_id
     partes = voo_id.split('_')
     
@@ -123,27 +276,28 @@ def encontrar_voo(database, origem, destino, voo_id):
     return None
 
 
-def build_front_json_from_solution(model, db, origin, dest, dias_vars_prefix="dias_"):
+def build_front_json_from_solution(model, db, origin, dest, dias_vars_prefix="dias_", index=None):
     """
     model: LpProblem resolvido (PuLP)
     db: dict já carregado do database.json
     origin/dest: strings
-    """
+    index: FlightIndex do banco (opcional; evita varrer db["arestas"])
 
-    # ---------------------------
-    # 1) Indexar voos do DB: (i,j,fid) -> info
-    # ---------------------------
-    flight_by_fid = {}
-    flights_by_ij = {}
+    Modelos dos construtores do projeto trazem model.solution_handle
+    (variável -> (i, j, fid) / cidade): a solução é lida direto dele.
+    Sem handle, os voos saem dos nomes das variáveis, o que falha quando
+    o PuLP troca caracteres do id (ex.: "-" da data vira "_").
+    """
 
-    for a in db["arestas"]:
-        i, j = a["origem"], a["destino"]
-        fid = f'{a["voo_cod"]}_{a["data_voo"]}_{a["hora_saida"]}'  # mesmo id do parser
-        flight_by_fid[(i, j, fid)] = a
-        flights_by_ij.setdefault((i, j), []).append(fid)
+    handle = getattr(model, "solution_handle", None)
+    if handle is not None:
+        with etapa("extract"):
+            chosen, dias = handle.chosen(), handle.days()
+        with etapa("export"):
+            return build_front_json(db, origin, dest, chosen, dias, index=index)
 
     # ---------------------------
-    # 2) Pegar voos escolhidos x_{i}_{j}_{fid} == 1
+    # Pegar voos escolhidos x_{i}_{j}_{fid} == 1
     # ---------------------------
     chosen = []  # list of (i,j,fid)
     pat = re.compile(r"^x_(.+?)_(.+?)_(.+)$")
@@ -157,7 +311,56 @@ def build_front_json_from_solution(model, db, origin, dest, dias_vars_prefix="di
             chosen.append((i, j, fid))
 
     # ---------------------------
-    # 3) Construir caminho (origem -> ... -> destino)
+    # Dias por cidade (dias_i inteiros) para custos
+    # ---------------------------
+    dias = {}
+    for v in model.variables():
+        if v.varValue is None:
+            continue
+        if v.name.startswith(dias_vars_prefix):
+            city = v.name[len(dias_vars_prefix):]
+            dias[city] = int(round(v.varValue))
+
+    return build_front_json(db, origin, dest, chosen, dias, index=index)
+
+
+def _voos_escolhidos(db, chosen, index=None):
+    """
+    (i, j, fid) -> aresta só dos voos escolhidos: lookup no FlightIndex,
+    ou uma passada em db["arestas"] que monta o id apenas nas rotas usadas
+    """
+    if index is not None:
+        return {k: index.por_id[k] for k in chosen if k in index.por_id}
+
+    rotas = set((i, j) for i, j, _ in chosen)
+    procurados = set(chosen)
+    encontrados = {}
+    for a in db["arestas"]:
+        if (a["origem"], a["destino"]) not in rotas:
+            continue
+        k = (a["origem"], a["destino"], f'{a["voo_cod"]}_{a["data_voo"]}_{a["hora_saida"]}')  # mesmo id do parser
+        if k in procurados:
+            encontrados.setdefault(k, a)
+    return encontrados
+
+
+def build_front_json(db, origin, dest, chosen, dias, index=None):
+    """
+    Monta o JSON do front a partir de uma solução já extraída
+    (usado pelo MILP e pelos solvers que não geram LpProblem)
+
+    chosen: lista de (i, j, fid) dos voos escolhidos
+    dias: dict cidade -> diárias (inteiro)
+    index: FlightIndex do banco (opcional)
+    """
+
+    # ---------------------------
+    # 1) Voos escolhidos no DB: (i,j,fid) -> info
+    # ---------------------------
+    flight_by_fid = _voos_escolhidos(db, chosen, index)
+
+    # ---------------------------
+    # 2) Construir caminho (origem -> ... -> destino)
     # ---------------------------
     # como é rota aberta ida, deve ter 1 arco saindo de cada intermediária, etc.
     next_city = {}
@@ -182,7 +385,7 @@ def build_front_json_from_solution(model, db, origin, dest, dias_vars_prefix="di
         
         # Se não encontrou, tentar com a função auxiliar
         if not a:
-            a = encontrar_voo(db, i, j, fid)
+            a = encontrar_voo(db, i, j, fid, index=index)
 
         # info do voo pro front (preencher com dados reais do database)
         voo_info = {
@@ -194,27 +397,22 @@ def build_front_json_from_solution(model, db, origin, dest, dias_vars_prefix="di
             "duracao_min": float(a.get("tempo_voo", 0.0)) if a else None,
             "preco": float(a.get("custo_passagem", 0.0)) if a else 0.0
         }
+        # Itinerários com conexão (crawler com todas as ofertas): trechos reais
+        if a and a.get("trechos"):
+            voo_info["trechos"] = a["trechos"]
 
         trechos.append({"origem": i, "destino": j, "voo": voo_info})
         caminho.append(j)
         cur = j
 
     # ---------------------------
-    # 4) Dias por cidade (dias_i inteiros) para custos
+    # 3) Cidades visitadas
     # ---------------------------
-    dias = {}
-    for v in model.variables():
-        if v.varValue is None:
-            continue
-        if v.name.startswith(dias_vars_prefix):
-            city = v.name[len(dias_vars_prefix):]
-            dias[city] = int(round(v.varValue))
-
     # Se o front só mostrar custos do "destino" (ou cidades visitadas)
     visited = set(caminho)  # você pode trocar por y_i==1 se preferir
 
     # ---------------------------
-    # 5) Custos abertos
+    # 4) Custos abertos
     # ---------------------------
     # Voos: soma dos preços dos escolhidos (usando dados reais do database)
     custo_voos = 0.0
@@ -223,7 +421,7 @@ def build_front_json_from_solution(model, db, origin, dest, dias_vars_prefix="di
         
         # Se não encontrou, tentar com a função auxiliar
         if not a:
-            a = encontrar_voo(db, i, j, fid)
+            a = encontrar_voo(db, i, j, fid, index=index)
         
         if a:
             custo_voos += float(a.get("custo_passagem", 0.0))
@@ -264,7 +462,7 @@ def build_front_json_from_solution(model, db, origin, dest, dias_vars_prefix="di
     total = custo_voos + custo_hosp + custo_food + custo_transp
 
     # ---------------------------
-    # 6) JSON final
+    # 5) JSON final
     # ---------------------------
     out = {
         "rota": {
@@ -287,4 +485,310 @@ def build_front_json_from_solution(model, db, origin, dest, dias_vars_prefix="di
         }
     }
 
-    return out
\ No newline at end of file
+    return out
+
+
+# =========================
+# Formato colunar binário
+# =========================
+#
+# Arquivo .otmb = MAGIC + tamanho do cabeçalho (uint32) + cabeçalho JSON
+# (metadata, nos, tabela de strings, layout das colunas) + colunas alinhadas
+# em 8 bytes. Cada voo é uma linha; origem/destino/cia/voo_cod são índices na
+# tabela de strings e a saída é em minutos desde 1970-01-01 (sem fuso).
+# Os demais campos da aresta (escalas, trechos, coletado_em, ...) vão como
+# JSON numa seção de bytes depois das colunas, fora do cabeçalho: a linha
+# guarda início/tamanho (colunas "extras_ini"/"extras_tam"; tamanho 0 quando
+# não há) e o JSON só é decodificado quando a aresta é lida.
+# A leitura faz mmap do arquivo e usa memoryview das colunas (sem cópia).
+
+COLUNAR_MAGIC = b"OTMCOL03"
+
+# nome da coluna -> typecode do array
+COLUNAS = {
+    "origem": "I",
+    "destino": "I",
+    "saida_min": "i",
+    "tempo_voo": "d",
+    "custo_passagem": "d",
+    "cia": "I",
+    "voo_cod": "I",
+    "extras_ini": "Q",
+    "extras_tam": "I",
+}
+
+# Campos da aresta com coluna própria (data_voo/hora_saida viram saida_min)
+CAMPOS_COLUNARES = {"origem", "destino", "data_voo", "hora_saida", "tempo_voo", "custo_passagem",
+                    "cia", "voo_cod"}
+
+
+def export_db_columnar(db: dict, path: str):
+    """
+    Grava o banco (dict do database.json) no formato colunar binário
+    """
+    strings, idx_string = [], {}
+
+    def string_id(valor):
+        if valor not in idx_string:
+            idx_string[valor] = len(strings)
+            strings.append(valor)
+        return idx_string[valor]
+
+    # Seção de extras: JSON de cada linha, repetidos gravados uma vez
+    extras_blob, idx_extras = bytearray(), {}
+
+    def extras_id(extras):
+        if not extras:
+            return 0, 0
+        raw = json.dumps(extras, ensure_ascii=False).encode("utf-8")
+        if raw not in idx_extras:
+            idx_extras[raw] = len(extras_blob)
+            extras_blob.extend(raw)
+        return idx_extras[raw], len(raw)
+
+    colunas = {nome: array(tipo) for nome, tipo in COLUNAS.items()}
+    for a in db["arestas"]:
+        saida = datetime.fromisoformat(f'{a["data_voo"]} {a["hora_saida"]}')
+        colunas["origem"].append(string_id(a["origem"]))
+        colunas["destino"].append(string_id(a["destino"]))
+        colunas["saida_min"].append(int((saida - _EPOCA).total_seconds() // 60))
+        colunas["tempo_voo"].append(float(a["tempo_voo"]))
+        colunas["custo_passagem"].append(float(a["custo_passagem"]))
+        colunas["cia"].append(string_id(a.get("cia", "")))
+        colunas["voo_cod"].append(string_id(a["voo_cod"]))
+        ini, tam = extras_id({k: v for k, v in a.items() if k not in CAMPOS_COLUNARES})
+        colunas["extras_ini"].append(ini)
+        colunas["extras_tam"].append(tam)
+
+    header = {
+        "metadata": db.get("metadata", {}),
+        "nos": db["nos"],
+        "strings": strings,
+        "linhas": len(db["arestas"]),
+        "byteorder": sys.byteorder,
+        "colunas": [],
+        "extras": [0, len(extras_blob)],
+    }
+
+    # Offsets dependem do tamanho do cabeçalho: calcula com placeholder e ajusta
+    def layout(inicio_dados):
+        offset, cols = inicio_dados, []
+        for nome, tipo in COLUNAS.items():
+            cols.append([nome, tipo, offset])
+            offset += colunas[nome].itemsize * len(colunas[nome])
+            offset += -offset % 8
+        return cols, offset
+
+    inicio = 0
+    while True:
+        header["colunas"], header["extras"][0] = layout(inicio)
+        raw = json.dumps(header, ensure_ascii=False).encode("utf-8")
+        novo_inicio = len(COLUNAR_MAGIC) + 4 + len(raw)
+        novo_inicio += -novo_inicio % 8
+        if novo_inicio == inicio:
+            break
+        inicio = novo_inicio
+
+    with open(path, "wb") as f:
+        f.write(COLUNAR_MAGIC)
+        f.write(struct.pack("<I", len(raw)))
+        f.write(raw)
+        for nome, _, offset in header["colunas"]:
+            f.write(b"\0" * (offset - f.tell()))
+            colunas[nome].tofile(f)
+        f.write(b"\0" * (header["extras"][0] - f.tell()))
+        f.write(extras_blob)
+
+
+def load_db_columnar(path: str, versao: str = None) -> "ColumnarDB":
+    """
+    Abre um arquivo .otmb (mmap, leitura sob demanda); com `versao`, exige
+    que o conteúdo tenha esse hash (ValueError se o arquivo foi trocado)
+    """
+    return ColumnarDB(path, versao)
+
+
+# Processos do pool: banco reaberto por caminho, um por arquivo (última versão)
+_reabertos = {}
+
+
+def _reabrir_columnar(path: str, versao: str) -> "ColumnarDB":
+    """
+    Unpickle de ColumnarDB: reabre o arquivo uma vez por versão no processo
+    """
+    aberto = _reabertos.get(path)
+    if aberto is None or aberto.versao() != versao:
+        aberto = _reabertos[path] = load_db_columnar(path, versao)
+    return aberto
+
+
+def convert_json_to_columnar(json_path: str, out_path: str):
+    """
+    Converte o database.json para o formato colunar
+    """
+    export_db_columnar(load_db(json_path), out_path)
+
+
+class _ArestasColunares(Sequence):
+    """
+    Visão de db["arestas"] sobre as colunas: cada acesso monta o dict do voo
+    no mesmo formato do JSON, então o código que itera arestas não muda
+    """
+
+    def __init__(self, db: "ColumnarDB"):
+        self._db = db
+
+    def __len__(self):
+        return self._db.linhas
+
+    def __getitem__(self, k):
+        if isinstance(k, slice):
+            return [self._db.aresta(n) for n in range(*k.indices(len(self)))]
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError(k)
+        return self._db.aresta(k)
+
+    def __iter__(self):
+        return (self._db.aresta(n) for n in range(len(self)))
+
+
+class ColumnarDB:
+    """
+    Banco de voos no formato colunar (mmap)
+
+    Acesso como o dict do JSON (db["metadata"], db["nos"], db["arestas"],
+    db.get(...)) e colunas tipadas em db.colunas[nome] (memoryview).
+    Ao ser enviado para outro processo (pickle) é reaberto pelo caminho e
+    conferido pelo hash: se o arquivo já foi trocado, a reabertura falha
+    (ValueError) em vez de usar dados de outra versão.
+    """
+
+    def __init__(self, path: str, versao: str = None):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._versao = None
+
+        buf = memoryview(self._mmap)
+        if bytes(buf[:len(COLUNAR_MAGIC)]) != COLUNAR_MAGIC:
+            raise ValueError(f"{path} não é um banco colunar ({COLUNAR_MAGIC!r})")
+        if versao is not None and self.versao() != versao:
+            raise ValueError(f"{path} mudou desde a versão {versao[:12]}")
+        tam = struct.unpack_from("<I", buf, len(COLUNAR_MAGIC))[0]
+        inicio = len(COLUNAR_MAGIC) + 4
+        header = json.loads(bytes(buf[inicio:inicio + tam]).decode("utf-8"))
+
+        self.metadata = header["metadata"]
+        self.nos = header["nos"]
+        self.strings = header["strings"]
+        self.linhas = header["linhas"]
+
+        self.colunas = {}
+        for nome, tipo, offset in header["colunas"]:
+            tamanho = array(tipo).itemsize * self.linhas
+            if header["byteorder"] == sys.byteorder:
+                self.colunas[nome] = buf[offset:offset + tamanho].cast(tipo)
+            else:
+                col = array(tipo)
+                col.frombytes(buf[offset:offset + tamanho])
+                col.byteswap()
+                self.colunas[nome] = memoryview(col)
+        offset, tamanho = header["extras"]
+        self._extras = buf[offset:offset + tamanho]
+
+        self.arestas = _ArestasColunares(self)
+        self._fids = None
+
+    def buffer(self) -> memoryview:
+        """
+        Conteúdo bruto do arquivo (para hash de versão)
+        """
+        return memoryview(self._mmap)
+
+    def versao(self) -> str:
+        """
+        Hash SHA-256 do conteúdo (calculado uma vez)
+        """
+        if self._versao is None:
+            self._versao = hashlib.sha256(self.buffer()).hexdigest()
+        return self._versao
+
+    def __reduce__(self):
+        return (_reabrir_columnar, (self.path, self.versao()))
+
+    # Interface de dict do database.json
+    def __getitem__(self, chave):
+        if chave == "arestas":
+            return self.arestas
+        if chave == "nos":
+            return self.nos
+        if chave == "metadata":
+            return self.metadata
+        raise KeyError(chave)
+
+    def get(self, chave, padrao=None):
+        try:
+            return self[chave]
+        except KeyError:
+            return padrao
+
+    def keys(self):
+        return ["metadata", "nos", "arestas"]
+
+    def __contains__(self, chave):
+        return chave in self.keys()
+
+    def aresta(self, n: int) -> dict:
+        """
+        Linha n no formato de db["arestas"][n] do JSON
+        """
+        col, strings = self.colunas, self.strings
+        saida = _EPOCA + timedelta(minutes=col["saida_min"][n])
+        aresta = {
+            "origem": strings[col["origem"][n]],
+            "destino": strings[col["destino"][n]],
+            "data_voo": saida.strftime("%Y-%m-%d"),
+            "hora_saida": saida.strftime("%H:%M"),
+            "custo_passagem": col["custo_passagem"][n],
+            "tempo_voo": col["tempo_voo"][n],
+            "cia": strings[col["cia"][n]],
+            "voo_cod": strings[col["voo_cod"][n]],
+        }
+        tam = col["extras_tam"][n]
+        if tam:
+            ini = col["extras_ini"][n]
+            aresta.update(json.loads(bytes(self._extras[ini:ini + tam])))
+        return aresta
+
+    @property
+    def fids(self):
+        """
+        Ids VOOCOD_DATA_HORA de cada linha (calculados uma vez)
+        """
+        if self._fids is None:
+            strings, cods = self.strings, self.colunas["voo_cod"]
+            self._fids = [
+                f'{strings[cods[n]]}_{(_EPOCA + timedelta(minutes=m)).strftime("%Y-%m-%d_%H:%M")}'
+                for n, m in enumerate(self.colunas["saida_min"])
+            ]
+        return self._fids
+
+    def intervalo_datas(self):
+        if not self.linhas:
+            return None, None
+        saidas = self.colunas["saida_min"]
+        return tuple(
+            (_EPOCA + timedelta(minutes=m)).strftime("%Y-%m-%d") for m in (min(saidas), max(saidas))
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converte o database.json para o formato colunar (.otmb)")
+    parser.add_argument("json_path", nargs="?", default="database.json")
+    parser.add_argument("out_path", nargs="?", default="database.otmb")
+    args = parser.parse_args()
+
+    convert_json_to_columnar(args.json_path, args.out_path)
+    print(f"{args.json_path} -> {args.out_path}")
@@ -0,0 +1,145 @@
+"""
+Fila de jobs de otimização
+POST enfileira o solve e devolve um id; o cliente acompanha por GET /jobs/{id}.
+Um número fixo de workers executa os jobs (o CBC e os níveis/cenários em
+paralelo já rodam em processos separados), e a fila tem tamanho máximo:
+acima dele a submissão é recusada (controle de admissão / backpressure).
+"""
+
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+JOB_WORKERS = int(os.environ.get("OTM_JOB_WORKERS", 2))
+JOB_FILA_MAX = int(os.environ.get("OTM_JOB_FILA", 32))     # jobs aguardando além dos em execução
+JOB_TTL = float(os.environ.get("OTM_JOB_TTL", 900.0))      # segundos que um job concluído fica disponível
+
+PENDENTE = "pendente"
+EXECUTANDO = "executando"
+CONCLUIDO = "concluido"
+ERRO = "erro"
+
+
+class FilaCheia(Exception):
+    """
+    Fila de jobs no limite; o cliente deve tentar de novo mais tarde
+    """
+
+    def __init__(self, retry_after: int):
+        super().__init__("Fila de otimização cheia")
+        self.retry_after = retry_after
+
+
+class Job:
+    """
+    Estado de um job: status, resultado parcial (se houver) e final
+    """
+
+    def __init__(self, tipo: str):
+        self.id = uuid.uuid4().hex
+        self.tipo = tipo
+        self.status = PENDENTE
+        self.criado_em = time.time()
+        self.iniciado_em: Optional[float] = None
+        self.concluido_em: Optional[float] = None
+        self.parcial: Optional[Any] = None
+        self.resultado: Optional[Any] = None
+        self.erro: Optional[str] = None
+
+    def publicar_parcial(self, resultado: Any):
+        self.parcial = resultado
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "tipo": self.tipo,
+            "status": self.status,
+            "criado_em": self.criado_em,
+            "iniciado_em": self.iniciado_em,
+            "concluido_em": self.concluido_em,
+            "parcial": self.parcial if self.status in (PENDENTE, EXECUTANDO) else None,
+            "resultado": self.resultado,
+            "erro": self.erro,
+        }
+
+
+class JobQueue:
+    """
+    Fila limitada executada por `workers` threads
+
+    - submeter(tipo, funcao): funcao(job) roda num worker; o retorno vira
+      job.resultado. Lança FilaCheia se já houver workers + fila_max jobs ativos.
+    - concluido(tipo, resultado): registra um job já resolvido (ex.: cache)
+    - obter(id): job ou None (jobs concluídos expiram após `ttl`)
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, fila_max: int = JOB_FILA_MAX, ttl: float = JOB_TTL):
+        self.workers = workers
+        self.fila_max = fila_max
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="otm-job")
+        self._jobs: Dict[str, Job] = {}
+        self._ativos = 0
+        self._lock = threading.Lock()
+
+    def _limpar_expirados(self):
+        limite = time.time() - self.ttl
+        expirados = [
+            job_id for job_id, job in self._jobs.items()
+            if job.concluido_em is not None and job.concluido_em < limite
+        ]
+        for job_id in expirados:
+            del self._jobs[job_id]
+
+    def submeter(self, tipo: str, funcao: Callable[[Job], Any]) -> Job:
+        with self._lock:
+            self._limpar_expirados()
+            if self._ativos >= self.workers + self.fila_max:
+                raise FilaCheia(retry_after=max(1, self._ativos // max(1, self.workers)))
+            job = Job(tipo)
+            self._jobs[job.id] = job
+            self._ativos += 1
+
+        self._executor.submit(self._executar, job, funcao)
+        return job
+
+    def concluido(self, tipo: str, resultado: Any) -> Job:
+        job = Job(tipo)
+        job.status = CONCLUIDO
+        job.iniciado_em = job.concluido_em = job.criado_em
+        job.resultado = resultado
+        with self._lock:
+            self._limpar_expirados()
+            self._jobs[job.id] = job
+        return job
+
+    def _executar(self, job: Job, funcao: Callable[[Job], Any]):
+        job.status = EXECUTANDO
+        job.iniciado_em = time.time()
+        try:
+            job.resultado = funcao(job)
+            job.status = CONCLUIDO
+        except Exception as e:
+            job.erro = str(e)
+            job.status = ERRO
+        finally:
+            job.concluido_em = time.time()
+            with self._lock:
+                self._ativos -= 1
+
+    def obter(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def estatisticas(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "fila_max": self.fila_max,
+                "ativos": self._ativos,
+                "jobs_guardados": len(self._jobs),
+            }
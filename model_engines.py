@@ -0,0 +1,80 @@
+"""
+Motores de modelagem disponíveis para a otimização
+Todos recebem os mesmos model_params e geram um LpProblem (ou um MatrixModel,
+com a mesma interface) com as variáveis x_{i}_{j}_{f} / dias_{i} e o
+model.solution_handle lido por build_front_json_from_solution
+"""
+
+import os
+from contextlib import contextmanager
+from typing import Dict, Iterable
+
+from otm_model import build_trip_milp_pulp
+from otm_model_time_expanded import build_trip_milp_time_expanded
+from otm_model_matrix import build_trip_milp_matrix
+from otm_model_template import get_template_pool
+from stage_timing import etapa
+
+
+MODEL_ENGINES = {
+    "mtz": build_trip_milp_pulp,                        # MTZ + big-M (modelo original)
+    "time_expanded": build_trip_milp_time_expanded,     # rede expandida no tempo
+    "mtz_matriz": build_trip_milp_matrix,               # MTZ gerado direto em forma matricial
+}
+
+DEFAULT_ENGINE = os.environ.get("OTM_MOTOR", "mtz")
+
+# Motores que recebem as visitas obrigatórias como parâmetro (forced)
+FORCED_ENGINES = {"mtz_matriz"}
+
+# Motores com esqueleto reutilizável (otm_model_template); OTM_MODEL_TEMPLATE=0 desliga
+USAR_TEMPLATE = os.environ.get("OTM_MODEL_TEMPLATE", "1") != "0"
+TEMPLATE_ENGINES = {"mtz"}
+
+
+def get_model_builder(engine: str = None):
+    """
+    Retorna a função construtora do motor (DEFAULT_ENGINE se engine for None)
+    Lança ValueError para motor desconhecido
+    """
+    engine = engine or DEFAULT_ENGINE
+    try:
+        return MODEL_ENGINES[engine]
+    except KeyError:
+        raise ValueError(
+            f"Motor de modelo desconhecido: {engine}. Opções: {', '.join(MODEL_ENGINES)}"
+        )
+
+
+@contextmanager
+def construir_modelo(engine: str, params: Dict, locais_visitar: Iterable[str] = ()):
+    """
+    LpProblem do motor para model_params, com as visitas obrigatórias
+
+    No motor "mtz" o modelo vem de um esqueleto em cache (só números são
+    ajustados por requisição) e pertence à requisição apenas dentro do bloco
+    with: resolva e leia a solução antes de sair.
+    """
+    engine = engine or DEFAULT_ENGINE
+    build_model = get_model_builder(engine)
+    forcar = [
+        local for local in locais_visitar
+        if local in params['V'] and local not in (params['origin'], params['dest'])
+    ]
+
+    if USAR_TEMPLATE and engine in TEMPLATE_ENGINES:
+        with get_template_pool().reserve(params['V'], params['F'], params.get('tau', 24.0)) as template:
+            with etapa("build"):
+                model = template.instantiate(forced=forcar, **params)
+            yield model
+        return
+
+    with etapa("build"):
+        if engine in FORCED_ENGINES:
+            model = build_model(forced=forcar, **params)
+        else:
+            model = build_model(**params)
+            variables = model.variablesDict()
+            for local in forcar:
+                model += variables[f"y_{local}"] == 1, f"Force_visit_{local}"
+    yield model
@@ -3,11 +3,25 @@ Sistema de Otimização com Múltiplas Opções
 Gera 3 melhores rotas com diferentes trade-offs
 """
 
-from typing import Dict, List, Any
-from pulp import PULP_CBC_CMD, LpStatus
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+from concurrent.futures import wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import logging
 import time
-from otm_model import build_trip_milp_pulp
-from import_export_json import build_front_json_from_solution
+from model_engines import construir_modelo
+from solver_backends import ERROS_SOLVER, resolver_modelo, solucao_interrompida
+from import_export_json import build_front_json
+from flight_index import FlightIndex, get_flight_index
+from caminho_minimo import caminho_minimo_aplicavel, resolver_caminho_minimo
+from warm_start import aplicar_warm_start, candidatos_heuristicos
+import worker_pool
+from stage_timing import etapa, etapas_atuais
+
+
+DEADLINE_PADRAO = 30.0  # prazo total de /optimize-multiple (segundos)
+PRAZO_FOLGA = 5.0       # folga sobre o timeLimit do solver por cenário
+
+logger = logging.getLogger(__name__)
 
 
 def calcular_tempo_total_viagem(resultado: Dict) -> float:
@@ -152,165 +166,209 @@ def remover_duplicatas(opcoes: List[Dict], threshold_custo: float = 100.0) -> Li
 
 def otimizar_com_pesos(
     model_params: Dict,
-    db: Dict,
-    origem: str,
-    destino: str,
-    locais_visitar: List[str],
-    build_result_func,
+    request_data: Dict,
+    candidatos: List[List[Tuple[str, str, str]]],
     peso_custo: float = 1.0,
     peso_tempo: float = 1.0,
-    preferir_voo_direto: bool = False,
     timeout: int = 20
-) -> Dict:
+) -> Tuple[Optional[Dict], bool]:
     """
     Otimiza com pesos diferentes na função objetivo
+    Recebe só os model_params do cenário e os itinerários das heurísticas
+    (sem o banco, que não é serializado a cada cenário) e retorna
+    ({"chosen", "dias"} ou None, interrompido), com interrompido=True se o
+    solver parou no tempo limite; o JSON do front é montado no processo da
+    requisição. Função de módulo para poder rodar no pool de processos
+    Falha do solver conta como interrompido (a resposta não vai para o
+    cache); outros erros sobem para quem chamou
     """
     try:
-        # Modificar TMAX se preferir voo direto
-        params = model_params.copy()
-        if preferir_voo_direto:
-            params['TMAX'] = min(params.get('TMAX', 48.0), 20.0)  # Limitar tempo de voo
-        
-        # Construir modelo
-        model = build_trip_milp_pulp(**params)
-        
-        # Adicionar restrições de visita
-        variables = model.variablesDict()
-        for local in locais_visitar:
-            if local in params['V'] and local != origem and local != destino:
-                if f"y_{local}" in variables:
-                    model += variables[f"y_{local}"] == 1, f"Force_visit_{local}"
-        
-        # Modificar função objetivo com pesos
-        # Aqui poderíamos adicionar penalidades para tempo, mas PuLP não permite facilmente
-        # Por simplicidade, vamos usar diferentes parâmetros de modelo
-        
-        status = model.solve(PULP_CBC_CMD(msg=False, timeLimit=timeout))
-        
-        if LpStatus[status] == "Optimal":
-            return build_result_func(model, db, origem, destino)
+        locais_visitar = request_data.get('locais_visitar', [])
+
+        # Itinerário simples: caminho mínimo exato, sem MILP
+        if caminho_minimo_aplicavel(model_params, locais_visitar):
+            with etapa("caminho_minimo"):
+                return resolver_caminho_minimo(**model_params), False
         
-        return None
+        # Construir modelo com as restrições de visita
+        # Pesos na função objetivo: PuLP não permite facilmente penalidades de tempo,
+        # então cada opção usa parâmetros de modelo diferentes
+        with construir_modelo(request_data.get('motor'), model_params, locais_visitar) as model:
+            # Warm start com o itinerário das heurísticas
+            with etapa("warm_start"):
+                warm = bool(candidatos) and aplicar_warm_start(model, model_params, candidatos)
+            
+            with etapa("solve"):
+                status = resolver_modelo(model, time_limit=timeout, warm_start=warm)
+            interrompido = solucao_interrompida(model, status)
+            
+            if status != "Optimal":
+                return None, interrompido
+            handle = model.solution_handle
+            return {"chosen": handle.chosen(), "dias": handle.days()}, interrompido
         
-    except Exception as e:
-        return None
+    except ERROS_SOLVER as e:
+        logger.warning("Cenário %s -> %s: falha do solver: %s",
+                       request_data.get('origem'), request_data.get('destino'), e)
+        return None, True
 
 
-def gerar_multiplas_opcoes(
-    request_data: Dict,
-    db: Dict,
-    model_params: Dict,
-    build_result_func,
-    num_opcoes: int = 3
-) -> Dict:
+def _iterar_sequencial(cenarios: List[Dict], limite_global: float) -> Iterator[Tuple[int, Any, bool]]:
     """
-    Gera múltiplas opções com diferentes trade-offs
-    Retorna as 3 melhores opções classificadas
+    Execução em sequência respeitando o prazo global: o timeLimit de cada
+    cenário é reduzido ao tempo restante e os que não cabem retornam None
     """
-    tempo_inicio = time.time()
-    opcoes = []
-    origem = request_data['origem']
-    destino = request_data['destino']
-    locais_visitar = request_data.get('locais_visitar', [])
-    
-    # OPÇÃO 1: Minimizar Custo (configuração padrão otimizada)
-    opcao1 = otimizar_com_pesos(
-        model_params=model_params,
-        db=db,
-        origem=origem,
-        destino=destino,
-        locais_visitar=locais_visitar,
-        build_result_func=build_result_func,
-        peso_custo=1.0,
-        peso_tempo=0.3,
-        preferir_voo_direto=False,
-        timeout=20
-    )
-    
-    if opcao1:
-        opcao1['titulo'] = "Mais Econômica"
-        opcao1['descricao'] = "Menor custo total, pode ter mais escalas"
-        opcao1['custo_total'] = opcao1['custos']['total']
-        opcao1['tempo_total_viagem'] = calcular_tempo_total_viagem(opcao1)
-        opcao1['numero_escalas'] = contar_escalas(opcao1)
-        opcoes.append(opcao1)
-    
+    for idx, c in enumerate(cenarios):
+        restante = limite_global - time.time()
+        if restante < 1.0:
+            yield idx, None, True
+            continue
+        timeout = min(c.get('timeout', 20), int(restante))
+        with etapa(f"cenario:{idx}"):
+            resultado, interrompido = otimizar_com_pesos(**dict(c, timeout=timeout))
+        yield idx, resultado, interrompido
+
+
+def iterar_cenarios(cenarios: List[Dict], deadline: float) -> Iterator[Tuple[int, Any, bool]]:
+    """
+    Executa os cenários (kwargs de otimizar_com_pesos) em paralelo no pool
+    e produz (índice, solução, interrompido) na ordem em que terminam
+
+    O tempo limite do solver de cada cenário é min(timeout, tempo restante
+    do prazo `deadline` da requisição), então um solve abandonado no prazo
+    não segura a vaga do pool além dele; cenários que não cabem no prazo ou
+    não terminaram a tempo produzem (índice, None, True).
+    Sem pool (OTM_POOL_WORKERS=1) executa em sequência.
+    """
+    inicio = time.time()
+    limite_global = inicio + deadline
+
+    if worker_pool.POOL_WORKERS <= 1:
+        yield from _iterar_sequencial(cenarios, limite_global)
+        return
+
+    futures, limites = {}, {}
+    try:
+        pool = worker_pool.get_process_pool()
+        for idx, c in enumerate(cenarios):
+            restante = limite_global - time.time()
+            if restante < 1.0:
+                break
+            timeout = min(c.get('timeout', 20), int(restante))
+            future = pool.submit(otimizar_com_pesos, **dict(c, timeout=timeout))
+            futures[future] = idx
+            limites[future] = min(limite_global, time.time() + timeout + PRAZO_FOLGA)
+    except BrokenProcessPool:
+        worker_pool.descartar_pool()
+        for future in futures:
+            future.cancel()
+        yield from _iterar_sequencial(cenarios, limite_global)
+        return
+
+    # Cenários que não couberam no prazo
+    for idx in range(len(futures), len(cenarios)):
+        yield idx, None, True
+
+    pendentes = dict(futures)
+    etapas = etapas_atuais()
+    inicio_pool = time.perf_counter()
+
+    while pendentes:
+        proximo_limite = min(limites[f] for f in pendentes)
+        prontos, _ = wait(pendentes, timeout=max(0.0, proximo_limite - time.time()),
+                          return_when=FIRST_COMPLETED)
+
+        for future in prontos:
+            idx = pendentes.pop(future)
+            if etapas is not None:
+                # Processo filho: só a espera é medida (submissão até o resultado)
+                etapas.registrar(f"cenario:{idx}", inicio_pool)
+            try:
+                resultado, interrompido = future.result()
+            except BrokenProcessPool:
+                worker_pool.descartar_pool()
+                resultado, interrompido = None, True
+            yield idx, resultado, interrompido
+
+        agora = time.time()
+        for future in [f for f in pendentes if limites[f] <= agora]:
+            future.cancel()
+            yield pendentes.pop(future), None, True
+
+
+def executar_cenarios(cenarios: List[Dict], deadline: float) -> List[Any]:
+    """
+    Soluções de iterar_cenarios na ordem dos cenários
+    """
+    resultados = [None] * len(cenarios)
+    for idx, resultado, _ in iterar_cenarios(cenarios, deadline):
+        resultados[idx] = resultado
+    return resultados
+
+
+def _completar_opcao(opcao: Dict, titulo: str, descricao: str) -> Dict:
+    opcao['titulo'] = titulo
+    opcao['descricao'] = descricao
+    opcao['custo_total'] = opcao['custos']['total']
+    opcao['tempo_total_viagem'] = calcular_tempo_total_viagem(opcao)
+    opcao['numero_escalas'] = contar_escalas(opcao)
+    return opcao
+
+
+def _montar_cenarios(request_data: Dict, db: Dict, model_params: Dict,
+                     flight_index: Optional[FlightIndex] = None) -> List[Tuple]:
+    """
+    (título, descrição, kwargs de otimizar_com_pesos) de cada opção;
+    o último cenário é o extra, usado só se não houver 3 opções
+
+    Os candidatos a warm start (heurísticas sobre o banco) são calculados
+    aqui, no processo da requisição: os workers recebem params e candidatos
+    """
+    dados = {
+        'origem': request_data['origem'],
+        'destino': request_data['destino'],
+        'locais_visitar': request_data.get('locais_visitar', []),
+        'motor': request_data.get('motor'),
+        'data_ida': request_data.get('data_ida'),
+    }
+
     # OPÇÃO 2: Equilibrada (TMAX um pouco maior para mais opções)
     params_equilibrados = model_params.copy()
     params_equilibrados['TMAX'] = model_params.get('TMAX', 48.0) * 0.75  # 75% do tempo máximo
-    
-    opcao2 = otimizar_com_pesos(
-        model_params=params_equilibrados,
-        db=db,
-        origem=origem,
-        destino=destino,
-        locais_visitar=locais_visitar,
-        build_result_func=build_result_func,
-        peso_custo=0.6,
-        peso_tempo=0.6,
-        preferir_voo_direto=False,
-        timeout=20
-    )
-    
-    if opcao2:
-        opcao2['titulo'] = "Melhor Custo-Benefício"
-        opcao2['descricao'] = "Equilíbrio entre preço e conforto"
-        opcao2['custo_total'] = opcao2['custos']['total']
-        opcao2['tempo_total_viagem'] = calcular_tempo_total_viagem(opcao2)
-        opcao2['numero_escalas'] = contar_escalas(opcao2)
-        opcoes.append(opcao2)
-    
+
     # OPÇÃO 3: Minimizar Tempo (preferir voos diretos)
     params_rapidos = model_params.copy()
     params_rapidos['TMAX'] = 15.0  # Limite baixo de tempo para forçar voos diretos/rápidos
-    
-    opcao3 = otimizar_com_pesos(
-        model_params=params_rapidos,
-        db=db,
-        origem=origem,
-        destino=destino,
-        locais_visitar=locais_visitar,
-        build_result_func=build_result_func,
-        peso_custo=0.2,
-        peso_tempo=1.0,
-        preferir_voo_direto=True,
-        timeout=20
-    )
-    
-    if opcao3:
-        opcao3['titulo'] = "Mais Rápida e Confortável"
-        opcao3['descricao'] = "Voos diretos, menor tempo total"
-        opcao3['custo_total'] = opcao3['custos']['total']
-        opcao3['tempo_total_viagem'] = calcular_tempo_total_viagem(opcao3)
-        opcao3['numero_escalas'] = contar_escalas(opcao3)
-        opcoes.append(opcao3)
-    
-    # Se não conseguiu gerar 3 opções diferentes, tentar variações
-    if len(opcoes) < 3:
-        # Tentar com TMAX intermediário
-        params_intermediarios = model_params.copy()
-        params_intermediarios['TMAX'] = model_params.get('TMAX', 48.0) * 0.6
-        
-        opcao_extra = otimizar_com_pesos(
-            model_params=params_intermediarios,
-            db=db,
-            origem=origem,
-            destino=destino,
-            locais_visitar=locais_visitar,
-            build_result_func=build_result_func,
-            peso_custo=0.5,
-            peso_tempo=0.7,
-            timeout=15
-        )
-        
-        if opcao_extra:
-            opcao_extra['titulo'] = "Alternativa"
-            opcao_extra['descricao'] = "Opção intermediária"
-            opcao_extra['custo_total'] = opcao_extra['custos']['total']
-            opcao_extra['tempo_total_viagem'] = calcular_tempo_total_viagem(opcao_extra)
-            opcao_extra['numero_escalas'] = contar_escalas(opcao_extra)
-            opcoes.append(opcao_extra)
-    
+
+    # Extra, usada se não houver 3 opções: TMAX intermediário
+    params_intermediarios = model_params.copy()
+    params_intermediarios['TMAX'] = model_params.get('TMAX', 48.0) * 0.6
+
+    def cenario(params, preferir_voo_direto=False, **extra):
+        if preferir_voo_direto:
+            params = dict(params, TMAX=min(params.get('TMAX', 48.0), 20.0))  # Limitar tempo de voo
+        candidatos = []
+        if dados['data_ida'] is not None and not caminho_minimo_aplicavel(params, dados['locais_visitar']):
+            candidatos = candidatos_heuristicos(db, dados, params, flight_index)
+        return dict(extra, model_params=params, request_data=dados, candidatos=candidatos)
+
+    with etapa("heuristicas"):
+        return [
+            # OPÇÃO 1: Minimizar Custo (configuração padrão otimizada)
+            ("Mais Econômica", "Menor custo total, pode ter mais escalas",
+             cenario(model_params, peso_custo=1.0, peso_tempo=0.3, timeout=20)),
+            ("Melhor Custo-Benefício", "Equilíbrio entre preço e conforto",
+             cenario(params_equilibrados, peso_custo=0.6, peso_tempo=0.6, timeout=20)),
+            ("Mais Rápida e Confortável", "Voos diretos, menor tempo total",
+             cenario(params_rapidos, preferir_voo_direto=True, peso_custo=0.2, peso_tempo=1.0,
+                     timeout=20)),
+            ("Alternativa", "Opção intermediária",
+             cenario(params_intermediarios, peso_custo=0.5, peso_tempo=0.7, timeout=15)),
+        ]
+
+
+def _classificar_opcoes(opcoes: List[Dict], num_opcoes: int, tempo_inicio: float,
+                        completo: bool = True) -> Dict:
     # Remover duplicatas
     opcoes = remover_duplicatas(opcoes)
     
@@ -336,6 +394,86 @@ def gerar_multiplas_opcoes(
         "metadata": {
             "tempo_computacao": tempo_computacao,
             "numero_opcoes_geradas": len(opcoes),
-            "numero_opcoes_solicitadas": num_opcoes
+            "numero_opcoes_solicitadas": num_opcoes,
+            "completo": completo
         }
     }
+
+
+def gerar_multiplas_opcoes_stream(
+    request_data: Dict,
+    db: Dict,
+    model_params: Dict,
+    num_opcoes: int = 3,
+    deadline: float = DEADLINE_PADRAO,
+    flight_index: Optional[FlightIndex] = None
+) -> Iterator[Tuple[str, Dict]]:
+    """
+    Versão incremental de gerar_multiplas_opcoes
+
+    Produz ("opcao", opcao) assim que cada cenário termina (ainda sem
+    pontuação/ranking) e, no fim, ("final", resposta) com as opções
+    reclassificadas e a recomendação, igual ao retorno de gerar_multiplas_opcoes.
+    A classificação final usa a ordem dos cenários, não a de término, para
+    que remover_duplicatas mantenha sempre o mesmo cenário.
+    metadata.completo=False se algum cenário foi interrompido pelo prazo/tempo limite.
+    flight_index: índice de voos do snapshot (construído aqui se não informado)
+    """
+    tempo_inicio = time.time()
+    flight_index = get_flight_index(db, flight_index)
+    cenarios = _montar_cenarios(request_data, db, model_params, flight_index)
+    principais = len(cenarios) - 1
+
+    por_cenario = {}
+    extra = None
+    completo = True
+
+    # Todos os cenários (inclusive o extra) são disparados juntos
+    for idx, solucao, interrompido in iterar_cenarios([c for _, _, c in cenarios], deadline):
+        completo = completo and not interrompido
+        if not solucao:
+            continue
+        with etapa("export"):
+            resultado = build_front_json(db, request_data['origem'], request_data['destino'],
+                                         solucao["chosen"], solucao["dias"], index=flight_index)
+        titulo, descricao, _ = cenarios[idx]
+        opcao = _completar_opcao(resultado, titulo, descricao)
+        if idx < principais:
+            por_cenario[idx] = opcao
+            yield "opcao", opcao
+        else:
+            extra = opcao
+
+    opcoes = [por_cenario[idx] for idx in sorted(por_cenario)]
+
+    # Se não conseguiu gerar 3 opções diferentes, usar a variação
+    if len(opcoes) < 3 and extra:
+        opcoes.append(extra)
+        yield "opcao", extra
+
+    with etapa("classificar"):
+        final = _classificar_opcoes(opcoes, num_opcoes, tempo_inicio, completo)
+    yield "final", final
+
+
+def gerar_multiplas_opcoes(
+    request_data: Dict,
+    db: Dict,
+    model_params: Dict,
+    num_opcoes: int = 3,
+    deadline: float = DEADLINE_PADRAO,
+    flight_index: Optional[FlightIndex] = None
+) -> Dict:
+    """
+    Gera múltiplas opções com diferentes trade-offs
+    Retorna as 3 melhores opções classificadas
+
+    Os cenários são independentes e rodam em paralelo no pool de processos;
+    deadline (segundos) limita a requisição inteira e as opções que não
+    terminarem a tempo são descartadas.
+    """
+    for evento, dados in gerar_multiplas_opcoes_stream(
+        request_data, db, model_params, num_opcoes, deadline, flight_index
+    ):
+        if evento == "final":
+            return dados
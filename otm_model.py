@@ -1,9 +1,204 @@
+from bisect import bisect_right
+
 from pulp import (
     LpProblem, LpVariable, LpMinimize, lpSum,
     LpBinary, LpContinuous, LpInteger
 )
 
 
+class SolutionHandle:
+    """
+    Decision variables the exporter reads, keyed by what they mean:
+    x[(i, j, f)] -> flight variable, dias[i] -> integer days variable.
+    Builders attach it as model.solution_handle, so solutions are read
+    without parsing (possibly mangled) variable names.
+    """
+
+    def __init__(self, x, dias):
+        self.x = x
+        self.dias = dias
+
+    def chosen(self):
+        """(i, j, f) of the flights set to 1"""
+        return [k for k, v in self.x.items() if v.varValue is not None and v.varValue >= 0.5]
+
+    def days(self):
+        """city -> integer days"""
+        return {i: int(round(v.varValue)) for i, v in self.dias.items() if v.varValue is not None}
+
+
+def prune_flights(
+    F, DEP, DUR,
+    origin, dest,
+    tau=24.0,
+    D_total=7.0,
+    TMAX=15.0,
+    d_min=None,
+    horizon_slack=None
+):
+    """
+    Time-window preprocessing: keep only flights that can belong to a feasible itinerary.
+
+    A flight (i,j,f) is dropped when
+    - it departs before t0 (DEP < 0), arrives at the origin or leaves the destination;
+    - it departs before the earliest possible arrival at i plus tau*d_min[i]
+      (forward pass over flights sorted by departure);
+    - after landing at j there is no flight left that departs after a stay of
+      d_min[j] and still reaches the destination (backward pass).
+
+    Both passes are exact: the model has no overall time horizon. horizon_slack
+    adds one (tau*D_total + TMAX + horizon_slack hours, a heuristic cut that
+    can drop optimal itineraries); the default None leaves it out.
+
+    Returns a new F with the same (i,j) keys (lists may become empty).
+    """
+    if d_min is None: d_min = {}
+
+    flights = [
+        (DEP[(i, j, f)], i, j, f)
+        for (i, j), fs in F.items() if i != j and i != dest and j != origin
+        for f in fs
+        if DEP[(i, j, f)] >= 0.0
+    ]
+    flights.sort()
+
+    # Forward: earliest arrival time at each city
+    earliest = {origin: 0.0}
+    reachable = []
+    for dep, i, j, f in flights:
+        if i not in earliest or dep < earliest[i] + tau * d_min.get(i, 0.0):
+            continue
+        reachable.append((dep, i, j, f))
+        arr = dep + DUR[(i, j, f)]
+        if arr < earliest.get(j, float("inf")):
+            earliest[j] = arr
+
+    # Backward: latest arrival time at each city that still reaches dest (in time)
+    horizon = float("inf") if horizon_slack is None else tau * D_total + TMAX + horizon_slack
+    latest = {dest: horizon - tau * d_min.get(dest, 0.0)}
+    keep = []
+    for dep, i, j, f in reversed(reachable):
+        if j not in latest or dep + DUR[(i, j, f)] > latest[j]:
+            continue
+        keep.append((dep, i, j, f))
+        limit = dep - tau * d_min.get(i, 0.0)
+        if limit > latest.get(i, float("-inf")):
+            latest[i] = limit
+
+    kept = set((i, j, f) for _, i, j, f in keep)
+    return {(i, j): [f for f in fs if (i, j, f) in kept] for (i, j), fs in F.items()}
+
+
+def prune_dominated(F, DEP, DUR, C):
+    """
+    Dominance preprocessing: drop flight (i,j,f) when another flight of the
+    same arc departs no earlier, arrives no later and costs no more (exact
+    ties keep the first one in F).
+
+    Swapping a dominated flight for its dominator keeps any itinerary
+    feasible (the stays before and after it can only grow and the flight
+    time cannot increase, so TMAX still holds) at no higher cost, so the
+    optimum of every model built from F is unchanged.
+
+    Latest departure first, keeping a staircase of (arrival, cost) of the
+    flights kept so far: O(n log n) per arc.
+    Returns (new F with the same (i,j) keys, number of flights removed).
+    """
+    pruned, removed = {}, 0
+    for (i, j), fs in F.items():
+        if len(fs) < 2:
+            pruned[(i, j)] = list(fs)
+            continue
+
+        def order(k):
+            key = (i, j, fs[k])
+            return (-DEP[key], DEP[key] + DUR[key], C[key], k)
+
+        arrivals, costs = [], []   # arrivals ascending, costs descending
+        keep = set()
+        for k in sorted(range(len(fs)), key=order):
+            key = (i, j, fs[k])
+            arr, cost = DEP[key] + DUR[key], C[key]
+            p = bisect_right(arrivals, arr)
+            # Cheapest kept flight arriving no later (all of them depart no earlier)
+            if p > 0 and costs[p - 1] <= cost:
+                removed += 1
+                continue
+            keep.add(k)
+            q = p
+            while q < len(arrivals) and costs[q] >= cost:
+                q += 1
+            arrivals[p:q] = [arr]
+            costs[p:q] = [cost]
+        pruned[(i, j)] = [f for k, f in enumerate(fs) if k in keep]
+    return pruned, removed
+
+
+def sequencing_big_m(F, DEP, DUR, origin, dest, max_stay):
+    """
+    Per-flight big-M for the Seq_depart/Seq_arrive rows (instead of one
+    global bigM over the whole horizon).
+
+    With L_i the earliest arrival at i over the flights in F (0 at the origin
+    or with no incoming flight) and U_i = max(L_i, latest departure from i),
+    a flight that is not taken only has to allow
+      Seq_depart: t_i + tau*d_i <= U_i       ->  M = U_i - DEP
+      Seq_arrive: t_j >= L_j                 ->  M = DEP + DUR - L_j
+    Visited cities satisfy both through the flights they do take; t of an
+    unvisited city can be set to L_i (t is not in the objective). The
+    destination has no flight out, so its U is the latest arrival there
+    plus max_stay (tau*D_total). Every solution keeps an equivalent one and
+    the optimum is unchanged.
+
+    Returns ({(i,j,f): (M_depart, M_arrive)}, L).
+    """
+    flights = [(i, j, f) for (i, j), fs in F.items() if i != j for f in fs]
+
+    L, latest_dep, latest_dest = {origin: 0.0}, {}, 0.0
+    for k in flights:
+        i, j, _ = k
+        arr = max(0.0, DEP[k] + DUR[k])
+        if j != origin and arr < L.get(j, float("inf")):
+            L[j] = arr
+        if j == dest:
+            latest_dest = max(latest_dest, arr)
+        latest_dep[i] = max(latest_dep.get(i, float("-inf")), DEP[k])
+
+    U = {i: max(L.get(i, 0.0), dep) for i, dep in latest_dep.items()}
+    if dest in U:
+        U[dest] = max(U[dest], latest_dest + max_stay)
+
+    big_m = {}
+    for k in flights:
+        i, j, _ = k
+        big_m[k] = (max(0.0, U[i] - DEP[k]), max(0.0, DEP[k] + DUR[k] - L.get(j, 0.0)))
+    return big_m, L
+
+
+def prune_for_request(
+    F, DEP, DUR, C,
+    origin, dest,
+    prune=True,
+    dominance=True,
+    **window
+):
+    """
+    Flight preprocessing shared by the model builders and the heuristics:
+    time window (prune_flights, keyword args in `window`) then dominance
+    (prune_dominated).
+
+    Returns (F, counts) with counts = {"flights": flights in, "window":
+    removed by the time window, "dominated": removed by dominance}.
+    """
+    counts = {"flights": sum(len(fs) for fs in F.values()), "window": 0, "dominated": 0}
+    if prune:
+        F = prune_flights(F, DEP, DUR, origin, dest, **window)
+        counts["window"] = counts["flights"] - sum(len(fs) for fs in F.values())
+    if dominance:
+        F, counts["dominated"] = prune_dominated(F, DEP, DUR, C)
+    return F, counts
+
+
 def build_trip_milp_pulp(
     V,                       # list of cities
     origin, dest,            # fixed origin/destination (must be in V)
@@ -17,7 +212,10 @@ def build_trip_milp_pulp(
     C_food=None,             # dict i -> cost per day (per person-day)
     nA=1, nC=0, alpha=1.0,   # people parameters for food
     C_transfer=None,         # dict i -> transfer fixed cost if visit
-    bigM=None                # Big-M; if None, compute a safe-ish value
+    bigM=None,               # global Big-M; if None, one per flight row (see sequencing_big_m)
+    prune=True,              # drop flights outside the feasible time window (see prune_flights)
+    horizon_slack=None,      # optional horizon cut beyond tau*D_total + TMAX (see prune_flights)
+    dominance=True           # drop dominated flights (see prune_dominated)
 ):
     assert origin in V and dest in V and origin != dest
 
@@ -28,16 +226,23 @@ def build_trip_milp_pulp(
     if C_food  is None: C_food  = {i: 0.0 for i in V}
     if C_transfer is None: C_transfer = {i: 0.0 for i in V}
 
+    # Only carry flights that fit the time window and are not dominated
+    F, pruning = prune_for_request(F, DEP, DUR, C, origin, dest, prune=prune, dominance=dominance,
+                                   tau=tau, D_total=D_total, TMAX=TMAX, d_min=d_min,
+                                   horizon_slack=horizon_slack)
+
     # Build arc set from provided flight lists
     A = [(i, j) for (i, j) in F.keys() if i != j and len(F[(i, j)]) > 0]
 
-    # Compute Big-M if not provided
-    # Use horizon based on max(DEP + DUR) plus max stay time
+    # Big-M per sequencing row from the time windows of each city,
+    # unless a global one is given
     if bigM is None:
         if len(DEP) == 0:
             raise ValueError("DEP is empty; provide bigM explicitly or fill DEP.")
-        max_time = max(DEP[k] + DUR[k] for k in DEP.keys())
-        bigM = max_time + tau * D_total + 10.0  # small buffer
+        big_m, t_lb = sequencing_big_m(F, DEP, DUR, origin, dest, tau * D_total)
+    else:
+        big_m = {(i, j, f): (bigM, bigM) for (i, j) in A for f in F[(i, j)]}
+        t_lb = {}
 
     model = LpProblem("Trip_Scheduling_Flights_Only", LpMinimize)
 
@@ -90,9 +295,16 @@ def build_trip_milp_pulp(
     # Flow for open path with fixed origin/dest:
     # out - in = 1 at origin, = -1 at dest, = 0 otherwise (when visited)
     # We'll link visit y with degree constraints.
+    # Adjacency lists built once, so this loop is linear in |A|.
+    out_arcs = {i: [] for i in V}
+    in_arcs = {i: [] for i in V}
+    for (i, j) in A:
+        out_arcs[i].append(X[(i, j)])
+        in_arcs[j].append(X[(i, j)])
+
     for i in V:
-        out_i = lpSum(X[(i, j)] for (ii, j) in A if ii == i)
-        in_i  = lpSum(X[(j, i)] for (j, jj) in A if jj == i)
+        out_i = lpSum(out_arcs[i])
+        in_i  = lpSum(in_arcs[i])
 
         if i == origin:
             model += out_i - in_i == 1, "Flow_origin"
@@ -142,13 +354,14 @@ def build_trip_milp_pulp(
         for f in F[(i, j)]:
             dep = DEP[(i, j, f)]
             dur = DUR[(i, j, f)]
+            m_depart, m_arrive = big_m[(i, j, f)]
 
             model += (
-                t[i] + tau * d[i] <= dep + bigM * (1 - x[(i, j, f)]),
+                t[i] + tau * d[i] <= dep + m_depart * (1 - x[(i, j, f)]),
                 f"Seq_depart_{i}_{j}_{f}"
             )
             model += (
-                t[j] >= dep + dur - bigM * (1 - x[(i, j, f)]),
+                t[j] >= dep + dur - m_arrive * (1 - x[(i, j, f)]),
                 f"Seq_arrive_{i}_{j}_{f}"
             )
 
@@ -159,4 +372,8 @@ def build_trip_milp_pulp(
     total_flight_time = lpSum(DUR[(i, j, f)] * x[(i, j, f)] for (i, j) in A for f in F[(i, j)])
     model += total_flight_time <= TMAX, "MaxTotalFlightTime"
 
+    model.solution_handle = SolutionHandle(x, dias)
+    model.pruning = pruning
+    model.t_lb = t_lb        # t of unvisited cities in a MIP start
+
     return model
\ No newline at end of file
@@ -0,0 +1,363 @@
+from array import array
+
+from pulp import (
+    LpElement, LpMinimize,
+    LpBinary, LpContinuous, LpInteger,
+    LpConstraintEQ, LpConstraintLE, LpConstraintGE,
+    LpStatusNotSolved
+)
+
+from otm_model import SolutionHandle, prune_for_request, sequencing_big_m
+
+
+class MatrixVariable:
+    """
+    One column of a MatrixModel, with the LpVariable attributes the rest of
+    the code reads (name, bounds, cat, varValue, value(), setInitialValue())
+    """
+
+    __slots__ = ("index", "name", "lowBound", "upBound", "cat", "varValue")
+
+    def __init__(self, index, name, lowBound, upBound, cat):
+        self.index = index
+        self.name = name
+        self.lowBound = lowBound
+        self.upBound = upBound
+        self.cat = cat
+        self.varValue = None
+
+    def value(self):
+        return self.varValue
+
+    def setInitialValue(self, val, check=True):
+        self.varValue = val
+
+
+class MatrixObjective:
+    def __init__(self, model):
+        self._model = model
+
+    def value(self):
+        cols = self._model.variables()
+        if any(v.varValue is None for v in cols):
+            return None
+        return sum(c * v.varValue for c, v in zip(self._model.obj, cols))
+
+
+class MatrixModel:
+    """
+    MILP stored directly in sparse matrix form (no PuLP expression objects).
+
+    Columns: names, bounds, category and objective coefficient.
+    Rows: names, sense (LpConstraintLE/EQ/GE), right-hand side, and the
+    coefficients in CSR order (row_start, a_col, a_val), since rows are
+    appended one at a time. The column-wise (CSC) view for the MPS writer is
+    derived with a counting sort over the columns (O(nnz), no comparison sort).
+
+    variables(), variablesDict(), constraints, objective.value(), valid()
+    and status behave like the LpProblem ones, so warm starts,
+    build_front_json_from_solution and the benchmark work unchanged; solver
+    backends load the arrays directly (see solver_backends).
+    """
+
+    def __init__(self, name, sense=LpMinimize):
+        self.name = name
+        self.sense = sense
+        self.status = LpStatusNotSolved
+
+        self.col_name = []
+        self.col_lb = []
+        self.col_ub = []
+        self.col_cat = []
+        self.obj = []
+
+        self.row_name = []
+        self.row_sense = []
+        self.row_rhs = []
+        self.row_start = array("l", [0])
+        self.a_col = array("l")
+        self.a_val = array("d")
+
+        self.objective = MatrixObjective(self)
+        self._variables = None
+
+    @property
+    def num_cols(self):
+        return len(self.col_name)
+
+    @property
+    def num_rows(self):
+        return len(self.row_name)
+
+    def add_column(self, name, lowBound=0.0, upBound=None, cat=LpContinuous, cost=0.0):
+        self.col_name.append(name.translate(LpElement.trans))
+        self.col_lb.append(lowBound)
+        self.col_ub.append(upBound)
+        self.col_cat.append(cat)
+        self.obj.append(cost)
+        self._variables = None
+        return len(self.col_name) - 1
+
+    def add_row(self, name, cols, coefs, sense, rhs):
+        self.row_name.append(name)
+        self.row_sense.append(sense)
+        self.row_rhs.append(rhs)
+        self.a_col.extend(cols)
+        self.a_val.extend(coefs)
+        self.row_start.append(len(self.a_col))
+        return len(self.row_name) - 1
+
+    def row(self, r):
+        """(columns, coefficients) of row r"""
+        a, b = self.row_start[r], self.row_start[r + 1]
+        return self.a_col[a:b], self.a_val[a:b]
+
+    def csc(self):
+        """Column-wise view: (col_start, a_row, a_val)"""
+        n, nnz = self.num_cols, len(self.a_col)
+        col_start = array("l", [0] * (n + 1))
+        for c in self.a_col:
+            col_start[c + 1] += 1
+        for c in range(n):
+            col_start[c + 1] += col_start[c]
+
+        # Counting sort: entries are scattered to their column's next slot in
+        # CSR (row) order, so rows stay ascending inside each column
+        nxt = col_start[:-1]
+        a_row = array("l", [0] * nnz)
+        a_val = array("d", [0.0] * nnz)
+        for r in range(self.num_rows):
+            for k in range(self.row_start[r], self.row_start[r + 1]):
+                c = self.a_col[k]
+                a_row[nxt[c]] = r
+                a_val[nxt[c]] = self.a_val[k]
+                nxt[c] += 1
+        return col_start, a_row, a_val
+
+    # --- LpProblem-compatible surface ---
+
+    def variables(self):
+        if self._variables is None:
+            self._variables = [
+                MatrixVariable(k, *v)
+                for k, v in enumerate(zip(self.col_name, self.col_lb, self.col_ub, self.col_cat))
+            ]
+        return self._variables
+
+    def variablesDict(self):
+        return {v.name: v for v in self.variables()}
+
+    @property
+    def constraints(self):
+        return {name: r for r, name in enumerate(self.row_name)}
+
+    def assignVarsVals(self, values):
+        """Solution values by column name"""
+        for v in self.variables():
+            if v.name in values:
+                v.varValue = values[v.name]
+
+    def assign_values(self, values):
+        """Solution values in column order"""
+        for v, val in zip(self.variables(), values):
+            v.varValue = val
+
+    def valid(self, eps=0):
+        values = [v.varValue for v in self.variables()]
+        if any(val is None for val in values):
+            return False
+        for r in range(self.num_rows):
+            a, b = self.row_start[r], self.row_start[r + 1]
+            lhs = sum(self.a_val[k] * values[self.a_col[k]] for k in range(a, b))
+            rhs, sense = self.row_rhs[r], self.row_sense[r]
+            if sense == LpConstraintLE and lhs > rhs + eps:
+                return False
+            if sense == LpConstraintGE and lhs < rhs - eps:
+                return False
+            if sense == LpConstraintEQ and abs(lhs - rhs) > eps:
+                return False
+        return True
+
+    # --- MPS ---
+
+    def write_mps(self, filename):
+        """
+        Fixed-format MPS with normalised names (X0000000 columns,
+        C0000000 rows), like PuLP's writeMPS(rename=1)
+        Returns the column names used, in column order.
+        """
+        mps_sense = {LpConstraintLE: "L", LpConstraintEQ: "E", LpConstraintGE: "G"}
+        cols = [f"X{c:07d}" for c in range(self.num_cols)]
+        rows = [f"C{r:07d}" for r in range(self.num_rows)]
+        col_start, a_row, a_val = self.csc()
+
+        lines = [f"*SENSE:{'Minimize' if self.sense == LpMinimize else 'Maximize'}\n",
+                 "NAME          MODEL\n", "ROWS\n", " N  OBJ\n"]
+        lines += [f" {mps_sense[s]}  {name}\n" for s, name in zip(self.row_sense, rows)]
+
+        lines.append("COLUMNS\n")
+        for c, name in enumerate(cols):
+            integer = self.col_cat[c] != LpContinuous
+            if integer:
+                lines.append("    MARK      'MARKER'                 'INTORG'\n")
+            a, b = col_start[c], col_start[c + 1]
+            lines += [f"    {name}  {rows[r]}  {v:.15g}\n" for r, v in zip(a_row[a:b], a_val[a:b])]
+            if self.obj[c]:
+                lines.append(f"    {name}  OBJ  {self.obj[c]:.15g}\n")
+            if integer:
+                lines.append("    MARK      'MARKER'                 'INTEND'\n")
+
+        lines.append("RHS\n")
+        lines += [f"    RHS       {name}  {rhs:.15g}\n" for name, rhs in zip(rows, self.row_rhs) if rhs]
+
+        lines.append("BOUNDS\n")
+        for c, name in enumerate(cols):
+            lb, ub, integer = self.col_lb[c], self.col_ub[c], self.col_cat[c] != LpContinuous
+            if lb is not None and lb == ub:
+                lines.append(f" FX BND       {name}  {lb:.15g}\n")
+                continue
+            if lb is None:
+                lines.append(f" {'MI' if ub is not None else 'FR'} BND       {name}\n")
+            elif lb != 0 or (integer and ub is None):
+                # Integer columns without bounds would be read as binary
+                lines.append(f" LO BND       {name}  {lb:.15g}\n")
+            if ub is not None:
+                lines.append(f" UP BND       {name}  {ub:.15g}\n")
+        lines.append("ENDATA\n")
+
+        with open(filename, "w") as f:
+            f.writelines(lines)
+        return cols
+
+
+def build_trip_milp_matrix(
+    V,                       # list of cities
+    origin, dest,            # fixed origin/destination (must be in V)
+    F,                       # dict: (i,j) -> list of flight ids f
+    DEP, DUR, C,             # dicts keyed by (i,j,f) -> value (hours / cost)
+    tau=24.0,                # hours per day
+    D_total=7.0,             # total days (continuous)
+    TMAX=15.0,               # max total flight time (hours)
+    d_min=None, d_max=None,  # dicts keyed by i -> min/max days (continuous), optional
+    C_hotel=None,            # dict i -> cost per day
+    C_food=None,             # dict i -> cost per day (per person-day)
+    nA=1, nC=0, alpha=1.0,   # people parameters for food
+    C_transfer=None,         # dict i -> transfer fixed cost if visit
+    bigM=None,               # global Big-M; if None, one per flight row (see sequencing_big_m)
+    prune=True,              # drop flights outside the feasible time window (see prune_flights)
+    horizon_slack=None,      # optional horizon cut beyond tau*D_total + TMAX (see prune_flights)
+    dominance=True,          # drop dominated flights (see prune_dominated)
+    forced=()                # cities that must be visited (Force_visit_{i}: y_i == 1)
+):
+    """
+    Same MTZ model as build_trip_milp_pulp (same variables, rows and names),
+    written straight into a MatrixModel: each row is appended as column
+    indices + coefficients, so building is linear in the number of flights.
+    """
+    assert origin in V and dest in V and origin != dest
+
+    # Defaults
+    if d_min is None: d_min = {i: 0.0 for i in V}
+    if d_max is None: d_max = {i: D_total for i in V}
+    if C_hotel is None: C_hotel = {i: 0.0 for i in V}
+    if C_food  is None: C_food  = {i: 0.0 for i in V}
+    if C_transfer is None: C_transfer = {i: 0.0 for i in V}
+
+    F, pruning = prune_for_request(F, DEP, DUR, C, origin, dest, prune=prune, dominance=dominance,
+                                   tau=tau, D_total=D_total, TMAX=TMAX, d_min=d_min,
+                                   horizon_slack=horizon_slack)
+
+    A = [(i, j) for (i, j), fs in F.items() if i != j and len(fs) > 0]
+    flights = [(i, j, f) for (i, j) in A for f in F[(i, j)]]
+
+    if bigM is None:
+        if len(DEP) == 0:
+            raise ValueError("DEP is empty; provide bigM explicitly or fill DEP.")
+        big_m, t_lb = sequencing_big_m(F, DEP, DUR, origin, dest, tau * D_total)
+    else:
+        big_m, t_lb = {k: (bigM, bigM) for k in flights}, {}
+
+    model = MatrixModel("Trip_Scheduling_Flights_Only", LpMinimize)
+    add_row = model.add_row
+    EQ, LE, GE = LpConstraintEQ, LpConstraintLE, LpConstraintGE
+
+    # --- Columns (objective coefficients set here) ---
+    food_factor = (nA + alpha * nC)
+    x = {k: model.add_column(f"x_{k[0]}_{k[1]}_{k[2]}", 0, 1, LpBinary, C[k]) for k in flights}
+    X = {(i, j): model.add_column(f"X_{i}_{j}", 0, 1, LpContinuous) for (i, j) in A}
+    y = {i: model.add_column(f"y_{i}", 0, 1, LpBinary, C_transfer[i]) for i in V}
+    t = {i: model.add_column(f"t_{i}", 0, None, LpContinuous) for i in V}
+    d = {i: model.add_column(f"d_{i}", 0, None, LpContinuous) for i in V}
+    dias = {i: model.add_column(f"dias_{i}", 0, None, LpInteger, C_hotel[i] + C_food[i] * food_factor) for i in V}
+    u = {i: model.add_column(f"u_{i}", 0, None, LpContinuous) for i in V}
+
+    # --- Rows ---
+    add_row("Visit_origin", [y[origin]], [1], EQ, 1)
+    add_row("Visit_dest", [y[dest]], [1], EQ, 1)
+    for i in forced:
+        add_row(f"Force_visit_{i}", [y[i]], [1], EQ, 1)
+
+    # Aggregation and at most one flight per arc
+    for (i, j) in A:
+        xs = [x[(i, j, f)] for f in F[(i, j)]]
+        add_row(f"Agg_{i}_{j}", [X[(i, j)]] + xs, [1] + [-1] * len(xs), EQ, 0)
+        add_row(f"AtMostOneFlight_{i}_{j}", xs, [1] * len(xs), LE, 1)
+
+    # Flow / degree: adjacency lists built once (linear in |A|)
+    out_arcs = {i: [] for i in V}
+    in_arcs = {i: [] for i in V}
+    for (i, j) in A:
+        out_arcs[i].append(X[(i, j)])
+        in_arcs[j].append(X[(i, j)])
+
+    for i in V:
+        out_i, in_i = out_arcs[i], in_arcs[i]
+        flow = (out_i + in_i, [1] * len(out_i) + [-1] * len(in_i))
+        ones_out, ones_in = [1] * len(out_i), [1] * len(in_i)
+        if i == origin:
+            add_row("Flow_origin", *flow, EQ, 1)
+            add_row("Origin_out_degree", out_i, ones_out, EQ, 1)
+            add_row("Origin_in_degree", in_i, ones_in, EQ, 0)
+        elif i == dest:
+            add_row("Flow_dest", *flow, EQ, -1)
+            add_row("Dest_in_degree", in_i, ones_in, EQ, 1)
+            add_row("Dest_out_degree", out_i, ones_out, EQ, 0)
+        else:
+            add_row(f"Flow_{i}", *flow, EQ, 0)
+            add_row(f"InDegree_{i}", in_i + [y[i]], ones_in + [-1], EQ, 0)
+            add_row(f"OutDegree_{i}", out_i + [y[i]], ones_out + [-1], EQ, 0)
+
+    # MTZ subtour elimination
+    n = len(V)
+    for i in V:
+        add_row(f"MTZ_u_ub_{i}", [u[i], y[i]], [1, -n], LE, 0)
+        add_row(f"MTZ_u_lb_{i}", [u[i]], [1], GE, 0)
+    for (i, j) in A:
+        add_row(f"MTZ_{i}_{j}", [u[i], u[j], X[(i, j)]], [1, -1, n], LE, n - 1)
+    add_row("MTZ_fix_origin", [u[origin]], [1], EQ, 0)
+
+    # Days
+    for i in V:
+        add_row(f"DaysMax_{i}", [d[i], y[i]], [1, -d_max[i]], LE, 0)
+        add_row(f"DaysMin_{i}", [d[i], y[i]], [1, -d_min[i]], GE, 0)
+        add_row(f"Dias_ge_d_{i}", [dias[i], d[i]], [1, -1], GE, 0)
+    add_row("TotalDays", [d[i] for i in V], [1] * n, EQ, D_total)
+
+    # Sequencing: t_i + tau*d_i + M*x <= DEP + M ; t_j - M*x >= DEP + DUR - M
+    for (i, j, f) in flights:
+        dep, dur, k = DEP[(i, j, f)], DUR[(i, j, f)], x[(i, j, f)]
+        m_depart, m_arrive = big_m[(i, j, f)]
+        add_row(f"Seq_depart_{i}_{j}_{f}", [t[i], d[i], k], [1, tau, m_depart], LE, dep + m_depart)
+        add_row(f"Seq_arrive_{i}_{j}_{f}", [t[j], k], [1, -m_arrive], GE, dep + dur - m_arrive)
+
+    add_row("StartTime_origin", [t[origin]], [1], EQ, 0)
+
+    # Total flight time <= TMAX
+    add_row("MaxTotalFlightTime", [x[k] for k in flights], [DUR[k] for k in flights], LE, TMAX)
+
+    cols = model.variables()
+    model.solution_handle = SolutionHandle({k: cols[c] for k, c in x.items()}, {i: cols[c] for i, c in dias.items()})
+    model.pruning = pruning
+    model.t_lb = t_lb
+
+    return model
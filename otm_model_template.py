@@ -0,0 +1,286 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from pulp import (
+    LpProblem, LpVariable, LpMinimize, LpAffineExpression, LpConstraint,
+    LpBinary, LpContinuous, LpInteger,
+    LpConstraintEQ, LpConstraintLE, LpConstraintGE
+)
+
+from otm_model import SolutionHandle, prune_for_request, sequencing_big_m
+
+
+TEMPLATES_PER_KEY = int(os.environ.get("OTM_TEMPLATES_POR_CHAVE", 4))  # idle copies kept per structure
+TEMPLATE_KEYS = 4                                                      # structures (database versions) kept
+
+
+def _expr(*terms):
+    return LpAffineExpression(list(terms))
+
+
+class TripModelTemplate:
+    """
+    Reusable skeleton of the MTZ model (build_trip_milp_pulp) for one flight set.
+
+    Built once for all flights in F: every variable, the per-flight sequencing
+    constraints, the per-arc MTZ constraints and the per-city day constraints.
+    A request only patches numbers in place (bounds, RHS and coefficients:
+    big-M, DEP, d_min/d_max, costs) and assembles the constraints of the
+    flights that survive prune_flights into a fresh LpProblem.
+
+    Rows whose terms depend on which flights are kept (arc aggregation,
+    flow/degree, TotalDays, MaxTotalFlightTime and the objective) are created
+    per request, one row each over the kept flights.
+
+    Variable names match build_trip_milp_pulp, so warm starts and
+    build_front_json_from_solution work unchanged. An instance is not
+    thread-safe: use TemplatePool.reserve so each request has its own copy.
+    """
+
+    def __init__(self, V, F, tau=24.0):
+        self.V = list(V)
+        self.tau = tau
+        self.n = len(self.V)
+
+        self.A = [(i, j) for (i, j), fs in F.items() if i != j and len(fs) > 0]
+        self.flights = [(i, j, f) for (i, j) in self.A for f in F[(i, j)]]
+
+        # --- Variables (all flights) ---
+        self.x = {k: LpVariable(f"x_{k[0]}_{k[1]}_{k[2]}", cat=LpBinary) for k in self.flights}
+        self.X = {(i, j): LpVariable(f"X_{i}_{j}", lowBound=0, upBound=1, cat=LpContinuous) for (i, j) in self.A}
+        self.y = {i: LpVariable(f"y_{i}", cat=LpBinary) for i in self.V}
+        self.t = {i: LpVariable(f"t_{i}", lowBound=0, cat=LpContinuous) for i in self.V}
+        self.d = {i: LpVariable(f"d_{i}", lowBound=0, cat=LpContinuous) for i in self.V}
+        self.dias = {i: LpVariable(f"dias_{i}", lowBound=0, cat=LpInteger) for i in self.V}
+        self.u = {i: LpVariable(f"u_{i}", lowBound=0, cat=LpContinuous) for i in self.V}
+
+        x, X, y, t, d, dias, u = self.x, self.X, self.y, self.t, self.d, self.dias, self.u
+        n = self.n
+
+        # --- Per-arc MTZ rows ---
+        self.mtz_rows = {
+            (i, j): LpConstraint(_expr((u[i], 1), (u[j], -1), (X[(i, j)], n)), LpConstraintLE, f"MTZ_{i}_{j}", n - 1)
+            for (i, j) in self.A
+        }
+
+        # --- Per-flight sequencing rows (big-M and DEP patched per request) ---
+        # t_i + tau*d_i + M*x <= DEP + M        t_j - M*x >= DEP + DUR - M
+        self.seq_rows = {}
+        for (i, j, f) in self.flights:
+            self.seq_rows[(i, j, f)] = (
+                LpConstraint(_expr((t[i], 1), (d[i], tau), (x[(i, j, f)], 0)),
+                             LpConstraintLE, f"Seq_depart_{i}_{j}_{f}", 0),
+                LpConstraint(_expr((t[j], 1), (x[(i, j, f)], 0)),
+                             LpConstraintGE, f"Seq_arrive_{i}_{j}_{f}", 0),
+            )
+
+        # --- Per-city rows (d_min/d_max patched per request) ---
+        self.city_rows = {}
+        for i in self.V:
+            self.city_rows[i] = [
+                LpConstraint(_expr((u[i], 1), (y[i], -n)), LpConstraintLE, f"MTZ_u_ub_{i}", 0),
+                LpConstraint(_expr((u[i], 1)), LpConstraintGE, f"MTZ_u_lb_{i}", 0),
+                LpConstraint(_expr((d[i], 1), (y[i], 0)), LpConstraintLE, f"DaysMax_{i}", 0),
+                LpConstraint(_expr((d[i], 1), (y[i], 0)), LpConstraintGE, f"DaysMin_{i}", 0),
+                LpConstraint(_expr((dias[i], 1), (d[i], -1)), LpConstraintGE, f"Dias_ge_d_{i}", 0),
+            ]
+
+    def instantiate(
+        self,
+        origin, dest,
+        F, DEP, DUR, C,
+        tau=24.0,
+        D_total=7.0,
+        TMAX=15.0,
+        d_min=None, d_max=None,
+        C_hotel=None,
+        C_food=None,
+        nA=1, nC=0, alpha=1.0,
+        C_transfer=None,
+        bigM=None,
+        prune=True,
+        horizon_slack=None,
+        dominance=True,
+        forced=(),
+        **_
+    ):
+        """
+        Patch the skeleton for one request and return the LpProblem
+        (same parameters as build_trip_milp_pulp; `forced` are cities that
+        must be visited, applied as y lower bounds)
+        """
+        assert origin in self.y and dest in self.y and origin != dest
+        assert tau == self.tau
+
+        V = self.V
+        x, X, y, t, d, dias, u = self.x, self.X, self.y, self.t, self.d, self.dias, self.u
+
+        # Defaults
+        if d_min is None: d_min = {i: 0.0 for i in V}
+        if d_max is None: d_max = {i: D_total for i in V}
+        if C_hotel is None: C_hotel = {i: 0.0 for i in V}
+        if C_food  is None: C_food  = {i: 0.0 for i in V}
+        if C_transfer is None: C_transfer = {i: 0.0 for i in V}
+
+        F, pruning = prune_for_request(F, DEP, DUR, C, origin, dest, prune=prune, dominance=dominance,
+                                       tau=tau, D_total=D_total, TMAX=TMAX, d_min=d_min,
+                                       horizon_slack=horizon_slack)
+
+        A = [(i, j) for (i, j), fs in F.items() if i != j and len(fs) > 0]
+        kept = [(i, j, f) for (i, j) in A for f in F[(i, j)]]
+
+        if bigM is None:
+            if len(DEP) == 0:
+                raise ValueError("DEP is empty; provide bigM explicitly or fill DEP.")
+            big_m, t_lb = sequencing_big_m(F, DEP, DUR, origin, dest, tau * D_total)
+        else:
+            big_m, t_lb = {k: (bigM, bigM) for k in kept}, {}
+
+        # --- Bounds (reset every city, then fix origin/dest/forced) ---
+        must_visit = {origin, dest} | set(forced)
+        for i in V:
+            y[i].lowBound = 1 if i in must_visit else 0
+            t[i].upBound = 0 if i == origin else None
+            u[i].upBound = 0 if i == origin else None
+        for v in self._all_variables():
+            v.varValue = None
+
+        model = LpProblem("Trip_Scheduling_Flights_Only", LpMinimize)
+
+        # --- Objective (min cost) ---
+        food_factor = (nA + alpha * nC)
+        objective = LpAffineExpression(
+            [(x[k], C[k]) for k in kept] +
+            [(dias[i], C_hotel[i] + C_food[i] * food_factor) for i in V] +
+            [(y[i], C_transfer[i]) for i in V]
+        )
+        model += objective, "Total_Cost"
+
+        # --- Per-arc rows: aggregation over the kept flights of the arc ---
+        for (i, j) in A:
+            fs = [(x[(i, j, f)], 1) for f in F[(i, j)]]
+            model += LpConstraint(
+                LpAffineExpression([(X[(i, j)], 1)] + [(v, -1) for v, _ in fs]), LpConstraintEQ, f"Agg_{i}_{j}", 0
+            )
+            model += LpConstraint(LpAffineExpression(fs), LpConstraintLE, f"AtMostOneFlight_{i}_{j}", 1)
+            model.addConstraint(self.mtz_rows[(i, j)])
+
+        # Flow / degree over kept arcs:
+        # out - in = 1 at origin, -1 at dest; in = y_i, out = y_i at intermediate cities
+        out_arcs = {i: [] for i in V}
+        in_arcs = {i: [] for i in V}
+        for (i, j) in A:
+            out_arcs[i].append(X[(i, j)])
+            in_arcs[j].append(X[(i, j)])
+
+        for i in V:
+            flow = [(v, 1) for v in out_arcs[i]] + [(v, -1) for v in in_arcs[i]]
+            out_i = [(v, 1) for v in out_arcs[i]]
+            in_i = [(v, 1) for v in in_arcs[i]]
+            if i == origin:
+                model += LpConstraint(LpAffineExpression(flow), LpConstraintEQ, "Flow_origin", 1)
+                model += LpConstraint(LpAffineExpression(out_i), LpConstraintEQ, "Origin_out_degree", 1)
+                model += LpConstraint(LpAffineExpression(in_i), LpConstraintEQ, "Origin_in_degree", 0)
+            elif i == dest:
+                model += LpConstraint(LpAffineExpression(flow), LpConstraintEQ, "Flow_dest", -1)
+                model += LpConstraint(LpAffineExpression(in_i), LpConstraintEQ, "Dest_in_degree", 1)
+                model += LpConstraint(LpAffineExpression(out_i), LpConstraintEQ, "Dest_out_degree", 0)
+            else:
+                model += LpConstraint(LpAffineExpression(flow), LpConstraintEQ, f"Flow_{i}", 0)
+                model += LpConstraint(LpAffineExpression(in_i + [(y[i], -1)]), LpConstraintEQ, f"InDegree_{i}", 0)
+                model += LpConstraint(LpAffineExpression(out_i + [(y[i], -1)]), LpConstraintEQ, f"OutDegree_{i}", 0)
+
+        # --- Per-city rows: patch d_min/d_max ---
+        for i in V:
+            rows = self.city_rows[i]
+            rows[2].expr[y[i]] = -d_max[i]
+            rows[3].expr[y[i]] = -d_min[i]
+            for row in rows:
+                model.addConstraint(row)
+
+        model += LpConstraint(LpAffineExpression([(d[i], 1) for i in V]), LpConstraintEQ, "TotalDays", D_total)
+
+        # --- Sequencing: patch big-M and DEP of the kept flights ---
+        for k in kept:
+            dep, dur = DEP[k], DUR[k]
+            m_depart, m_arrive = big_m[k]
+            depart, arrive = self.seq_rows[k]
+            depart.expr[x[k]] = m_depart
+            depart.constant = -(dep + m_depart)
+            arrive.expr[x[k]] = -m_arrive
+            arrive.constant = -(dep + dur - m_arrive)
+            model.addConstraint(depart)
+            model.addConstraint(arrive)
+
+        # --- Flight time constraint: total DUR <= TMAX ---
+        model += LpConstraint(
+            LpAffineExpression([(x[k], DUR[k]) for k in kept]), LpConstraintLE, "MaxTotalFlightTime", TMAX
+        )
+
+        model.solution_handle = SolutionHandle({k: x[k] for k in kept}, dias)
+        model.pruning = pruning
+        model.t_lb = t_lb
+
+        return model
+
+    def _all_variables(self):
+        for group in (self.x, self.X, self.y, self.t, self.d, self.dias, self.u):
+            yield from group.values()
+
+
+class TemplatePool:
+    """
+    Idle TripModelTemplate copies per model structure (cities, tau, flight ids).
+    The flight ids are keyed by F.versao (compiled once per database version)
+    so a lookup does not walk F; a plain dict F falls back to its contents.
+
+    reserve() hands out a template used by one request at a time; concurrent
+    requests on the same structure get extra copies, built on demand.
+    """
+
+    def __init__(self, per_key=TEMPLATES_PER_KEY, max_keys=TEMPLATE_KEYS):
+        self.per_key = per_key
+        self.max_keys = max_keys
+        self._idle = OrderedDict()
+        self._lock = threading.Lock()
+        self.built = 0
+
+    @staticmethod
+    def key(V, F, tau):
+        version = getattr(F, "versao", None)
+        if version is None:
+            version = tuple((ij, tuple(fs)) for ij, fs in F.items())
+        return (tuple(V), tau, version)
+
+    @contextmanager
+    def reserve(self, V, F, tau=24.0):
+        key = self.key(V, F, tau)
+        with self._lock:
+            idle = self._idle.get(key)
+            template = idle.pop() if idle else None
+            if key in self._idle:
+                self._idle.move_to_end(key)
+
+        if template is None:
+            template = TripModelTemplate(V, F, tau)
+            self.built += 1
+
+        try:
+            yield template
+        finally:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                self._idle.move_to_end(key)
+                if len(idle) < self.per_key:
+                    idle.append(template)
+                while len(self._idle) > self.max_keys:
+                    self._idle.popitem(last=False)
+
+
+_pool = TemplatePool()
+
+
+def get_template_pool() -> TemplatePool:
+    return _pool
@@ -0,0 +1,156 @@
+from pulp import (
+    LpProblem, LpVariable, LpMinimize, lpSum,
+    LpBinary, LpContinuous, LpInteger
+)
+
+from otm_model import SolutionHandle, prune_for_request
+
+
+def build_trip_milp_time_expanded(
+    V,                       # list of cities
+    origin, dest,            # fixed origin/destination (must be in V)
+    F,                       # dict: (i,j) -> list of flight ids f
+    DEP, DUR, C,             # dicts keyed by (i,j,f) -> value (hours / cost)
+    tau=24.0,                # hours per day
+    D_total=7.0,             # total days (continuous)
+    TMAX=15.0,               # max total flight time (hours)
+    d_min=None, d_max=None,  # dicts keyed by i -> min/max days (continuous), optional
+    C_hotel=None,            # dict i -> cost per day
+    C_food=None,             # dict i -> cost per day (per person-day)
+    nA=1, nC=0, alpha=1.0,   # people parameters for food
+    C_transfer=None,         # dict i -> transfer fixed cost if visit
+    bigM=None,               # unused (kept so model_params work with both engines)
+    prune=True,              # drop flights outside the feasible time window (see prune_flights)
+    horizon_slack=None,      # optional horizon cut beyond tau*D_total + TMAX (see prune_flights)
+    dominance=True           # drop dominated flights (see prune_dominated)
+):
+    """
+    Time-expanded network formulation (same inputs/outputs as build_trip_milp_pulp).
+
+    Nodes are (city, event time) pairs, where event times are the departures
+    and arrivals of flights at that city. Arcs are
+    - flight arcs x_{i}_{j}_{f}: (i, DEP) -> (j, DEP + DUR)
+    - wait arcs  w_{i}_{k}:     (i, tau_k) -> (i, tau_{k+1})
+
+    One unit of flow leaves (origin, 0) and ends at dest. Since time strictly
+    increases along every arc the network is acyclic, so no subtour
+    elimination (MTZ u_i) is needed, and the stay at city i is the total
+    length of the wait arcs used there, which replaces the big-M
+    sequencing constraints: tau * d_i <= sum_k len_k * w_{i}_{k}.
+
+    Variables x_*, y_*, d_* and dias_* keep the names of the MTZ model, so the
+    solved model can be read by build_front_json_from_solution.
+    """
+    assert origin in V and dest in V and origin != dest
+
+    # Defaults
+    if d_min is None: d_min = {i: 0.0 for i in V}
+    if d_max is None: d_max = {i: D_total for i in V}
+    if C_hotel is None: C_hotel = {i: 0.0 for i in V}
+    if C_food  is None: C_food  = {i: 0.0 for i in V}
+    if C_transfer is None: C_transfer = {i: 0.0 for i in V}
+
+    F, pruning = prune_for_request(F, DEP, DUR, C, origin, dest, prune=prune, dominance=dominance,
+                                   tau=tau, D_total=D_total, TMAX=TMAX, d_min=d_min,
+                                   horizon_slack=horizon_slack)
+
+    # Flights before t0 can never be taken (t_i >= 0 in the MTZ model)
+    flights = [(i, j, f) for (i, j), fs in F.items() if i != j for f in fs if DEP[(i, j, f)] >= 0.0]
+
+    model = LpProblem("Trip_Scheduling_Time_Expanded", LpMinimize)
+
+    # --- Event nodes per city ---
+    events = {i: set() for i in V}
+    events[origin].add(0.0)
+    for (i, j, f) in flights:
+        events[i].add(DEP[(i, j, f)])
+        events[j].add(DEP[(i, j, f)] + DUR[(i, j, f)])
+    events = {i: sorted(ts) for i, ts in events.items()}
+    node_idx = {i: {tk: k for k, tk in enumerate(ts)} for i, ts in events.items()}
+
+    # --- Decision variables ---
+    x = {k: LpVariable(f"x_{k[0]}_{k[1]}_{k[2]}", cat=LpBinary) for k in flights}
+
+    # Wait arcs between consecutive events (none needed at dest: flow ends on arrival)
+    w = {}
+    for i in V:
+        if i == dest:
+            continue
+        for k in range(len(events[i]) - 1):
+            w[(i, k)] = LpVariable(f"w_{i}_{k}", lowBound=0, upBound=1, cat=LpContinuous)
+
+    y = {i: LpVariable(f"y_{i}", cat=LpBinary) for i in V}
+    d = {i: LpVariable(f"d_{i}", lowBound=0, cat=LpContinuous) for i in V}
+    dias = {i: LpVariable(f"dias_{i}", lowBound=0, cat=LpInteger) for i in V}
+
+    # --- Objective (min cost) ---
+    food_factor = (nA + alpha * nC)
+
+    model += (
+        lpSum(C[k] * x[k] for k in flights) +
+        lpSum(C_hotel[i] * dias[i] for i in V) +
+        lpSum(C_food[i] * food_factor * dias[i] for i in V) +
+        lpSum(C_transfer[i] * y[i] for i in V)
+    ), "Total_Cost"
+
+    # --- Constraints ---
+    model += y[origin] == 1, "Visit_origin"
+    model += y[dest] == 1, "Visit_dest"
+
+    out_at = {}   # (i, k) -> flight vars leaving node k of city i
+    in_at = {}    # (i, k) -> flight vars arriving at node k of city i
+    out_city = {i: [] for i in V}
+    in_city = {i: [] for i in V}
+    for (i, j, f) in flights:
+        k_dep = node_idx[i][DEP[(i, j, f)]]
+        k_arr = node_idx[j][DEP[(i, j, f)] + DUR[(i, j, f)]]
+        out_at.setdefault((i, k_dep), []).append(x[(i, j, f)])
+        in_at.setdefault((j, k_arr), []).append(x[(i, j, f)])
+        out_city[i].append(x[(i, j, f)])
+        in_city[j].append(x[(i, j, f)])
+
+    # Flow conservation on every event node (dest nodes are sinks)
+    for i in V:
+        if i == dest:
+            continue
+        for k in range(len(events[i])):
+            inflow = lpSum(in_at.get((i, k), [])) + (w[(i, k - 1)] if k > 0 else 0)
+            outflow = lpSum(out_at.get((i, k), [])) + (w[(i, k)] if (i, k) in w else 0)
+            supply = 1 if (i == origin and k == 0) else 0
+            model += outflow - inflow == supply, f"Flow_{i}_{k}"
+
+    # Degree/visit coupling (each city visited at most once)
+    model += lpSum(out_city[origin]) == 1, "Origin_out_degree"
+    model += lpSum(in_city[origin]) == 0, "Origin_in_degree"
+    model += lpSum(in_city[dest]) == 1, "Dest_in_degree"
+    model += lpSum(out_city[dest]) == 0, "Dest_out_degree"
+    for i in V:
+        if i in (origin, dest):
+            continue
+        model += lpSum(in_city[i]) == y[i], f"InDegree_{i}"
+        model += lpSum(out_city[i]) == y[i], f"OutDegree_{i}"
+
+    # Days constraints
+    for i in V:
+        model += d[i] <= d_max[i] * y[i], f"DaysMax_{i}"
+        model += d[i] >= d_min[i] * y[i], f"DaysMin_{i}"
+        model += dias[i] >= d[i],         f"Dias_ge_d_{i}"
+
+    model += lpSum(d[i] for i in V) == D_total, "TotalDays"
+
+    # Stay at i fits in the time waited there (replaces Seq_depart/Seq_arrive big-M)
+    for i in V:
+        if i == dest:
+            continue
+        ts = events[i]
+        waited = lpSum((ts[k + 1] - ts[k]) * w[(i, k)] for k in range(len(ts) - 1))
+        model += tau * d[i] <= waited, f"Stay_{i}"
+
+    # --- Flight time constraint: total DUR <= TMAX ---
+    model += lpSum(DUR[k] * x[k] for k in flights) <= TMAX, "MaxTotalFlightTime"
+
+    model.solution_handle = SolutionHandle(x, dias)
+    model.pruning = pruning
+    model.wait_events = {i: ts for i, ts in events.items() if i != dest}  # w_{i}_{k} spans ts[k]..ts[k+1]
+
+    return model
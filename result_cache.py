@@ -0,0 +1,87 @@
+"""
+Cache de resultados das otimizações
+Guarda a resposta de /optimize e /optimize-multiple por requisição normalizada
++ versão do banco, com expiração por tempo (TTL) e descarte LRU
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+CACHE_TAMANHO = int(os.environ.get("OTM_CACHE_TAMANHO", 256))
+CACHE_TTL = float(os.environ.get("OTM_CACHE_TTL", 600.0))  # segundos
+
+
+def chave_requisicao(endpoint: str, requisicao: Dict, versao_db: str) -> str:
+    """
+    Chave canônica da requisição: mesma viagem => mesma chave,
+    independente da ordem de locais_visitar e das chaves dos dicts
+    """
+    normalizada = dict(requisicao)
+    normalizada["locais_visitar"] = sorted(set(requisicao.get("locais_visitar") or []))
+    texto = json.dumps(
+        {"endpoint": endpoint, "db": versao_db, "requisicao": normalizada},
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Cache LRU com TTL, seguro para várias threads
+
+    - get(): retorna o resultado ou None (expirado conta como miss)
+    - put(): grava e descarta o menos usado quando passa de `tamanho`
+    - estatisticas(): hits, misses, entradas e taxa de acerto
+    """
+
+    def __init__(self, tamanho: int = CACHE_TAMANHO, ttl: float = CACHE_TTL):
+        self.tamanho = tamanho
+        self.ttl = ttl
+        self._itens: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, chave: str) -> Optional[Any]:
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                expira_em, valor = item
+                if time.monotonic() < expira_em:
+                    self._itens.move_to_end(chave)
+                    self.hits += 1
+                    return valor
+                del self._itens[chave]
+            self.misses += 1
+            return None
+
+    def put(self, chave: str, valor: Any):
+        if self.tamanho <= 0:
+            return
+        with self._lock:
+            self._itens[chave] = (time.monotonic() + self.ttl, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho:
+                self._itens.popitem(last=False)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self) -> Dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entradas": len(self._itens),
+                "tamanho_maximo": self.tamanho,
+                "ttl_segundos": self.ttl,
+                "taxa_acerto": round(self.hits / total, 4) if total else 0.0,
+            }
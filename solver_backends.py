@@ -0,0 +1,215 @@
+"""
+Backends de solver para os modelos PuLP
+- "cbc":        PULP_CBC_CMD (subprocesso + arquivos temporários, comportamento original)
+- "cpsat":      OR-Tools CP-SAT em processo, busca paralela com vários workers
+- "cbc_inproc": CBC embutido no OR-Tools, em processo (sem arquivos nem subprocesso)
+- "highs":      HiGHS embutido no OR-Tools, em processo
+
+Os backends em processo só chamam "Optimal" a solução provada ótima; uma
+solução viável interrompida pelo tempo limite volta como "Not Solved".
+
+O backend padrão vem da variável de ambiente OTM_SOLVER (default "cbc").
+Em qualquer backend os valores da solução são gravados de volta nas variáveis
+do LpProblem, então build_front_json_from_solution funciona sem mudanças.
+
+Modelos em forma matricial (otm_model_matrix.MatrixModel) não passam pelas
+expressões do PuLP: o CBC lê o MPS gravado direto das colunas e o CP-SAT
+recebe as linhas CSR.
+"""
+
+import os
+import subprocess
+
+from pulp import PULP_CBC_CMD, PulpSolverError, LpStatus, LpStatusOptimal, LpStatusInfeasible, LpStatusNotSolved, \
+    LpStatusUnbounded, LpStatusUndefined, LpMinimize, LpContinuous, LpSolutionIntegerFeasible
+
+from otm_model_matrix import MatrixModel
+
+
+DEFAULT_BACKEND = os.environ.get("OTM_SOLVER", "cbc")
+CPSAT_WORKERS = int(os.environ.get("OTM_CPSAT_WORKERS", os.cpu_count() or 8))
+
+# Falhas do próprio solver (executável do CBC que falha, solução ilegível);
+# quem chama trata como "sem solução", erros de programação continuam subindo
+ERROS_SOLVER = (PulpSolverError, subprocess.SubprocessError)
+
+
+def _resolver_cbc(model, time_limit, warm_start=False):
+    if isinstance(model, MatrixModel):
+        return _resolver_cbc_matriz(model, time_limit, warm_start)
+    status = model.solve(PULP_CBC_CMD(msg=False, timeLimit=time_limit, warmStart=warm_start))
+    return LpStatus[status]
+
+
+def _resolver_cbc_matriz(model, time_limit, warm_start=False):
+    # Mesma linha de comando e leitura de status do PULP_CBC_CMD
+    cbc = PULP_CBC_CMD(msg=False, timeLimit=time_limit, warmStart=warm_start)
+    arq_mps, arq_sol, arq_mst = cbc.create_tmp_files(model.name, "mps", "sol", "mst")
+    # Arquivos apagados mesmo se o CBC ou a leitura falharem (workers de longa duração)
+    try:
+        nomes = model.write_mps(arq_mps)
+
+        args = [cbc.path, arq_mps]
+        if model.sense != LpMinimize:
+            args.append("-max")
+        if warm_start:
+            with open(arq_mst, "w") as f:
+                f.write("Stopped on time - objective value 0\n")
+                for k, (nome, v) in enumerate(zip(nomes, model.variables())):
+                    f.write(f"{k:>7} {nome} {v.varValue if v.varValue is not None else 0:>15} {0:>23}\n")
+            args += ["-mips", arq_mst]
+        args += ["-sec", str(time_limit), "-solve", "-printingOptions", "all", "-solution", arq_sol]
+
+        subprocess.run(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL, check=True)
+
+        status, model.sol_status = cbc.get_status(arq_sol)
+        coluna = {nome: c for c, nome in enumerate(nomes)}
+        valores = [0.0] * len(nomes)
+        with open(arq_sol) as f:
+            next(f)
+            for linha in f:
+                campos = linha.split()
+                if campos and campos[0] == "**":
+                    campos = campos[1:]
+                if len(campos) >= 3 and campos[1] in coluna:
+                    valores[coluna[campos[1]]] = float(campos[2])
+        model.assign_values(valores)
+        model.status = status
+    finally:
+        cbc.delete_tmp_files(arq_mps, arq_sol, arq_mst)
+    return LpStatus[status]
+
+
+def _resolver_ortools(model, time_limit, warm_start, solver_id):
+    # Modelo carregado na API do OR-Tools e resolvido no próprio processo
+    from ortools.linear_solver import pywraplp
+
+    solver = pywraplp.Solver.CreateSolver(solver_id)
+    if solver is None:
+        raise RuntimeError(f"OR-Tools sem suporte a {solver_id}")
+    solver.SuppressOutput()
+
+    inf = solver.infinity()
+
+    # Variáveis
+    variaveis = {}
+    for v in model.variables():
+        lb = v.lowBound if v.lowBound is not None else -inf
+        ub = v.upBound if v.upBound is not None else inf
+        if v.cat == LpContinuous:
+            variaveis[v.name] = solver.NumVar(lb, ub, v.name)
+        else:
+            variaveis[v.name] = solver.IntVar(lb, ub, v.name)
+
+    obj = solver.Objective()
+    if isinstance(model, MatrixModel):
+        _carregar_matriz(solver, model, list(variaveis.values()), obj)
+    else:
+        # Restrições: sum(coef * var) + constante (<=, >=, ==) 0
+        for nome, c in model.constraints.items():
+            rhs = -c.constant
+            lb, ub = {1: (rhs, inf), -1: (-inf, rhs), 0: (rhs, rhs)}[c.sense]
+            ct = solver.Constraint(lb, ub, nome)
+            for v, coef in c.items():
+                ct.SetCoefficient(variaveis[v.name], coef)
+
+        # Objetivo
+        if model.objective is not None:
+            for v, coef in model.objective.items():
+                obj.SetCoefficient(variaveis[v.name], coef)
+            obj.SetOffset(model.objective.constant)
+    if model.sense == LpMinimize:
+        obj.SetMinimization()
+    else:
+        obj.SetMaximization()
+
+    # Solução inicial (valores já gravados nas variáveis do PuLP) vira hint do CP-SAT
+    # (o HiGHS do OR-Tools derruba o processo com hint; o CBC o ignora)
+    if warm_start and solver_id == "CP_SAT":
+        dica = [(variaveis[v.name], v.varValue) for v in model.variables() if v.varValue is not None]
+        if dica:
+            solver.SetHint([var for var, _ in dica], [val for _, val in dica])
+
+    if solver_id == "CP_SAT":
+        solver.SetSolverSpecificParametersAsString(
+            f"num_workers:{CPSAT_WORKERS} max_time_in_seconds:{float(time_limit)}"
+        )
+    else:
+        solver.SetTimeLimit(int(time_limit * 1000))
+    if solver_id == "HIGHS":
+        # SuppressOutput() não cala o HiGHS: banner e log saem no stdout a cada solve
+        solver.SetSolverSpecificParametersAsString("output_flag=false\nlog_to_console=false")
+    status = solver.Solve()
+
+    if status in (pywraplp.Solver.OPTIMAL, pywraplp.Solver.FEASIBLE):
+        model.assignVarsVals({nome: var.solution_value() for nome, var in variaveis.items()})
+
+    # Mesma convenção do CBC via PuLP: solução só "Optimal" quando provada ótima
+    lp_status = {
+        pywraplp.Solver.OPTIMAL: LpStatusOptimal,
+        pywraplp.Solver.FEASIBLE: LpStatusNotSolved,
+        pywraplp.Solver.INFEASIBLE: LpStatusInfeasible,
+        pywraplp.Solver.UNBOUNDED: LpStatusUnbounded,
+    }.get(status, LpStatusUndefined)
+    model.status = lp_status
+    return LpStatus[lp_status]
+
+
+def _resolver_cpsat(model, time_limit, warm_start=False):
+    return _resolver_ortools(model, time_limit, warm_start, "CP_SAT")
+
+
+def _resolver_cbc_inproc(model, time_limit, warm_start=False):
+    return _resolver_ortools(model, time_limit, warm_start, "CBC")
+
+
+def _resolver_highs(model, time_limit, warm_start=False):
+    return _resolver_ortools(model, time_limit, warm_start, "HIGHS")
+
+
+def _carregar_matriz(solver, model, colunas, obj):
+    # Linhas CSR do MatrixModel: colunas[c] é a variável do solver da coluna c
+    inf = solver.infinity()
+    for r, nome in enumerate(model.row_name):
+        rhs = model.row_rhs[r]
+        lb, ub = {1: (rhs, inf), -1: (-inf, rhs), 0: (rhs, rhs)}[model.row_sense[r]]
+        ct = solver.Constraint(lb, ub, nome)
+        cols, coefs = model.row(r)
+        for c, coef in zip(cols, coefs):
+            ct.SetCoefficient(colunas[c], coef)
+    for c, coef in enumerate(model.obj):
+        if coef:
+            obj.SetCoefficient(colunas[c], coef)
+
+
+SOLVER_BACKENDS = {
+    "cbc": _resolver_cbc,
+    "cpsat": _resolver_cpsat,
+    "cbc_inproc": _resolver_cbc_inproc,
+    "highs": _resolver_highs,
+}
+
+
+def resolver_modelo(model, time_limit=30, backend=None, warm_start=False) -> str:
+    """
+    Resolve o LpProblem com o backend escolhido (ou DEFAULT_BACKEND)
+    warm_start: usa os valores atuais das variáveis como solução inicial
+    Retorna o status no formato de LpStatus ("Optimal", "Infeasible", ...)
+    """
+    backend = backend or DEFAULT_BACKEND
+    try:
+        resolver = SOLVER_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f"Backend de solver desconhecido: {backend}. Opções: {', '.join(SOLVER_BACKENDS)}")
+    return resolver(model, time_limit, warm_start)
+
+
+def solucao_interrompida(model, status: str) -> bool:
+    """
+    True se o solve parou no tempo limite sem provar o resultado: sem
+    veredito ("Not Solved"/"Undefined") ou, no CBC via PuLP, solução viável
+    devolvida como "Optimal" (sol_status LpSolutionIntegerFeasible)
+    """
+    if status in (LpStatus[LpStatusNotSolved], LpStatus[LpStatusUndefined]):
+        return True
+    return getattr(model, "sol_status", None) == LpSolutionIntegerFeasible
@@ -0,0 +1,164 @@
+"""
+Tempos por etapa das requisições de otimização
+- Etapas: spans (etapa, início, duração) de uma requisição; etapas abertas
+  dentro de outra ganham o prefixo dela ("nivel:otima/solve")
+- etapa(nome): registra na requisição corrente (contextvars); fora de uma
+  requisição não faz nada, então os otimizadores podem usá-la sempre
+- MetricasEtapas: histogramas por endpoint e etapa para GET /metrics
+
+Trabalho enviado ao pool de processos é medido do lado de quem espera
+(submissão até o resultado), sem as etapas internas do processo filho.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+
+# Limites superiores dos buckets dos histogramas (segundos)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Etapas:
+    """
+    Spans de uma requisição, em ordem de término
+    """
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.spans: List[Dict] = []
+        self._abertas: List[str] = []
+
+    def _nome(self, nome: str) -> str:
+        return "/".join(self._abertas + [nome])
+
+    def registrar(self, nome: str, inicio: float, fim: Optional[float] = None):
+        """
+        Span já medido (inicio/fim de time.perf_counter), ex.: espera de um future
+        """
+        fim = time.perf_counter() if fim is None else fim
+        self.spans.append({
+            "etapa": self._nome(nome),
+            "inicio_ms": round((inicio - self.inicio) * 1000, 3),
+            "duracao_ms": round((fim - inicio) * 1000, 3),
+        })
+
+    @contextmanager
+    def etapa(self, nome: str):
+        inicio = time.perf_counter()
+        self._abertas.append(nome)
+        try:
+            yield
+        finally:
+            self._abertas.pop()
+            self.registrar(nome, inicio)
+
+    def total_ms(self) -> float:
+        return round((time.perf_counter() - self.inicio) * 1000, 3)
+
+    def to_list(self) -> List[Dict]:
+        return sorted(self.spans, key=lambda s: s["inicio_ms"])
+
+
+_atual: ContextVar[Optional[Etapas]] = ContextVar("otm_etapas", default=None)
+
+
+def etapas_atuais() -> Optional[Etapas]:
+    return _atual.get()
+
+
+@contextmanager
+def etapa(nome: str):
+    """
+    Span `nome` na requisição corrente (no-op sem requisição)
+    """
+    etapas = _atual.get()
+    if etapas is None:
+        yield
+        return
+    with etapas.etapa(nome):
+        yield
+
+
+class MetricasEtapas:
+    """
+    Histogramas de duração por (endpoint, etapa), seguros para várias threads
+    Cada requisição conta também a etapa "total".
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._series: Dict[str, Dict[str, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def _observar(self, endpoint: str, nome: str, segundos: float):
+        serie = self._series.setdefault(endpoint, {}).setdefault(
+            nome, {"contagem": 0, "soma": 0.0, "buckets": [0] * (len(self.buckets) + 1)}
+        )
+        serie["contagem"] += 1
+        serie["soma"] += segundos
+        for k, limite in enumerate(self.buckets):
+            if segundos <= limite:
+                serie["buckets"][k] += 1
+                break
+        else:
+            serie["buckets"][-1] += 1
+
+    def registrar(self, endpoint: str, etapas: Etapas):
+        with self._lock:
+            for span in etapas.spans:
+                self._observar(endpoint, span["etapa"], span["duracao_ms"] / 1000)
+            self._observar(endpoint, "total", etapas.total_ms() / 1000)
+
+    def estatisticas(self) -> Dict:
+        """
+        {endpoint: {etapa: contagem, soma/média em segundos e buckets
+        cumulativos "le" (até o limite, como no Prometheus)}}
+        """
+        rotulos = [str(b) for b in self.buckets] + ["+Inf"]
+        with self._lock:
+            saida = {}
+            for endpoint, series in self._series.items():
+                saida[endpoint] = {}
+                for nome, serie in sorted(series.items()):
+                    acumulado, buckets = 0, {}
+                    for rotulo, n in zip(rotulos, serie["buckets"]):
+                        acumulado += n
+                        buckets[rotulo] = acumulado
+                    saida[endpoint][nome] = {
+                        "contagem": serie["contagem"],
+                        "soma_s": round(serie["soma"], 6),
+                        "media_s": round(serie["soma"] / serie["contagem"], 6),
+                        "le": buckets,
+                    }
+            return saida
+
+
+metricas = MetricasEtapas()
+
+
+@contextmanager
+def medir_requisicao(endpoint: str, destino: Optional[MetricasEtapas] = None):
+    """
+    Ativa um Etapas para o bloco (etapa() passa a registrar nele) e, ao
+    sair, agrega os spans nos histogramas
+    """
+    etapas = Etapas()
+    token = _atual.set(etapas)
+    try:
+        yield etapas
+    finally:
+        _atual.reset(token)
+        (destino or metricas).registrar(endpoint, etapas)
+
+
+def com_etapas(resultado: Dict, etapas: Etapas) -> Dict:
+    """
+    Cópia rasa da resposta com metadata.etapas (não altera o objeto do cache)
+    """
+    metadata = dict(resultado.get("metadata") or {})
+    metadata["etapas"] = etapas.to_list()
+    metadata["etapas_total_ms"] = etapas.total_ms()
+    return dict(resultado, metadata=metadata)
@@ -0,0 +1,11 @@
+"""
+Testes offline (sem servidor): python -m pytest -q tests
+Os módulos da aplicação ficam na raiz do repositório
+"""
+
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
@@ -0,0 +1,57 @@
+"""
+Label-setting (caminho_minimo) contra o MILP nas requisições sem cidades
+intermediárias
+"""
+
+import pytest
+
+from benchmark_escala import gerar_banco, gerar_requisicoes
+from benchmark_modelos import montar_params
+from caminho_minimo import caminho_minimo_aplicavel, resolver_caminho_minimo
+from import_export_json import compilar_voos
+from model_engines import construir_modelo
+from solver_backends import resolver_modelo
+
+
+N_DIAS = 10
+
+
+def _casos():
+    casos = []
+    for seed in (0, 1, 2):
+        db = gerar_banco(6, N_DIAS, 2, densidade=0.5, seed=seed)
+        compilado = compilar_voos(db)
+        casos += [(montar_params(db, r, compilado), r["locais_visitar"])
+                  for r in gerar_requisicoes(db, "direto", 3, N_DIAS, seed=seed)]
+    return casos
+
+
+@pytest.mark.parametrize("params,locais", _casos())
+def test_custo_igual_ao_milp(params, locais):
+    assert caminho_minimo_aplicavel(params, locais)
+    solucao = resolver_caminho_minimo(**params)
+
+    with construir_modelo("mtz", params, locais) as model:
+        status = resolver_modelo(model, 60, "cbc")
+        custo_milp = model.objective.value() if status == "Optimal" else None
+
+    if custo_milp is None:
+        assert status == "Infeasible" and solucao is None
+        return
+    assert solucao is not None
+    assert solucao["custo"] == pytest.approx(custo_milp, abs=1e-6)
+    assert solucao["chosen"][0][0] == params["origin"]
+    assert solucao["chosen"][-1][1] == params["dest"]
+    assert sum(params["DUR"][k] for k in solucao["chosen"]) <= params["TMAX"] + 1e-9
+
+
+def test_nao_aplicavel_com_cidade_intermediaria():
+    db = gerar_banco(5, N_DIAS, 1, seed=0)
+    r = gerar_requisicoes(db, "uma_cidade", 1, N_DIAS, seed=0)[0]
+    assert not caminho_minimo_aplicavel(montar_params(db, r), r["locais_visitar"])
+
+    # Dias livres fora das pontas também exigem o MILP
+    r = gerar_requisicoes(db, "direto", 1, N_DIAS, seed=0)[0]
+    params = montar_params(db, r)
+    params["D_total"] += 1.0
+    assert not caminho_minimo_aplicavel(params, r["locais_visitar"])
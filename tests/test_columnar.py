@@ -0,0 +1,124 @@
+"""
+Formato colunar (.otmb): ida e volta contra o database.json, mesmas entradas
+do modelo e mesma resposta ao front, e reabertura por pickle presa à versão
+"""
+
+import json
+import pickle
+
+import pytest
+
+import import_export_json as ie
+from benchmark_escala import gerar_banco, gerar_requisicoes
+from benchmark_modelos import montar_params
+from database_cache import DatabaseCache
+from model_engines import construir_modelo
+from solver_backends import resolver_modelo
+
+
+N_DIAS = 10
+
+
+@pytest.fixture
+def banco():
+    db = gerar_banco(5, N_DIAS, 2, seed=3)
+    for n, a in enumerate(db["arestas"]):
+        # Campos fora das colunas e tempo de voo fracionário
+        a["tempo_voo"] += 0.5 * (n % 2)
+        a["escalas"] = n % 2
+        a["coletado_em"] = "2026-02-01T10:00:00"
+        if n % 2:
+            a["trechos"] = [
+                {"origem": a["origem"], "destino": "X", "voo_cod": "A1"},
+                {"origem": "X", "destino": a["destino"], "voo_cod": "A2"},
+            ]
+    db["nos"]["C000"]["nome"] = "São Paulo"
+    return db
+
+
+@pytest.fixture
+def arquivos(banco, tmp_path):
+    json_path, otmb_path = tmp_path / "database.json", tmp_path / "database.otmb"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(banco, f, ensure_ascii=False)
+    ie.convert_json_to_columnar(str(json_path), str(otmb_path))
+    ie._reabertos.clear()
+    return str(json_path), str(otmb_path)
+
+
+def test_arestas_iguais_ao_json(banco, arquivos):
+    col = ie.load_db_columnar(arquivos[1])
+    assert col["metadata"] == banco["metadata"]
+    assert col["nos"] == banco["nos"]
+    assert len(col["arestas"]) == len(banco["arestas"])
+    assert list(col["arestas"]) == banco["arestas"]
+    assert col["arestas"][-1] == banco["arestas"][-1]
+    assert col["arestas"][1:3] == banco["arestas"][1:3]
+
+
+def test_extras_fora_do_cabecalho(banco, arquivos):
+    # Abrir o arquivo não decodifica os campos extras de cada linha
+    col = ie.load_db_columnar(arquivos[1])
+    assert not any("coletado_em" in texto for texto in col.strings)
+    assert list(col.colunas["extras_tam"]).count(0) == 0
+
+
+def test_aresta_sem_extras(tmp_path):
+    db = gerar_banco(3, 2, 1, seed=0)
+    caminho = str(tmp_path / "db.otmb")
+    ie.export_db_columnar(db, caminho)
+    assert list(ie.load_db_columnar(caminho)["arestas"]) == db["arestas"]
+
+
+def test_compilado_igual_ao_json(banco, arquivos):
+    de_json = ie.compilar_voos(banco)
+    de_col = ie.compilar_voos(ie.load_db_columnar(arquivos[1]))
+    assert de_col.chaves == de_json.chaves
+    assert list(de_col.saida_min) == list(de_json.saida_min)
+    assert de_col.F == de_json.F and de_col.F.versao == de_json.F.versao
+    assert de_col.DUR == de_json.DUR
+    assert de_col.C == de_json.C
+
+
+def test_resposta_igual_ao_json(banco, arquivos):
+    col = ie.load_db_columnar(arquivos[1])
+    com_trechos = False
+    for r in gerar_requisicoes(banco, "uma_cidade", 3, N_DIAS, seed=0):
+        respostas = []
+        for base in (banco, col):
+            params = montar_params(base, r, ie.compilar_voos(base))
+            with construir_modelo("mtz", params, r["locais_visitar"]) as model:
+                assert resolver_modelo(model, 60, "cbc") == "Optimal"
+                respostas.append(ie.build_front_json_from_solution(model, base, r["origem"], r["destino"]))
+        assert respostas[0] == respostas[1]
+        com_trechos |= any("trechos" in t["voo"] for t in respostas[0]["rota"]["trechos"])
+    assert com_trechos
+
+
+def test_pickle_reabre_mesma_versao(arquivos):
+    col = ie.load_db_columnar(arquivos[1])
+    copia = pickle.loads(pickle.dumps(col))
+    assert copia.versao() == col.versao()
+    assert copia.path == col.path
+    # Uma reabertura por versão no processo
+    assert pickle.loads(pickle.dumps(col)) is copia
+
+
+def test_pickle_de_versao_trocada_falha(arquivos):
+    col = ie.load_db_columnar(arquivos[1])
+    serializado = pickle.dumps(col)
+    with open(arquivos[1], "ab") as f:
+        f.write(b"\0" * 8)
+    with pytest.raises(ValueError):
+        pickle.loads(serializado)
+
+
+def test_arquivo_nao_colunar(arquivos):
+    with pytest.raises(ValueError):
+        ie.load_db_columnar(arquivos[0])
+
+
+def test_database_cache_abre_colunar(banco, arquivos):
+    snapshot = DatabaseCache(arquivos[1]).get()
+    assert snapshot.version == snapshot.data.versao()
+    assert list(snapshot.data["arestas"]) == banco["arestas"]
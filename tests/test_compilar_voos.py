@@ -0,0 +1,35 @@
+"""
+Compilação dos voos: dominância no mesmo arco e dia, com preços do JSON
+em qualquer formato numérico
+"""
+
+from import_export_json import compilar_voos
+
+
+def _aresta(hora, tempo_voo, custo, cod):
+    return {"origem": "GYN", "destino": "GRU", "data_voo": "2026-03-01", "hora_saida": hora,
+            "tempo_voo": tempo_voo, "custo_passagem": custo, "cia": "G3", "voo_cod": cod}
+
+
+def test_dominados_fora_de_f():
+    db = {"arestas": [
+        _aresta("08:00", 90, 500.0, "A"),
+        _aresta("09:00", 20, 450.0, "B"),    # domina A: sai depois, chega antes, mais barato
+        _aresta("10:00", 120, 300.0, "C"),   # chega depois de B, mas é mais barato
+        _aresta("10:00", 120, 300.0, "D"),   # empate total com C: fica o primeiro
+    ]}
+    compilado = compilar_voos(db)
+    assert compilado.F[("GYN", "GRU")] == ["B_2026-03-01_09:00", "C_2026-03-01_10:00"]
+    assert compilado.dominados == 2
+
+
+def test_precos_int_e_texto():
+    db = {"arestas": [
+        _aresta("08:00", 90, "500", "A"),
+        _aresta("09:00", 20, 450, "B"),
+        _aresta("10:00", 120, "99.5", "C"),
+    ]}
+    compilado = compilar_voos(db)
+    assert compilado.F[("GYN", "GRU")] == ["B_2026-03-01_09:00", "C_2026-03-01_10:00"]
+    assert compilado.C[("GYN", "GRU", "C_2026-03-01_10:00")] == 99.5
+    assert all(type(c) is float for c in compilado.C.values())
@@ -0,0 +1,179 @@
+"""
+ETL sem rede: token bucket, retentativas do ClienteHTTP e coleta incremental
+(planejar_coleta / mesclar_banco / publicar_atomico)
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+import requests
+
+# Dependências só do ETL (etl/README_CRAWLER.md)
+for _modulo in ("bs4", "dotenv", "unidecode"):
+    pytest.importorskip(_modulo)
+
+from etl import crawler  # noqa: E402
+
+
+AGORA = datetime(2026, 3, 1, 12, 0, 0)
+
+
+class Relogio:
+    """
+    time.monotonic/time.sleep falsos: sleep só avança o relógio
+    """
+
+    def __init__(self):
+        self.agora = 0.0
+        self.esperas = []
+
+    def monotonic(self):
+        return self.agora
+
+    def sleep(self, segundos):
+        self.esperas.append(segundos)
+        self.agora += segundos
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    r = Relogio()
+    monkeypatch.setattr(crawler.time, "monotonic", r.monotonic)
+    monkeypatch.setattr(crawler.time, "sleep", r.sleep)
+    return r
+
+
+def test_token_bucket_rajada_e_taxa(relogio):
+    bucket = crawler.TokenBucket(taxa=2.0, rajada=3)
+    for _ in range(3):
+        bucket.adquirir()
+    assert relogio.agora == 0.0
+
+    for _ in range(4):
+        bucket.adquirir()
+    # Depois da rajada, um token a cada 1/taxa segundos
+    assert relogio.agora == pytest.approx(2.0)
+
+
+class Resposta:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def _cliente(respostas, tentativas=4):
+    cliente = crawler.ClienteHTTP(workers=1, limites={"api.teste": (1000.0, 1000)},
+                                  tentativas=tentativas, backoff=1.0)
+    chamadas = []
+
+    def request(metodo, url, **kwargs):
+        chamadas.append((metodo, url, kwargs["timeout"]))
+        r = respostas.pop(0)
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+    cliente.session.request = request
+    return cliente, chamadas
+
+
+def test_cliente_repete_429_e_5xx(relogio):
+    cliente, chamadas = _cliente([Resposta(503), Resposta(429, {"Retry-After": "7"}), Resposta(200)])
+    assert cliente.get("https://api.teste/voos").status_code == 200
+    assert len(chamadas) == 3
+    # Backoff exponencial com jitter, depois o Retry-After do servidor
+    assert 0.0 <= relogio.esperas[0] <= 1.0
+    assert relogio.esperas[1] == 7.0
+
+
+def test_cliente_nao_repete_4xx(relogio):
+    cliente, chamadas = _cliente([Resposta(404), Resposta(200)])
+    assert cliente.get("https://api.teste/voos").status_code == 404
+    assert len(chamadas) == 1
+
+
+def test_cliente_esgota_tentativas(relogio):
+    cliente, chamadas = _cliente([Resposta(500), Resposta(502)], tentativas=2)
+    assert cliente.post("https://api.teste/token").status_code == 502
+    assert len(chamadas) == 2
+
+    erro = requests.ConnectionError("sem rede")
+    cliente, chamadas = _cliente([requests.Timeout("lento"), erro], tentativas=2)
+    with pytest.raises(requests.ConnectionError):
+        cliente.get("https://api.teste/voos")
+    assert len(chamadas) == 2
+
+
+def _aresta(data, origem, destino, coletado_em, **extra):
+    return dict({"data_voo": data, "origem": origem, "destino": destino, "hora_saida": "10:00",
+                 "custo_passagem": 500.0, "tempo_voo": 120, "cia": "G3", "voo_cod": "G31000",
+                 "coletado_em": coletado_em}, **extra)
+
+
+def _carimbo(horas_atras):
+    return (AGORA - timedelta(hours=horas_atras)).isoformat(timespec="seconds")
+
+
+def test_planejar_coleta_sem_banco():
+    datas, rotas = ["2026-05-01", "2026-05-02"], [("GYN", "GRU"), ("GRU", "GYN")]
+    voos, cidades = crawler.planejar_coleta(None, datas, rotas, AGORA)
+    assert voos == [(d, o, de) for d in datas for (o, de) in rotas]
+    assert cidades == crawler.CIDADES
+
+
+def test_planejar_coleta_incremental():
+    datas = ["2026-05-01", "2026-05-02", "2026-05-03"]
+    rotas = [("GYN", "GRU")]
+    validade = crawler.ETL_VALIDADE_VOOS_H
+    anterior = {
+        "metadata": {"sem_voos": {"2026-05-03|GYN|GRU": _carimbo(1)}},
+        "nos": {c["code"]: {"coletado_em": _carimbo(1)} for c in crawler.CIDADES[1:]},
+        "arestas": [
+            _aresta("2026-05-01", "GYN", "GRU", _carimbo(1)),
+            # Tarifas da mesma rota-dia: vale a mais antiga
+            _aresta("2026-05-02", "GYN", "GRU", _carimbo(1)),
+            _aresta("2026-05-02", "GYN", "GRU", _carimbo(validade + 1)),
+        ],
+    }
+    voos, cidades = crawler.planejar_coleta(anterior, datas, rotas, AGORA)
+    assert voos == [("2026-05-02", "GYN", "GRU")]
+    assert cidades == crawler.CIDADES[:1]
+
+
+def test_mesclar_banco():
+    anterior = {
+        "metadata": {"sem_voos": {"2026-02-01|GYN|GRU": "x", "2026-05-02|GRU|GYN": "x",
+                                  "2026-05-03|GRU|GYN": "x"}},
+        "nos": {"GYN": {"nome": "antigo"}, "GRU": {"nome": "Sao Paulo"}},
+        "arestas": [
+            _aresta("2026-02-01", "GYN", "GRU", "velho"),            # data passada
+            _aresta("2026-05-01", "GYN", "GRU", "velho"),            # rota-dia consultada de novo
+            _aresta("2026-05-01", "GRU", "GYN", "velho"),            # mantida
+        ],
+    }
+    novas = [_aresta("2026-05-01", "GYN", "GRU", "novo", custo_passagem=450.0)]
+    consultadas = {("2026-05-01", "GYN", "GRU"), ("2026-05-02", "GRU", "GYN")}
+    db = crawler.mesclar_banco(anterior, novas, consultadas, {"2026-05-04|GYN|GRU": "novo"},
+                               {"GYN": {"nome": "novo"}}, AGORA)
+
+    assert [(a["data_voo"], a["origem"], a["coletado_em"]) for a in db["arestas"]] == [
+        ("2026-05-01", "GYN", "novo"), ("2026-05-01", "GRU", "velho"),
+    ]
+    assert db["metadata"]["sem_voos"] == {"2026-05-03|GRU|GYN": "x", "2026-05-04|GYN|GRU": "novo"}
+    assert db["nos"] == {"GYN": {"nome": "novo"}, "GRU": {"nome": "Sao Paulo"}}
+    assert db["metadata"]["atualizado_em"] == AGORA.isoformat(timespec="seconds")
+
+
+def test_publicar_atomico(tmp_path):
+    saida = str(tmp_path / "dados" / "database.json")
+    db = {"metadata": {}, "nos": {"GYN": {"nome": "Goiânia"}}, "arestas": []}
+    crawler.publicar_atomico(db, saida)
+    assert crawler.carregar_banco(saida) == db
+    assert os.listdir(os.path.dirname(saida)) == ["database.json"]
+
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump({"nos": []}, f)
+    assert crawler.carregar_banco(saida) is None
+    assert crawler.carregar_banco(str(tmp_path / "ausente.json")) is None
@@ -0,0 +1,66 @@
+"""
+Cache do banco: troca de snapshot, arquivo tocado e arquivo inválido
+"""
+
+import json
+import os
+
+import pytest
+
+from database_cache import DatabaseCache
+
+
+def _gravar(caminho, texto, mtime_ns):
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(texto)
+    # mtime explícito: duas gravações no mesmo tick do relógio ainda contam como mudança
+    os.utime(caminho, ns=(mtime_ns, mtime_ns))
+
+
+def test_database_cache_troca_snapshot(tmp_path):
+    caminho = str(tmp_path / "database.json")
+    _gravar(caminho, json.dumps({"versao": 1}), 1_000_000_000)
+    cache = DatabaseCache(caminho)
+
+    antigo = cache.get()
+    assert antigo.data == {"versao": 1}
+    assert cache.get() is antigo
+
+    _gravar(caminho, json.dumps({"versao": 2}), 2_000_000_000)
+    novo = cache.get()
+    assert novo is not antigo and novo.data == {"versao": 2}
+    assert novo.version != antigo.version
+    # Quem já tinha a referência continua com a versão antiga
+    assert antigo.data == {"versao": 1}
+    assert cache.recargas == 2
+
+
+def test_database_cache_arquivo_tocado_mantem_snapshot(tmp_path):
+    caminho = str(tmp_path / "database.json")
+    _gravar(caminho, json.dumps({"versao": 1}), 1_000_000_000)
+    cache = DatabaseCache(caminho)
+    snapshot = cache.get()
+
+    _gravar(caminho, json.dumps({"versao": 1}), 2_000_000_000)
+    assert cache.get() is snapshot
+    assert cache.recargas == 1
+
+
+def test_database_cache_arquivo_invalido_mantem_anterior(tmp_path):
+    caminho = str(tmp_path / "database.json")
+    _gravar(caminho, json.dumps({"versao": 1}), 1_000_000_000)
+    cache = DatabaseCache(caminho)
+    snapshot = cache.get()
+
+    _gravar(caminho, '{"versao": ', 2_000_000_000)
+    assert cache.get() is snapshot
+
+    _gravar(caminho, json.dumps({"versao": 3}), 3_000_000_000)
+    assert cache.get().data == {"versao": 3}
+
+
+def test_database_cache_sem_versao_valida(tmp_path):
+    caminho = str(tmp_path / "database.json")
+    _gravar(caminho, "{", 1_000_000_000)
+    with pytest.raises(ValueError):
+        DatabaseCache(caminho).get()
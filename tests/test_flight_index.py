@@ -0,0 +1,70 @@
+"""
+FlightIndex contra varreduras lineares em db["arestas"]
+"""
+
+from datetime import datetime
+
+import pytest
+
+from benchmark_escala import gerar_banco
+from flight_index import FlightIndex, flight_id, horario_chegada, horario_saida
+
+
+@pytest.fixture(scope="module")
+def db():
+    return gerar_banco(5, 4, 3, densidade=0.8, seed=2)
+
+
+@pytest.fixture(scope="module")
+def index(db):
+    return FlightIndex(db)
+
+
+def _ordenados(voos):
+    return sorted(voos, key=lambda a: (horario_saida(a), a["destino"], a["voo_cod"]))
+
+
+def test_voo_por_id(db, index):
+    for a in db["arestas"]:
+        assert index.voo(a["origem"], a["destino"], flight_id(a)) is a
+    a = db["arestas"][0]
+    # Id com data/hora desconhecida: primeiro voo da rota com o mesmo voo_cod
+    primeiro = next(b for b in db["arestas"]
+                    if (b["origem"], b["destino"], b["voo_cod"]) == (a["origem"], a["destino"], a["voo_cod"]))
+    assert index.voo(a["origem"], a["destino"], f'{a["voo_cod"]}_1999-01-01_00:00') is primeiro
+    assert index.voo(a["origem"], a["destino"], "NAOEXISTE_1999-01-01_00:00") is None
+
+
+def test_voos_saindo_no_intervalo(db, index):
+    depois_de, antes_de = datetime(2026, 3, 2, 6, 0), datetime(2026, 3, 3, 18, 0)
+    for origem in db["nos"]:
+        esperado = [a for a in db["arestas"]
+                    if a["origem"] == origem and depois_de <= horario_saida(a) <= antes_de]
+        obtido = index.voos_saindo(origem, depois_de, antes_de)
+        assert [horario_saida(a) for a in obtido] == sorted(horario_saida(a) for a in esperado)
+        assert _ordenados(obtido) == _ordenados(esperado)
+    assert index.voos_saindo("XXX") == []
+
+
+def test_voos_rota(db, index):
+    depois_de = datetime(2026, 3, 3)
+    for origem in db["nos"]:
+        for destino in db["nos"]:
+            esperado = [a for a in db["arestas"] if a["origem"] == origem and a["destino"] == destino
+                        and horario_saida(a) >= depois_de]
+            assert _ordenados(index.voos_rota(origem, destino, depois_de)) == _ordenados(esperado)
+
+
+def test_voos_no_dia(db, index):
+    for origem in db["nos"]:
+        esperado = [a for a in db["arestas"] if a["origem"] == origem and a["data_voo"] == "2026-03-02"]
+        assert _ordenados(index.voos_no_dia(origem, "2026-03-02")) == _ordenados(esperado)
+        destino = esperado[0]["destino"] if esperado else origem
+        assert _ordenados(index.voos_no_dia(origem, "2026-03-02", destino)) == \
+            _ordenados([a for a in esperado if a["destino"] == destino])
+
+
+def test_horarios():
+    a = {"voo_cod": "XX1", "data_voo": "2026-03-01", "hora_saida": "23:30", "tempo_voo": 90.5}
+    assert flight_id(a) == "XX1_2026-03-01_23:30"
+    assert horario_chegada(a) == datetime(2026, 3, 2, 1, 0, 30)
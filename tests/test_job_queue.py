@@ -0,0 +1,52 @@
+"""
+Fila de jobs: limite de admissão (FilaCheia), erro e job já concluído
+"""
+
+import threading
+import time
+
+import pytest
+
+from job_queue import CONCLUIDO, ERRO, FilaCheia, JobQueue
+
+
+def _esperar(job, timeout=5.0):
+    limite = time.monotonic() + timeout
+    while job.status not in (CONCLUIDO, ERRO):
+        assert time.monotonic() < limite, "job não terminou"
+        time.sleep(0.01)
+
+
+def test_job_queue_recusa_acima_do_limite():
+    fila = JobQueue(workers=1, fila_max=1, ttl=60)
+    liberar = threading.Event()
+
+    jobs = [fila.submeter("optimize", lambda job, n=n: liberar.wait(5) and n) for n in range(2)]
+    with pytest.raises(FilaCheia) as erro:
+        fila.submeter("optimize", lambda job: None)
+    assert erro.value.retry_after >= 1
+
+    liberar.set()
+    for n, job in enumerate(jobs):
+        _esperar(job)
+        assert fila.obter(job.id).status == CONCLUIDO
+        assert job.resultado == n
+
+    # Com a fila livre volta a aceitar
+    job = fila.submeter("optimize", lambda job: "ok")
+    _esperar(job)
+    assert job.to_dict()["resultado"] == "ok"
+
+
+def test_job_queue_erro_e_concluido():
+    fila = JobQueue(workers=1, fila_max=0, ttl=60)
+
+    def falhar(job):
+        raise RuntimeError("sem voos")
+
+    job = fila.submeter("optimize", falhar)
+    _esperar(job)
+    assert job.status == ERRO and job.erro == "sem voos"
+
+    pronto = fila.concluido("optimize", {"custo": 1})
+    assert fila.obter(pronto.id).resultado == {"custo": 1}
@@ -0,0 +1,40 @@
+"""
+Cenários de /optimize-multiple: falha do solver descarta a opção e tira a
+resposta do cache; erros de programação não são engolidos
+"""
+
+import pytest
+from pulp import PulpSolverError
+
+import multiple_optimizer
+from benchmark_escala import gerar_banco, gerar_requisicoes
+from benchmark_modelos import montar_params
+
+
+@pytest.fixture
+def cenario():
+    db = gerar_banco(5, 10, 2, seed=0)
+    r = gerar_requisicoes(db, "uma_cidade", 1, 10, seed=0)[0]
+    return {"model_params": montar_params(db, r), "request_data": r, "candidatos": [], "timeout": 10}
+
+
+def test_cenario_resolvido(cenario):
+    solucao, interrompido = multiple_optimizer.otimizar_com_pesos(**cenario)
+    assert solucao["chosen"] and not interrompido
+
+
+def test_falha_do_solver_marca_interrompido(cenario, monkeypatch):
+    def falhar(*args, **kwargs):
+        raise PulpSolverError("cbc morreu")
+
+    monkeypatch.setattr(multiple_optimizer, "resolver_modelo", falhar)
+    assert multiple_optimizer.otimizar_com_pesos(**cenario) == (None, True)
+
+
+def test_erro_de_programacao_sobe(cenario, monkeypatch):
+    def falhar(*args, **kwargs):
+        raise KeyError("x_A_B_f")
+
+    monkeypatch.setattr(multiple_optimizer, "resolver_modelo", falhar)
+    with pytest.raises(KeyError):
+        multiple_optimizer.otimizar_com_pesos(**cenario)
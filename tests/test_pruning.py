@@ -0,0 +1,167 @@
+"""
+Exatidão das podas de voos (janela de tempo e dominância) e do big-M por
+voo: o ótimo tem de ser o mesmo do modelo sem poda e do bigM global, em
+redes sintéticas pequenas
+"""
+
+import random
+from functools import lru_cache
+
+import pytest
+
+from benchmark_bigm import big_m_global
+from benchmark_escala import gerar_banco, gerar_requisicoes
+from benchmark_modelos import montar_params
+from import_export_json import VoosCompilados, compilar_voos
+from model_engines import construir_modelo
+from otm_model import build_trip_milp_pulp, prune_dominated, prune_flights, sequencing_big_m
+from solver_backends import resolver_modelo, solucao_interrompida
+
+
+N_DIAS = 10
+
+
+def _sem_filtro(db):
+    # Todos os voos em F (compilar_voos já tira os dominados no mesmo dia)
+    c = compilar_voos(db)
+    return VoosCompilados(c.chaves, c.saida_min, [c.DUR[k] * 60.0 for k in c.chaves],
+                          [c.C[k] for k in c.chaves], dominancia=False)
+
+
+def _casos():
+    casos = []
+    for seed in (0, 1):
+        db = gerar_banco(5, N_DIAS, 3, densidade=0.8, seed=seed)
+        compilado = _sem_filtro(db)
+        for perfil, n in (("direto", 2), ("uma_cidade", 2), ("tres_cidades", 1)):
+            for r in gerar_requisicoes(db, perfil, n, N_DIAS, seed=seed):
+                casos.append((montar_params(db, r, compilado), r["locais_visitar"]))
+    return casos
+
+
+CASOS = _casos()
+
+
+def _custo(model):
+    status = resolver_modelo(model, 60, "cbc")
+    assert status in ("Optimal", "Infeasible") and not solucao_interrompida(model, status), status
+    return round(model.objective.value(), 4) if status == "Optimal" else None
+
+
+def _mtz(params, locais, **extra):
+    # build_trip_milp_pulp direto (sem o esqueleto em cache), com as visitas obrigatórias
+    model = build_trip_milp_pulp(**dict(params, **extra))
+    variables = model.variablesDict()
+    for local in locais:
+        if local not in (params['origin'], params['dest']):
+            model += variables[f"y_{local}"] == 1, f"Force_visit_{local}"
+    return model
+
+
+@lru_cache(maxsize=None)
+def _referencia(n):
+    # Modelo completo: todos os voos, sem poda
+    params, locais = CASOS[n]
+    return _custo(_mtz(params, locais, prune=False, dominance=False))
+
+
+@pytest.mark.parametrize("n", range(len(CASOS)))
+def test_janela_mantem_otimo(n):
+    params, locais = CASOS[n]
+    assert _custo(_mtz(params, locais, prune=True, dominance=False)) == _referencia(n)
+
+
+@pytest.mark.parametrize("n", range(len(CASOS)))
+def test_dominancia_mantem_otimo(n):
+    params, locais = CASOS[n]
+    assert _custo(_mtz(params, locais, prune=False, dominance=True)) == _referencia(n)
+    assert _custo(_mtz(params, locais)) == _referencia(n)
+
+
+@pytest.mark.parametrize("n", range(len(CASOS)))
+def test_big_m_por_voo_igual_ao_global(n):
+    params, locais = CASOS[n]
+    # bigM único de antes, sobre o horizonte dos voos mantidos
+    assert _custo(_mtz(params, locais, bigM=big_m_global(params))) == _referencia(n)
+
+
+@pytest.mark.parametrize("n", range(3))
+def test_big_m_por_voo_cobre_voos_nao_escolhidos(n):
+    params, _ = CASOS[n]
+    F, DEP, DUR = params['F'], params['DEP'], params['DUR']
+    max_stay = params['tau'] * params['D_total']
+    big_m, L = sequencing_big_m(F, DEP, DUR, params['origin'], params['dest'], max_stay)
+    assert all(m_dep >= 0.0 and m_arr >= 0.0 for m_dep, m_arr in big_m.values())
+    assert L[params['origin']] == 0.0
+    for (i, j, f), (_, m_arr) in big_m.items():
+        # Seq_arrive relaxada: t_j = L_j é permitido por qualquer voo não escolhido
+        assert DEP[(i, j, f)] + DUR[(i, j, f)] - m_arr <= L.get(j, 0.0) + 1e-9
+
+
+@pytest.mark.parametrize("motor", ["mtz", "mtz_matriz", "time_expanded"])
+def test_motores_com_poda_mantem_otimo(motor):
+    for n, (params, locais) in enumerate(CASOS[:4]):
+        with construir_modelo(motor, params, locais) as model:
+            assert _custo(model) == _referencia(n)
+
+
+def test_janela_sem_horizonte_mantem_voo_tardio():
+    # Único voo barato sai bem depois de tau*D_total + TMAX: o ótimo espera por ele
+    V = ["A", "B"]
+    F = {("A", "B"): ["cedo", "tarde"]}
+    DEP = {("A", "B", "cedo"): 2.0, ("A", "B", "tarde"): 100.0}
+    DUR = {("A", "B", "cedo"): 2.0, ("A", "B", "tarde"): 2.0}
+    C = {("A", "B", "cedo"): 900.0, ("A", "B", "tarde"): 100.0}
+    janela = dict(tau=24.0, D_total=1.0, TMAX=15.0, d_min={"A": 0.0, "B": 1.0})
+
+    assert prune_flights(F, DEP, DUR, "A", "B", **janela)[("A", "B")] == ["cedo", "tarde"]
+    assert prune_flights(F, DEP, DUR, "A", "B", horizon_slack=0.0, **janela)[("A", "B")] == ["cedo"]
+
+    model = build_trip_milp_pulp(V, "A", "B", F, DEP, DUR, C, d_max={"A": 1.0, "B": 1.0}, **janela)
+    assert _custo(model) == 100.0
+
+
+def test_janela_descarta_voos_inalcancaveis():
+    # C sai antes de alguém chegar lá; D nunca alcança o destino
+    F = {("A", "C"): ["a"], ("C", "B"): ["c"], ("A", "D"): ["d"], ("A", "B"): ["b"]}
+    DEP = {("A", "C", "a"): 10.0, ("C", "B", "c"): 5.0, ("A", "D", "d"): 1.0, ("A", "B", "b"): 3.0}
+    DUR = {k: 1.0 for k in DEP}
+    podado = prune_flights(F, DEP, DUR, "A", "B")
+    assert podado == {("A", "C"): [], ("C", "B"): [], ("A", "D"): [], ("A", "B"): ["b"]}
+
+
+def _dominados_forca_bruta(fs, DEP, DUR, C, i, j):
+    removidos = set()
+    for n, f in enumerate(fs):
+        k = (i, j, f)
+        for m, g in enumerate(fs):
+            o = (i, j, g)
+            if m == n or not (DEP[o] >= DEP[k] and DEP[o] + DUR[o] <= DEP[k] + DUR[k] and C[o] <= C[k]):
+                continue
+            empate = (DEP[o], DEP[o] + DUR[o], C[o]) == (DEP[k], DEP[k] + DUR[k], C[k])
+            if not empate or m < n:
+                removidos.add(f)
+                break
+    return removidos
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_dominancia_igual_forca_bruta(seed):
+    rng = random.Random(seed)
+    F, DEP, DUR, C = {}, {}, {}, {}
+    for arco in (("A", "B"), ("B", "C")):
+        F[arco] = [f"f{n}" for n in range(rng.randint(0, 25))]
+        for f in F[arco]:
+            k = arco + (f,)
+            # Valores inteiros pequenos: muitos empates
+            DEP[k] = float(rng.randint(0, 10))
+            DUR[k] = float(rng.randint(1, 4))
+            C[k] = float(rng.randint(1, 6))
+
+    podado, removidos = prune_dominated(F, DEP, DUR, C)
+    total = 0
+    for (i, j), fs in F.items():
+        esperado = _dominados_forca_bruta(fs, DEP, DUR, C, i, j)
+        assert podado[(i, j)] == [f for f in fs if f not in esperado]
+        total += len(esperado)
+    assert removidos == total
@@ -0,0 +1,44 @@
+"""
+Cache de resultados: chave normalizada, descarte LRU e expiração por TTL
+"""
+
+import result_cache
+from result_cache import ResultCache, chave_requisicao
+
+
+def test_chave_requisicao_normalizada():
+    a = {"origem": "GYN", "destino": "GRU", "locais_visitar": ["BSB", "MIA"]}
+    b = {"locais_visitar": ["MIA", "BSB", "MIA"], "destino": "GRU", "origem": "GYN"}
+    assert chave_requisicao("optimize", a, "v1") == chave_requisicao("optimize", b, "v1")
+    assert chave_requisicao("optimize", a, "v1") != chave_requisicao("optimize", a, "v2")
+    assert chave_requisicao("optimize", a, "v1") != chave_requisicao("optimize-multiple", a, "v1")
+
+
+def test_result_cache_lru():
+    cache = ResultCache(tamanho=2, ttl=60)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1      # "b" passa a ser o menos usado
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.estatisticas()["entradas"] == 2
+    assert cache.estatisticas()["hits"] == 3 and cache.estatisticas()["misses"] == 1
+
+
+def test_result_cache_ttl(monkeypatch):
+    agora = [1000.0]
+    monkeypatch.setattr(result_cache.time, "monotonic", lambda: agora[0])
+    cache = ResultCache(tamanho=4, ttl=10)
+    cache.put("a", 1)
+    agora[0] += 9.9
+    assert cache.get("a") == 1
+    agora[0] += 0.2
+    assert cache.get("a") is None
+    assert cache.estatisticas()["entradas"] == 0
+
+
+def test_result_cache_desligado():
+    cache = ResultCache(tamanho=0, ttl=60)
+    cache.put("a", 1)
+    assert cache.get("a") is None
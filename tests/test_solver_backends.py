@@ -0,0 +1,60 @@
+"""
+CBC sobre o modelo matricial: mesmo ótimo do PuLP e arquivos temporários
+apagados mesmo quando o CBC falha
+"""
+
+import os
+import subprocess
+
+import pytest
+from pulp import PULP_CBC_CMD
+
+import solver_backends
+from benchmark_escala import gerar_banco, gerar_requisicoes
+from benchmark_modelos import montar_params
+from model_engines import construir_modelo
+
+
+@pytest.fixture
+def requisicao():
+    db = gerar_banco(5, 10, 2, seed=0)
+    r = gerar_requisicoes(db, "uma_cidade", 1, 10, seed=0)[0]
+    return montar_params(db, r), r["locais_visitar"]
+
+
+@pytest.fixture
+def temporarios(monkeypatch):
+    criados = []
+    original = PULP_CBC_CMD.create_tmp_files
+
+    def registrar(self, *args):
+        arquivos = tuple(original(self, *args))
+        criados.extend(arquivos)
+        return arquivos
+
+    monkeypatch.setattr(PULP_CBC_CMD, "create_tmp_files", registrar)
+    return criados
+
+
+def test_matriz_igual_ao_pulp(requisicao, temporarios):
+    params, locais = requisicao
+    custos = []
+    for motor in ("mtz", "mtz_matriz"):
+        with construir_modelo(motor, params, locais) as model:
+            assert solver_backends.resolver_modelo(model, 60, "cbc") == "Optimal"
+            custos.append(round(model.objective.value(), 4))
+    assert custos[0] == custos[1]
+    assert temporarios and not any(os.path.exists(arq) for arq in temporarios)
+
+
+def test_matriz_apaga_temporarios_se_o_cbc_falhar(requisicao, temporarios, monkeypatch):
+    def falhar(args, **kwargs):
+        raise subprocess.CalledProcessError(1, args)
+
+    monkeypatch.setattr(solver_backends.subprocess, "run", falhar)
+    params, locais = requisicao
+    with construir_modelo("mtz_matriz", params, locais) as model:
+        with pytest.raises(subprocess.CalledProcessError):
+            solver_backends.resolver_modelo(model, 60, "cbc")
+    assert len(temporarios) == 3
+    assert not any(os.path.exists(arq) for arq in temporarios)
@@ -0,0 +1,262 @@
+"""
+Warm start do MILP a partir das heurísticas (guloso / voo direto / 1 escala)
+Converte o itinerário heurístico numa atribuição inicial completa das variáveis
+(x, X, y, t, d, dias, u) e a entrega ao solver como solução inicial (MIP start)
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+from pulp import LpElement
+
+from flight_index import get_flight_index
+from otm_model import prune_for_request
+
+
+EPS = 1e-6
+
+
+def _nome_pulp(nome: str) -> str:
+    # Mesma troca de caracteres que o PuLP faz nos nomes das variáveis
+    return nome.translate(LpElement.trans)
+
+
+def itinerario_de_resultado(resultado: Optional[Dict]) -> List[Tuple[str, str, str]]:
+    """
+    Lista de (i, j, fid) a partir do JSON de resposta de uma heurística
+    """
+    if not resultado:
+        return []
+    return [
+        (t["origem"], t["destino"], t["voo"]["id"])
+        for t in resultado.get("rota", {}).get("trechos", [])
+    ]
+
+
+def _voo_do_modelo(params: Dict, leg: Tuple[str, str, str]) -> Tuple[str, str, str]:
+    """
+    Voo que sobra no modelo para o trecho: entre os voos de F que dominam o
+    trecho (saem depois, chegam antes, custam no máximo o mesmo; inclui o
+    próprio), o que prune_dominated mantém. Heurísticas que leem o banco
+    inteiro podem escolher voos dominados, que não viram variáveis x.
+    """
+    i, j, f = leg
+    DEP, DUR, C = params['DEP'], params['DUR'], params['C']
+    if leg not in DEP:
+        return leg
+    chegada = DEP[leg] + DUR[leg]
+    candidatos = [
+        (C[k], -DEP[k], DEP[k] + DUR[k], n, k)
+        for n, k in enumerate((i, j, g) for g in params['F'].get((i, j), ()))
+        if DEP[k] >= DEP[leg] and DEP[k] + DUR[k] <= chegada and C[k] <= C[leg]
+    ]
+    return min(candidatos)[-1] if candidatos else leg
+
+
+def atribuicao_inicial(params: Dict, legs: List[Tuple[str, str, str]],
+                       t_min: Optional[Dict[str, float]] = None,
+                       esperas: Optional[Dict[str, List[float]]] = None) -> Optional[Dict[str, float]]:
+    """
+    Valores de todas as variáveis do modelo MTZ para o itinerário `legs`
+
+    Dias: d_min em cada cidade visitada; o que sobrar de D_total vai para o
+    destino e depois para cidades com folga entre chegada e próxima saída.
+    t_min: t das cidades não visitadas (model.t_lb, exigido pelo big-M por voo).
+    esperas: horários dos eventos por cidade da rede expandida no tempo
+    (model.wait_events); cada arco de espera w_{i}_{k} entre a chegada e a
+    saída de uma cidade visitada vale 1.
+    Retorna None se o itinerário não couber nas janelas de tempo/dias.
+    """
+    V = params['V']
+    t_min = t_min or {}
+    origin, dest = params['origin'], params['dest']
+    DEP, DUR = params['DEP'], params['DUR']
+    tau = params.get('tau', 24.0)
+    D_total = params.get('D_total', 7.0)
+    d_min = params.get('d_min') or {i: 0.0 for i in V}
+    d_max = params.get('d_max') or {i: D_total for i in V}
+
+    if not legs or legs[0][0] != origin or legs[-1][1] != dest:
+        return None
+    if params.get('dominance', True):
+        legs = [_voo_do_modelo(params, k) for k in legs]
+    if any(k not in DEP for k in legs):
+        return None
+
+    caminho = [origin] + [j for _, j, _ in legs]
+    if len(set(caminho)) != len(caminho):
+        return None
+
+    chegada = {origin: 0.0}
+    saida = {}
+    for (i, j, f) in legs:
+        saida[i] = DEP[(i, j, f)]
+        chegada[j] = DEP[(i, j, f)] + DUR[(i, j, f)]
+        if saida[i] < chegada[i] - EPS:
+            return None
+
+    # Dias mínimos e folga de cada cidade (destino não tem próxima saída)
+    d = {c: d_min.get(c, 0.0) for c in caminho}
+    folga = {}
+    for c in caminho:
+        if c == dest:
+            folga[c] = d_max.get(c, D_total) - d[c]
+        else:
+            folga[c] = min(d_max.get(c, D_total), (saida[c] - chegada[c]) / tau) - d[c]
+        if folga[c] < -EPS:
+            return None
+
+    restante = D_total - sum(d.values())
+    if restante < -EPS:
+        return None
+    for c in [dest] + caminho[:-1]:
+        extra = min(restante, max(0.0, folga[c]))
+        d[c] += extra
+        restante -= extra
+    if restante > EPS:
+        return None
+
+    valores = {}
+    escolhidos = set(legs)
+    arcos = set((i, j) for i, j, _ in legs)
+    for (i, j), fs in params['F'].items():
+        if i == j:
+            continue
+        valores[f"X_{i}_{j}"] = 1.0 if (i, j) in arcos else 0.0
+        for f in fs:
+            valores[f"x_{i}_{j}_{f}"] = 1.0 if (i, j, f) in escolhidos else 0.0
+
+    posicao = {c: k for k, c in enumerate(caminho)}
+    for c in V:
+        visitada = c in posicao
+        valores[f"y_{c}"] = 1.0 if visitada else 0.0
+        valores[f"t_{c}"] = chegada[c] if visitada else t_min.get(c, 0.0)
+        valores[f"d_{c}"] = d[c] if visitada else 0.0
+        valores[f"dias_{c}"] = float(math.ceil(d[c] - EPS)) if visitada else 0.0
+        valores[f"u_{c}"] = float(posicao[c]) if visitada else 0.0
+
+    for c, ts in (esperas or {}).items():
+        for k in range(len(ts) - 1):
+            esperando = c in saida and chegada[c] - EPS <= ts[k] and ts[k + 1] <= saida[c] + EPS
+            valores[f"w_{c}_{k}"] = 1.0 if esperando else 0.0
+
+    return {_nome_pulp(k): v for k, v in valores.items()}
+
+
+def guloso_com_estadias(params: Dict, locais_visitar: List[str], criterio: str = "custo",
+                        max_expansoes: int = 2000) -> List[Tuple[str, str, str]]:
+    """
+    Variante do algoritmo guloso sobre os dados do modelo (DEP/DUR/C em horas)
+    que respeita a estadia mínima (só parte após chegada + tau * d_min),
+    TMAX e a poda de voos do modelo. Visita as cidades pendentes escolhendo
+    o voo mais barato (criterio="custo") ou que chega antes
+    (criterio="chegada"), usando outras cidades como conexão quando preciso;
+    depois segue para o destino. Se o caminho travar,
+    volta e tenta a próxima opção, até max_expansoes voos testados.
+    Retorna [] se não achar itinerário.
+    """
+    origin, dest = params['origin'], params['dest']
+    F, DEP, DUR, C = params['F'], params['DEP'], params['DUR'], params['C']
+    tau = params.get('tau', 24.0)
+    TMAX = params.get('TMAX', 15.0)
+    D_total = params.get('D_total', 7.0)
+    d_min = params.get('d_min') or {}
+    d_max = params.get('d_max') or {}
+
+    # Mesma poda do modelo: só voos que viram variáveis x
+    F, _ = prune_for_request(F, DEP, DUR, C, origin, dest, prune=params.get('prune', True),
+                             dominance=params.get('dominance', True), tau=tau, D_total=D_total,
+                             TMAX=TMAX, d_min=d_min, horizon_slack=params.get('horizon_slack'))
+
+    pendentes = set(locais_visitar) - {origin, dest}
+
+    # Dias que as outras cidades do roteiro não conseguem absorver ficam na origem
+    capacidade = sum(d_max.get(c, D_total) for c in pendentes | {dest})
+    dias_origem = max(d_min.get(origin, 0.0), D_total - capacidade)
+
+    if criterio == "chegada":
+        ordem = lambda k: (DEP[k] + DUR[k], C[k])
+    else:
+        ordem = lambda k: (C[k], DEP[k] + DUR[k])
+
+    saindo = {}
+    for (i, j), fs in F.items():
+        if i != j:
+            saindo.setdefault(i, []).extend((i, j, f) for f in fs)
+
+    expansoes = [0]
+
+    def estender(atual, pronto, tempo_voo, pendentes, visitadas):
+        # Escolha gulosa com retrocesso quando o caminho trava (limitado a max_expansoes).
+        # Voos para as cidades alvo vêm primeiro; as demais servem de conexão.
+        if atual == dest:
+            return []
+        alvos = pendentes if pendentes else {dest}
+        opcoes = sorted(
+            (k for k in saindo.get(atual, [])
+             if k[1] not in visitadas and (k[1] != dest or not pendentes)
+             and DEP[k] >= pronto - EPS and tempo_voo + DUR[k] <= TMAX + EPS),
+            key=lambda k: (k[1] not in alvos, ordem(k)),
+        )
+        for k in opcoes:
+            expansoes[0] += 1
+            if expansoes[0] > max_expansoes:
+                return None
+            _, j, _ = k
+            chegada = DEP[k] + DUR[k]
+            resto = estender(j, chegada + tau * d_min.get(j, 0.0), tempo_voo + DUR[k],
+                             pendentes - {j}, visitadas | {j})
+            if resto is not None:
+                return [k] + resto
+        return None
+
+    return estender(origin, tau * dias_origem, 0.0, frozenset(pendentes), frozenset([origin])) or []
+
+
+def candidatos_heuristicos(db: Dict, request_data: Dict, params: Dict,
+                           flight_index=None) -> List[List[Tuple[str, str, str]]]:
+    """
+    Itinerários das heurísticas baratas para warm start: guloso com estadias
+    (custo e chegada mais cedo), guloso original e rota básica (direto/1 escala)
+    """
+    # Import local: fallback_optimizer importa este módulo
+    from fallback_optimizer import algoritmo_guloso, criar_rota_basica
+
+    index = get_flight_index(db, flight_index)
+    origem, destino = request_data["origem"], request_data["destino"]
+    data_ida = request_data["data_ida"]
+
+    locais_visitar = request_data.get("locais_visitar", [])
+    candidatos = [
+        guloso_com_estadias(params, locais_visitar, "custo"),
+        guloso_com_estadias(params, locais_visitar, "chegada"),
+    ]
+
+    resultados = [
+        algoritmo_guloso(db, origem, destino, data_ida, locais_visitar, index=index),
+        criar_rota_basica(db, origem, destino, data_ida, request_data, index=index),
+    ]
+    candidatos += [itinerario_de_resultado(r) for r in resultados]
+    return [legs for legs in candidatos if legs]
+
+
+def aplicar_warm_start(model, params: Dict, candidatos: List[List[Tuple[str, str, str]]]) -> bool:
+    """
+    Aplica no modelo o primeiro candidato que gera uma solução viável completa
+    (todas as variáveis preenchidas e todas as restrições satisfeitas)
+    Retorna True se algum candidato foi aplicado
+    """
+    variaveis = model.variables()
+    for legs in candidatos:
+        valores = atribuicao_inicial(params, legs, getattr(model, "t_lb", None),
+                                     getattr(model, "wait_events", None))
+        if valores is None or any(v.name not in valores for v in variaveis):
+            continue
+        for v in variaveis:
+            v.setInitialValue(valores[v.name], check=False)
+        if model.valid(EPS):
+            return True
+
+    for v in variaveis:
+        v.varValue = None
+    return False
@@ -0,0 +1,37 @@
+"""
+Pool de processos compartilhado pelos otimizadores
+Usado para rodar solves independentes (cenários, níveis do fallback) em paralelo
+"""
+
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+# OTM_POOL_WORKERS=1 desliga o paralelismo (execução em sequência)
+POOL_WORKERS = int(os.environ.get("OTM_POOL_WORKERS", min(4, os.cpu_count() or 1)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Pool de processos do processo atual (limitado a POOL_WORKERS)
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS)
+        return _pool
+
+
+def descartar_pool():
+    """
+    Descarta o pool (ex.: BrokenProcessPool) para ser recriado na próxima chamada
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None